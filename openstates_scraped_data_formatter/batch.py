@@ -0,0 +1,276 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+import os
+import time
+import click
+
+from main import run_pipeline, validate_compress
+from utils.archive_utils import TAR_SUFFIXES, ZIP_SUFFIXES, ZSTD_TAR_SUFFIXES, is_archive
+from utils.json_codec import write_json
+from utils.log_utils import LOG_LEVELS, configure_logging, flush_logs
+from utils.progress import DEFAULT_PROGRESS_INTERVAL
+from utils.session_cache import default_cache_folder
+
+ARCHIVE_SUFFIXES = TAR_SUFFIXES + ZSTD_TAR_SUFFIXES + ZIP_SUFFIXES
+
+
+def jurisdiction_name(input_path: Path) -> str:
+    """
+    "il" for an input folder il/ or an archive il.tar.gz / il.zip.
+    """
+    name = input_path.name
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def find_jurisdiction_inputs(input_root: Path, jurisdictions=()) -> dict:
+    """
+    Maps each jurisdiction to its input folder or archive under input_root.
+
+    Args:
+        jurisdictions (tuple): Only these jurisdictions (all found when empty).
+
+    Raises:
+        click.BadParameter: If a requested jurisdiction has no input.
+    """
+    inputs = {}
+    for entry in sorted(input_root.iterdir()):
+        if entry.is_dir() or is_archive(entry):
+            inputs.setdefault(jurisdiction_name(entry), entry)
+
+    if not jurisdictions:
+        return inputs
+    missing = [jur for jur in jurisdictions if jur not in inputs]
+    if missing:
+        raise click.BadParameter(
+            f"no input folder or archive for: {', '.join(missing)}",
+            param_hint="--jur",
+        )
+    return {jur: inputs[jur] for jur in jurisdictions}
+
+
+def input_size(input_path: Path) -> int:
+    if input_path.is_file():
+        return input_path.stat().st_size
+    with os.scandir(input_path) as entries:
+        return sum(entry.stat().st_size for entry in entries if entry.is_file())
+
+
+def run_jurisdiction(
+    jur, input_path, output_root, cache_folder, log_folder, options, log_level="info"
+):
+    """
+    Pool entry point: runs one jurisdiction and never raises, so one failing
+    state doesn't stop the others.
+    """
+    started = time.perf_counter()
+    configure_logging(log_level)
+    try:
+        with ExitStack() as stack:
+            if log_folder is not None:
+                log = stack.enter_context(
+                    open(log_folder / f"{jur}.log", "w", encoding="utf-8")
+                )
+                stack.enter_context(redirect_stdout(log))
+            try:
+                summary = run_pipeline(
+                    jur, input_path, output_root / jur, cache_folder, **options
+                )
+            finally:
+                # Buffered lines belong in this jurisdiction's log
+                flush_logs()
+        summary["status"] = "ok" if not summary["write_errors"] else "write errors"
+        return summary
+    except Exception as e:
+        return {
+            "jurisdiction": jur,
+            "status": f"failed: {e!r}",
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def format_summary(results) -> str:
+    lines = [
+        f"{'jur':<6} {'bills':>8} {'votes':>8} {'events':>8} {'seconds':>9}  status"
+    ]
+    for result in results:
+        counts = result.get("counts", {})
+        linked = (result.get("link_counts") or {}).get("linked", 0)
+        lines.append(
+            f"{result['jurisdiction']:<6} {counts.get('bills', 0):>8} "
+            f"{counts.get('votes', 0):>8} {linked:>8} "
+            f"{result['seconds']:>9.1f}  {result['status']}"
+        )
+    return "\n".join(lines)
+
+
+@click.command()
+@click.option(
+    "--input-root",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    required=True,
+    help="Folder with one input folder or archive per jurisdiction (il/, ca.tar.gz, ...).",
+)
+@click.option(
+    "--output-root",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="Each jurisdiction is written to output-root/<jur>.",
+)
+@click.option(
+    "--jur",
+    "jurisdictions",
+    multiple=True,
+    help="Jurisdiction to process (repeatable). Defaults to every input found.",
+)
+@click.option(
+    "--cache-folder",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=default_cache_folder,
+    show_default="~/.cache/openstates_scraped_data_formatter",
+    help="Cache shared by all jurisdictions and runs (session lists, bill indexes, PDFs).",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="Jurisdictions processed at the same time.",
+)
+@click.option(
+    "--log-folder",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Write each jurisdiction's output to <log-folder>/<jur>.log instead of stdout.",
+)
+@click.option(
+    "--summary-out",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Also write the combined summary as JSON.",
+)
+@click.option("--incremental/--no-incremental", default=False)
+@click.option("--workers", type=click.IntRange(min=1), default=1)
+@click.option("--write-threads", type=click.IntRange(min=0), default=0)
+@click.option(
+    "--output-format", type=click.Choice(["folder", "sqlite"]), default="folder"
+)
+@click.option(
+    "--compress",
+    type=click.Choice(["none", "gzip", "zstd"]),
+    default="none",
+    callback=validate_compress,
+)
+@click.option("--download-pdfs/--no-download-pdfs", default=False)
+@click.option(
+    "--log-level",
+    type=click.Choice(list(LOG_LEVELS)),
+    default="info",
+    help="Verbosity of each jurisdiction's output; per-file messages are debug.",
+)
+@click.option(
+    "--progress-interval",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_PROGRESS_INTERVAL,
+    show_default=True,
+    help="Seconds between each jurisdiction's progress lines; 0 turns them off.",
+)
+def main(
+    input_root: Path,
+    output_root: Path,
+    jurisdictions: tuple,
+    cache_folder: Path,
+    concurrency: int,
+    log_folder: Path,
+    summary_out: Path,
+    incremental: bool,
+    workers: int,
+    write_threads: int,
+    output_format: str,
+    compress: str,
+    download_pdfs: bool,
+    log_level: str,
+    progress_interval: float,
+):
+    """
+    Runs the pipeline for many jurisdictions across a process pool and prints
+    a combined summary. The largest inputs are scheduled first, so the batch
+    takes about as long as its largest jurisdiction.
+
+    --incremental, --workers, --write-threads, --output-format, --compress and
+    --download-pdfs apply to every jurisdiction, as in main.py; PDFs are
+    cached once for all of them under the shared cache folder.
+    """
+    if output_format == "sqlite" and incremental:
+        raise click.UsageError("--incremental requires --output-format folder")
+    if output_format == "sqlite" and download_pdfs:
+        raise click.UsageError("--download-pdfs requires --output-format folder")
+
+    inputs = find_jurisdiction_inputs(input_root, jurisdictions)
+    if not inputs:
+        raise click.UsageError(f"No jurisdiction inputs found in {input_root}")
+
+    output_root.mkdir(parents=True, exist_ok=True)
+    if log_folder is not None:
+        log_folder.mkdir(parents=True, exist_ok=True)
+    options = {
+        "incremental": incremental,
+        "workers": workers,
+        "write_threads": write_threads,
+        "output_format": output_format,
+        "compress": compress,
+        "download_pdfs": download_pdfs,
+        "progress_interval": progress_interval,
+    }
+
+    # Longest jobs first keeps the slowest state from starting last
+    schedule = sorted(inputs, key=lambda jur: input_size(inputs[jur]), reverse=True)
+    print(
+        f"🗺️ Processing {len(schedule)} jurisdictions, {concurrency} at a time"
+    )
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=min(concurrency, len(schedule))) as executor:
+        futures = [
+            executor.submit(
+                run_jurisdiction,
+                jur,
+                inputs[jur],
+                output_root,
+                cache_folder,
+                log_folder,
+                options,
+                log_level,
+            )
+            for jur in schedule
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(
+                f"🏁 {result['jurisdiction']}: {result['status']} ({result['seconds']:.1f}s) "
+                f"[{len(results)}/{len(schedule)} done, "
+                f"{time.perf_counter() - started:.0f}s elapsed]"
+            )
+
+    results.sort(key=lambda result: result["jurisdiction"])
+    total_seconds = round(time.perf_counter() - started, 3)
+    print("\nBatch summary:")
+    print(format_summary(results))
+    print(f"Total: {len(results)} jurisdictions in {total_seconds:.1f}s")
+
+    if summary_out is not None:
+        summary_out.parent.mkdir(parents=True, exist_ok=True)
+        write_json(
+            summary_out, {"seconds": total_seconds, "jurisdictions": results}
+        )
+
+    if any(result["status"] != "ok" for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main(auto_envvar_prefix="OSDF_BATCH")
@@ -0,0 +1,221 @@
+import random
+import uuid
+from pathlib import Path
+
+from utils.json_codec import dumps
+
+CHAMBERS = (("HB", "lower"), ("SB", "upper"))
+ACTION_STEPS = (
+    ("Filed with the Clerk", "filing"),
+    ("First Reading", "reading-1"),
+    ("Referred to Rules Committee", "referral-committee"),
+    ("Assigned to Executive Committee", "referral-committee"),
+    ("Do Pass / Short Debate", "committee-passage"),
+    ("Second Reading", "reading-2"),
+    ("Third Reading - Passed", "passage"),
+    ("Arrived in Senate", "introduction"),
+    ("Sent to the Governor", "executive-receipt"),
+    ("Governor Approved", "executive-signature"),
+)
+VOTE_OPTIONS = ("yes", "no", "other", "excused", "absent", "not voting")
+
+
+def _sessions(session_count, first_year=2017):
+    sessions = []
+    for i in range(session_count):
+        start = first_year + 2 * i
+        sessions.append(
+            {
+                "identifier": f"{100 + i}th",
+                "name": f"{100 + i}th Regular Session",
+                "start_date": f"{start}-01-08",
+                "end_date": f"{start + 1}-12-31",
+                "classification": "primary",
+            }
+        )
+    return sessions
+
+
+def _jurisdiction(jur, sessions):
+    return {
+        "_id": f"ocd-jurisdiction/country:us/state:{jur}/government",
+        "id": f"ocd-jurisdiction/country:us/state:{jur}/government",
+        "name": jur.upper(),
+        "url": "https://example.org",
+        "classification": "state",
+        "legislative_sessions": sessions,
+        "extras": {},
+    }
+
+
+def _bill(rng, session, identifier, chamber, actions_per_bill):
+    year = int(session["start_date"][:4])
+    day = rng.randrange(0, 600)
+    actions = []
+    for step in range(actions_per_bill):
+        description, classification = ACTION_STEPS[step % len(ACTION_STEPS)]
+        day += rng.randrange(0, 6)
+        actions.append(
+            {
+                "description": description,
+                "date": f"{year + day // 365}-{1 + day % 365 // 31:02d}-{1 + day % 28:02d}",
+                "organization_id": f'~{{"classification": "{chamber}"}}',
+                "classification": [classification],
+                "related_entities": [],
+            }
+        )
+    number = identifier[2:]
+    return {
+        "legislative_session": session["identifier"],
+        "identifier": identifier,
+        "title": f"SYNTHETIC BILL {identifier}",
+        "from_organization": f'~{{"classification": "{chamber}"}}',
+        "classification": ["bill"],
+        "subject": [],
+        "abstracts": [{"note": "", "abstract": "Amends the Synthetic Act. " * 4}],
+        "other_titles": [],
+        "other_identifiers": [],
+        "actions": actions,
+        "sponsorships": [
+            {
+                "name": f"Sponsor {rng.randrange(1, 120)}",
+                "classification": "primary",
+                "entity_type": "person",
+                "primary": True,
+                "person_id": None,
+                "organization_id": None,
+            }
+        ],
+        "related_bills": [],
+        "versions": [
+            {
+                "note": "Introduced",
+                "links": [
+                    {
+                        "url": f"https://example.org/{session['identifier']}/{identifier}.pdf",
+                        "media_type": "application/pdf",
+                    }
+                ],
+                "date": "",
+                "classification": "",
+            }
+        ],
+        "documents": [],
+        "citations": [],
+        "sources": [{"url": f"https://example.org/bills/{number}", "note": ""}],
+        "extras": {},
+        "_id": str(uuid.UUID(int=rng.getrandbits(128))),
+    }
+
+
+def _vote_event(rng, bill, voters_per_vote):
+    if bill["actions"]:
+        action = rng.choice(bill["actions"])
+    else:
+        action = {"description": "Floor Vote", "date": "2025-01-15"}
+    votes = [
+        {
+            "option": rng.choice(VOTE_OPTIONS[:3]),
+            "voter_name": f"Member {i}",
+            "voter_id": None,
+            "note": "",
+        }
+        for i in range(voters_per_vote)
+    ]
+    counts = {option: 0 for option in VOTE_OPTIONS}
+    for vote in votes:
+        counts[vote["option"]] += 1
+    return {
+        "identifier": "",
+        "motion_text": action["description"],
+        "motion_classification": [],
+        "start_date": action["date"],
+        "result": "pass" if counts["yes"] > counts["no"] else "fail",
+        "organization": bill["from_organization"],
+        "legislative_session": bill["legislative_session"],
+        "bill": bill["_id"],
+        "bill_action": None,
+        "bill_identifier": bill["identifier"],
+        "votes": votes,
+        "counts": [{"option": o, "value": v} for o, v in counts.items()],
+        "sources": [{"url": "https://example.org/votes", "note": ""}],
+        "extras": {},
+        "_id": str(uuid.UUID(int=rng.getrandbits(128))),
+    }
+
+
+def _event(rng, bill_names, unknown_ratio):
+    if not bill_names or rng.random() < unknown_ratio:
+        names = ["ZZ99999"]
+    else:
+        names = rng.sample(bill_names, k=min(len(bill_names), rng.randrange(1, 4)))
+    referenced = [{"entity_type": "bill", "name": name} for name in names]
+    day = rng.randrange(1, 28)
+    return {
+        "name": "Committee Hearing",
+        "start_date": f"2025-03-{day:02d}T10:00:00",
+        "agenda": [{"related_entities": referenced}],
+    }
+
+
+def generate_corpus(
+    output_folder,
+    jur="il",
+    bills=1000,
+    actions_per_bill=8,
+    votes_per_bill=2,
+    events=None,
+    voters_per_vote=40,
+    sessions=2,
+    unknown_bill_ratio=0.05,
+    seed=0,
+):
+    """
+    Writes a synthetic scrape shaped like the real input: one jurisdiction
+    file, then bill, vote_event and event files, one file at a time (so a
+    corpus of a million files never sits in memory). The same arguments
+    always produce the same files.
+
+    Args:
+        bills (int): Bills, spread evenly over `sessions` sessions.
+        events (int, optional): Event files referencing 1-3 existing bills
+            each, or (unknown_bill_ratio of them) a bill that doesn't exist;
+            default bills // 10.
+
+    Returns:
+        dict: Files written per type and total bytes.
+    """
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    events = bills // 10 if events is None else events
+    session_list = _sessions(sessions)
+    written = {"jurisdiction": 1, "bill": 0, "vote_event": 0, "event": 0, "bytes": 0}
+
+    def write(name, data):
+        raw = dumps(data).encode("utf-8")
+        (output_folder / name).write_bytes(raw)
+        written["bytes"] += len(raw)
+
+    jurisdiction_id = f"ocd-jurisdiction-country:us-state:{jur}-government"
+    write(f"jurisdiction_{jurisdiction_id}.json", _jurisdiction(jur, session_list))
+
+    bill_names = []
+    for i in range(bills):
+        session = session_list[i % sessions]
+        prefix, chamber = CHAMBERS[i // sessions % 2]
+        identifier = f"{prefix}{i // sessions // 2 + 1}"
+        bill = _bill(rng, session, identifier, chamber, actions_per_bill)
+        write(f"bill_{bill['_id']}.json", bill)
+        written["bill"] += 1
+        if len(bill_names) < 10000:
+            bill_names.append(identifier)
+        for _ in range(votes_per_bill):
+            vote = _vote_event(rng, bill, voters_per_vote)
+            write(f"vote_event_{vote['_id']}.json", vote)
+            written["vote_event"] += 1
+
+    for i in range(events):
+        write(f"event_{i:08d}.json", _event(rng, bill_names, unknown_bill_ratio))
+        written["event"] += 1
+    return written
@@ -0,0 +1,236 @@
+import contextlib
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from benchmarks.corpus import generate_corpus
+from main import run_pipeline
+from utils.log_utils import configure_logging
+from utils.json_codec import read_json, write_json
+
+BENCHMARKS_FOLDER = Path(__file__).parent
+BASELINE_FILE = BENCHMARKS_FOLDER / "baselines" / "perf_baseline.json"
+SAMPLE_INPUT_FOLDER = BENCHMARKS_FOLDER.parent / "tests" / "sample_input_files"
+# Fixed synthetic corpus: big enough for per-file costs to dominate, small
+# enough to run with the test suite
+SYNTHETIC_CORPUS = {"bills": 300, "events": 60, "unknown_bill_ratio": 0.1, "seed": 0}
+
+# A stage may take up to TIME_RATIO times its baseline plus TIME_SLACK
+# seconds (stages of a few milliseconds are mostly noise)
+TIME_RATIO = 2.0
+TIME_SLACK = 0.25
+# Counts (files, bytes, file system calls) are deterministic; allow a little
+# headroom for intentional changes that don't warrant a new baseline
+COUNT_RATIO = 1.05
+
+# Audit events (see sys.addaudithook) counted as file system calls
+FS_EVENTS = (
+    "open",
+    "os.listdir",
+    "os.scandir",
+    "glob.glob",
+    "os.mkdir",
+    "os.rename",
+    "os.remove",
+    "os.rmdir",
+    "os.link",
+    "shutil.copyfile",
+)
+
+# {audit event: calls} while counting, else None. Audit hooks can't be
+# removed, so the hook is installed once and gated on this.
+_fs_calls = None
+_hook_installed = False
+
+
+def _count_fs_call(event, args):
+    if _fs_calls is not None and event in _fs_calls:
+        _fs_calls[event] += 1
+
+
+@contextlib.contextmanager
+def counting_fs_calls():
+    """
+    Counts FS_EVENTS raised in this process during the with-block. Yields the
+    counts dict, complete once the block exits.
+    """
+    global _fs_calls, _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_count_fs_call)
+        _hook_installed = True
+    counts = dict.fromkeys(FS_EVENTS, 0)
+    _fs_calls = counts
+    try:
+        yield counts
+    finally:
+        _fs_calls = None
+
+
+def measure_corpus(input_folder, work_folder, jur="il", repeats=3) -> dict:
+    """
+    Runs the pipeline on input_folder `repeats` times (serially, into a fresh
+    output folder each time) and returns the fastest time of each stage along
+    with the stage and file system call counts of the last run.
+
+    An untimed warm-up run goes first, so lazy imports and the first write of
+    the session cache don't show up in the counts.
+
+    Returns:
+        dict: {
+            "stages": {stage: {"seconds", "files", "bytes_read", "bytes_written"}},
+            "fs_calls": {audit event: calls},
+        }
+    """
+    best = {}
+    for attempt in range(repeats + 1):
+        output_folder = work_folder / f"out_{attempt}"
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with counting_fs_calls() as fs_calls:
+                report = run_pipeline(
+                    jur, Path(input_folder), output_folder, work_folder / "cache"
+                )
+        shutil.rmtree(output_folder)
+        if attempt == 0:
+            continue
+        for stage, totals in report["metrics"]["stages"].items():
+            if stage in best:
+                totals = {**totals, "seconds": min(totals["seconds"], best[stage]["seconds"])}
+            best[stage] = totals
+    return {
+        "stages": {stage: best[stage] for stage in sorted(best)},
+        "fs_calls": {event: calls for event, calls in fs_calls.items() if calls},
+    }
+
+
+def measure_baseline_corpora(work_folder, repeats=3) -> dict:
+    """
+    Measures the corpora the baseline covers: tests/sample_input_files and a
+    synthetic corpus (see SYNTHETIC_CORPUS).
+    """
+    synthetic = work_folder / "synthetic_input"
+    if not synthetic.exists():
+        generate_corpus(synthetic, **SYNTHETIC_CORPUS)
+    return {
+        "sample": measure_corpus(SAMPLE_INPUT_FOLDER, work_folder / "sample", repeats=repeats),
+        "synthetic": measure_corpus(synthetic, work_folder / "synthetic", repeats=repeats),
+    }
+
+
+def compare_to_baseline(
+    current, baseline, time_ratio=TIME_RATIO, time_slack=TIME_SLACK, count_ratio=COUNT_RATIO
+) -> list:
+    """
+    Compares measure_baseline_corpora results against a stored baseline.
+
+    Stages or calls that are new since the baseline are compared against
+    zero, so e.g. a per-file glob that wasn't there before is reported.
+
+    Returns:
+        list[str]: One line per value over its threshold; empty if none.
+    """
+    regressions = []
+    for corpus, measured in sorted(current.items()):
+        expected = baseline.get(corpus)
+        if expected is None:
+            continue
+        for stage, totals in measured["stages"].items():
+            before = expected["stages"].get(stage, {})
+            limit = before.get("seconds", 0.0) * time_ratio + time_slack
+            if totals["seconds"] > limit:
+                regressions.append(
+                    f"{corpus}: {stage} took {totals['seconds']:.3f}s "
+                    f"(baseline {before.get('seconds', 0.0):.3f}s, limit {limit:.3f}s)"
+                )
+            for key in ("files", "bytes_read", "bytes_written"):
+                regressions.extend(
+                    _count_regression(
+                        f"{corpus}: {stage} {key}", totals[key], before.get(key, 0), count_ratio
+                    )
+                )
+        for event, calls in measured["fs_calls"].items():
+            regressions.extend(
+                _count_regression(
+                    f"{corpus}: {event} calls",
+                    calls,
+                    expected["fs_calls"].get(event, 0),
+                    count_ratio,
+                )
+            )
+    return regressions
+
+
+def _count_regression(label, value, before, count_ratio):
+    limit = int(before * count_ratio)
+    if value > limit:
+        return [f"{label}: {value} (baseline {before}, limit {limit})"]
+    return []
+
+
+def save_baseline(path, measured):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for totals in (
+        stage for corpus in measured.values() for stage in corpus["stages"].values()
+    ):
+        totals["seconds"] = round(totals["seconds"], 4)
+    write_json(
+        path,
+        {
+            "recorded_with": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "corpora": measured,
+        },
+    )
+
+
+def load_baseline(path) -> dict:
+    return read_json(path)["corpora"]
+
+
+@click.command()
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=BASELINE_FILE,
+    show_default=True,
+    help="Baseline JSON to check against (or to write with --update).",
+)
+@click.option("--update", is_flag=True, help="Record a new baseline instead of checking.")
+@click.option("--repeats", default=3, show_default=True, type=int, help="Runs per corpus; the fastest time of each stage counts.")
+@click.option("--time-ratio", default=TIME_RATIO, show_default=True, type=float)
+@click.option("--time-slack", default=TIME_SLACK, show_default=True, type=float, help="Seconds added to every stage's time limit.")
+@click.option("--count-ratio", default=COUNT_RATIO, show_default=True, type=float)
+def main(baseline, update, repeats, time_ratio, time_slack, count_ratio):
+    """
+    Records per-stage timings and file system call counts for the sample and
+    a fixed synthetic corpus, and fails if they regressed against a baseline.
+    """
+    # Runs are measured, not read: keep the pipeline's own output quiet
+    configure_logging("error")
+    with tempfile.TemporaryDirectory() as tmp:
+        measured = measure_baseline_corpora(Path(tmp), repeats=repeats)
+
+    if update:
+        save_baseline(baseline, measured)
+        print(f"🧾 Saved performance baseline to {baseline}")
+        return
+
+    regressions = compare_to_baseline(
+        measured, load_baseline(baseline), time_ratio, time_slack, count_ratio
+    )
+    if regressions:
+        print("❌ Performance regressions against the baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        raise SystemExit(1)
+    print("✅ No performance regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import contextlib
+import os
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import click
+
+from benchmarks.corpus import generate_corpus
+from postprocessors.event_bill_linker import link_events_to_bills_pipeline
+from postprocessors.helpers import load_bill_to_session_mapping
+from utils.file_utils import ensure_session_mapping
+from utils.io_utils import load_json_files
+from utils.log_utils import configure_logging
+from utils.json_codec import write_json
+from utils.process_utils import process_and_save
+from utils.run_context import open_run
+from utils.session_utils import build_session_name_index
+
+STAGES = ("load", "process", "mapping_rebuild", "link")
+
+
+@contextlib.contextmanager
+def measured(results, stage, trace_memory):
+    """
+    Records the wall time (and, with trace_memory, the peak Python heap) of
+    the with-block under results[stage]. Handler output goes to /dev/null.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        seconds = time.perf_counter() - started
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[stage] = {"seconds": seconds, "peak_bytes": peak}
+
+
+def run_scale(work_folder, jur, bills, corpus_options, trace_memory=True):
+    """
+    Generates a corpus of the given size under work_folder and runs the four
+    pipeline stages on it, the way main.run_pipeline does for a fresh
+    (non-incremental) run.
+
+    Returns:
+        dict: {
+            "bills": n, "files": n, "input_bytes": n,
+            "stages": {stage: {"seconds", "peak_bytes", "files",
+                               "files_per_sec", "mb_per_sec"}},
+            "max_rss_bytes": peak resident size of the process so far,
+        }
+    """
+    corpus = work_folder / "input"
+    output = work_folder / "output"
+    written = generate_corpus(corpus, jur=jur, bills=bills, **corpus_options)
+    input_files = sum(written[kind] for kind in ("jurisdiction", "bill", "vote_event", "event"))
+
+    processed = output / "data_processed"
+    not_processed = output / "data_not_processed"
+    event_archive = output / "event_archive"
+    mapping_file = output / "bill_session_mapping.json"
+    cache_folder = work_folder / "cache"
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        session_mapping = ensure_session_mapping(jur, cache_folder, corpus)
+    session_index = build_session_name_index(session_mapping)
+
+    results = {}
+    # A fresh output folder: nothing on disk can match, as in main.run_pipeline
+    with open_run(output_root=output, jurisdiction=jur, compare_existing=False):
+        with measured(results, "load", trace_memory):
+            data = load_json_files(corpus, event_archive, not_processed)
+        with measured(results, "process", trace_memory):
+            bill_index = {}
+            counts = process_and_save(
+                jur,
+                data,
+                not_processed,
+                session_mapping,
+                output / "new_sessions_added.txt",
+                processed,
+                bill_index=bill_index,
+                session_index=session_index,
+            )
+        del data
+        with measured(results, "mapping_rebuild", trace_memory):
+            bill_to_session = load_bill_to_session_mapping(
+                mapping_file, processed, force_rebuild=True, session_index=session_index
+            )
+        with measured(results, "link", trace_memory):
+            link_counts = link_events_to_bills_pipeline(
+                jur,
+                event_archive,
+                processed,
+                not_processed,
+                mapping_file,
+                cache_folder / "sessions" / f"{jur}.json",
+                bill_to_session=bill_to_session,
+                session_index=session_index,
+                session_mapping=session_mapping,
+            )
+
+    if len(bill_to_session) != len(bill_index):
+        raise click.ClickException(
+            f"rebuilt mapping has {len(bill_to_session)} bills, "
+            f"the live index {len(bill_index)}"
+        )
+
+    # Files each stage works through
+    stage_files = {
+        "load": input_files,
+        "process": input_files - written["event"],
+        "mapping_rebuild": counts["bills"],
+        "link": sum(link_counts.values()),
+    }
+    for stage, totals in results.items():
+        totals["files"] = stage_files[stage]
+        seconds = totals["seconds"] or 1e-9
+        totals["files_per_sec"] = stage_files[stage] / seconds
+        totals["mb_per_sec"] = (
+            written["bytes"] / 1e6 / seconds if stage in ("load", "process") else None
+        )
+
+    return {
+        "bills": bills,
+        "files": input_files,
+        "input_bytes": written["bytes"],
+        "counts": counts,
+        "link_counts": link_counts,
+        "stages": results,
+        # ru_maxrss is in KiB on Linux
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def format_results(results) -> str:
+    header = f"{'bills':>9} {'files':>9} {'stage':<16} {'seconds':>9} {'files/s':>10} {'MB/s':>8} {'peak MB':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        for stage in STAGES:
+            totals = result["stages"][stage]
+            mb_per_sec = totals["mb_per_sec"]
+            peak = totals["peak_bytes"]
+            lines.append(
+                f"{result['bills']:>9} {result['files']:>9} {stage:<16} "
+                f"{totals['seconds']:>9.2f} {totals['files_per_sec']:>10.0f} "
+                f"{'-' if mb_per_sec is None else f'{mb_per_sec:.1f}':>8} "
+                f"{'-' if peak is None else f'{peak / 1e6:.1f}':>8}"
+            )
+    return "\n".join(lines)
+
+
+def parse_scales(ctx, param, value):
+    try:
+        scales = [int(scale) for scale in value.split(",") if scale.strip()]
+    except ValueError:
+        raise click.BadParameter("must be a comma-separated list of bill counts")
+    if not scales or min(scales) < 1:
+        raise click.BadParameter("must be a comma-separated list of bill counts")
+    return scales
+
+
+@click.command()
+@click.option(
+    "--scales",
+    default="1000,10000",
+    show_default=True,
+    callback=parse_scales,
+    help="Comma-separated corpus sizes, in bills. Each bill brings --votes-per-bill vote events.",
+)
+@click.option("--jur", default="il", show_default=True, help="Jurisdiction code of the corpus.")
+@click.option("--actions-per-bill", default=8, show_default=True, type=int)
+@click.option("--votes-per-bill", default=2, show_default=True, type=int)
+@click.option("--voters-per-vote", default=40, show_default=True, type=int)
+@click.option(
+    "--events-per-bill",
+    default=0.1,
+    show_default=True,
+    type=float,
+    help="Event files per bill, each referencing 1-3 bills.",
+)
+@click.option("--sessions", default=2, show_default=True, type=int)
+@click.option("--seed", default=0, show_default=True, type=int)
+@click.option(
+    "--trace-memory/--no-trace-memory",
+    default=True,
+    show_default=True,
+    help="Record each stage's peak Python heap with tracemalloc (slows the stages down).",
+)
+@click.option(
+    "--work-folder",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    help="Where to generate corpora and outputs (default: a temporary folder).",
+)
+@click.option(
+    "--keep",
+    is_flag=True,
+    help="Keep each scale's corpus and output in --work-folder.",
+)
+@click.option(
+    "--json-out",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also write the results as JSON.",
+)
+def main(
+    scales,
+    jur,
+    actions_per_bill,
+    votes_per_bill,
+    voters_per_vote,
+    events_per_bill,
+    sessions,
+    seed,
+    trace_memory,
+    work_folder,
+    keep,
+    json_out,
+):
+    """
+    Generates synthetic scrapes of increasing size and reports throughput and
+    peak memory of load, process, mapping rebuild and event linking at each.
+    """
+    corpus_options = {
+        "actions_per_bill": actions_per_bill,
+        "votes_per_bill": votes_per_bill,
+        "voters_per_vote": voters_per_vote,
+        "sessions": sessions,
+        "seed": seed,
+    }
+    # Runs are measured, not read: keep the pipeline's own output quiet
+    configure_logging("error")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        root = work_folder or Path(tmp)
+        for bills in scales:
+            scale_folder = root / f"{jur}_{bills}"
+            if scale_folder.exists():
+                shutil.rmtree(scale_folder)
+            print(f"⏱️ Benchmarking {bills} bills")
+            result = run_scale(
+                scale_folder,
+                jur,
+                bills,
+                {**corpus_options, "events": int(bills * events_per_bill)},
+                trace_memory=trace_memory,
+            )
+            results.append(result)
+            if not keep:
+                shutil.rmtree(scale_folder)
+
+    print(format_results(results))
+    if json_out:
+        json_out.parent.mkdir(parents=True, exist_ok=True)
+        write_json(
+            json_out,
+            {"jurisdiction": jur, "corpus": corpus_options, "results": results},
+        )
+        print(f"🧾 Saved benchmark results to {json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from pathlib import Path
+import click
+
+from utils.sqlite_store import export_sqlite_output
+
+
+@click.command()
+@click.option(
+    "--db",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    required=True,
+    help="SQLite output written by main.py --output-format sqlite.",
+)
+@click.option(
+    "--output-folder",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    required=True,
+    help="Folder to recreate the output tree in.",
+)
+def main(db: Path, output_folder: Path):
+    """
+    Recreates the folder output tree, byte-for-byte, from a SQLite output.
+    """
+    count = export_sqlite_output(db, output_folder)
+    print(f"✅ Exported {count} files to {output_folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
-from pathlib import Path
-import json
 import re
 from utils.file_utils import record_error_file, format_timestamp
+from utils.log_utils import get_logger
+from utils.output_writer import write_output
+from utils.path_registry import ensure_folder, session_path
+
+logger = get_logger(__name__)
 
 
 def clean_event_name(name: str) -> str:
@@ -25,7 +28,7 @@ def handle_event(
     event_id = content.get("_id") or filename.replace(".json", "")
     start_date = content.get("start_date")
     if not start_date:
-        print(f"⚠️ Event {event_id} missing start_date")
+        logger.debug("⚠️ Event %s missing start_date", event_id)
         record_error_file(
             error_folder,
             "from_handle_event_missing_start_date",
@@ -38,7 +41,7 @@ def handle_event(
     if not referenced_bill_id:
         referenced_bill_id = content.get("bill_identifier")
         if not referenced_bill_id:
-            print("⚠️ Warning: Event missing bill_identifier")
+            logger.debug("⚠️ Warning: Event missing bill_identifier in %s", filename)
             record_error_file(
                 error_folder,
                 "from_handle_event_missing_bill_identifier",
@@ -52,22 +55,12 @@ def handle_event(
     event_name = content.get("name", "event")
     short_name = clean_event_name(event_name)
 
-    base_path = Path(output_folder).joinpath(
-        f"country:us",
-        f"state:{STATE_ABBR}",
-        "sessions",
-        "ocd-session",
-        f"country:us",
-        f"state:{STATE_ABBR}",
-        date_folder,
-        session_name,
-        "events",
+    base_path = ensure_folder(
+        session_path(output_folder, STATE_ABBR, date_folder, session_name) / "events"
     )
-    base_path.mkdir(parents=True, exist_ok=True)
 
     output_file = base_path / f"{timestamp}_{short_name}.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(content, f, indent=2)
+    write_output(output_file, content, "event")
 
-    print(f"✅ Saved event: {referenced_bill_id}")
+    logger.debug("✅ Saved event: %s", referenced_bill_id)
     return True
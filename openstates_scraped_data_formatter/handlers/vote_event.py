@@ -1,6 +1,14 @@
-from pathlib import Path
-import json
 from utils.file_utils import record_error_file, write_vote_event_log
+from utils.log_utils import get_logger, warn
+from utils.manifest_utils import record_output
+from utils.output_writer import write_output
+from utils.path_registry import (
+    ensure_bill_folder,
+    placeholder_exists,
+    remember_placeholder,
+)
+
+logger = get_logger(__name__)
 
 
 def handle_vote_event(
@@ -30,7 +38,7 @@ def handle_vote_event(
     """
     referenced_bill_id = content.get("bill_identifier")
     if not referenced_bill_id:
-        print("⚠️ Warning: Vote missing bill_identifier")
+        logger.debug("⚠️ Warning: Vote missing bill_identifier in %s", filename)
         record_error_file(
             error_folder,
             "from_handle_vote_event_missing_bill_identifier",
@@ -40,30 +48,27 @@ def handle_vote_event(
         )
         return False
 
-    save_path = Path(output_folder).joinpath(
-        f"country:us",
-        f"state:{STATE_ABBR}",
-        "sessions",
-        "ocd-session",
-        f"country:us",
-        f"state:{STATE_ABBR}",
-        date_folder,
-        session_name,
-        "bills",
-        referenced_bill_id,
+    save_path = ensure_bill_folder(
+        output_folder, STATE_ABBR, date_folder, session_name, referenced_bill_id
     )
-    (save_path / "logs").mkdir(parents=True, exist_ok=True)
-    (save_path / "files").mkdir(parents=True, exist_ok=True)
 
     # Add placeholder if bill doesn't exist
     placeholder_file = save_path / "placeholder.json"
-    if not placeholder_file.exists():
+    if not placeholder_exists(placeholder_file):
         placeholder_content = {"identifier": referenced_bill_id, "placeholder": True}
-        with open(placeholder_file, "w", encoding="utf-8") as f:
-            json.dump(placeholder_content, f, indent=2)
-        print(f"📝 Created placeholder for missing bill {referenced_bill_id}")
+        write_output(placeholder_file, placeholder_content, "placeholder")
+        remember_placeholder(placeholder_file)
+        warn(
+            logger,
+            "placeholder_bill",
+            "📝 Created placeholder for missing bill %s",
+            referenced_bill_id,
+        )
+    else:
+        # Every vote on the bill keeps the shared placeholder alive
+        record_output(placeholder_file)
 
     # Save the full vote_event log
     write_vote_event_log(content, referenced_bill_id, save_path / "logs")
-    print(f"✅ Saved vote event for bill {referenced_bill_id}")
+    logger.debug("✅ Saved vote event for bill %s", referenced_bill_id)
     return True
@@ -1,16 +1,77 @@
 from pathlib import Path
+import time
 import click
-from tempfile import mkdtemp
 
-from utils.io_utils import load_json_files
+from utils.archive_utils import is_archive
+from utils.compression import compression_available
+from utils.io_utils import iter_json_files
+from utils.manifest_utils import (
+    discard_manifest,
+    fingerprint_inputs,
+    get_recorded_outputs,
+    load_manifest,
+    plan_incremental_run,
+    recorded_output_paths,
+    remove_stale_outputs,
+    save_manifest,
+    session_mapping_fingerprint,
+)
 from utils.file_utils import ensure_session_mapping
+from utils.session_utils import build_session_name_index
 from utils.interactive import clear_DATA_OUTPUT_FOLDER
-from utils.process_utils import process_and_save
+from utils.output_writer import (
+    close_outputs,
+    flush_background_writes,
+    get_write_errors,
+    get_write_stats,
+    open_outputs,
+    output_exists,
+    summarize_write_stats,
+)
+from utils.metrics import (
+    add_stage_metrics,
+    get_metrics,
+    timed_stage,
+    write_metrics_report,
+)
+from utils.log_utils import (
+    LOG_LEVELS,
+    configure_logging,
+    flush_logs,
+    get_logger,
+    log_warning_summary,
+)
+from utils.path_registry import reset_path_registry
+from utils.progress import DEFAULT_PROGRESS_INTERVAL, set_input_total
+from utils.pdf_downloader import download_bill_pdfs
+from utils.run_context import open_run
+from utils.session_cache import DEFAULT_SESSION_TTL, default_cache_folder
+from utils.sqlite_store import SQLITE_FILENAME
+from utils.staging_utils import staging_folder_for, swap_in_staging
+from utils.process_utils import (
+    bill_index_from_inputs,
+    process_and_save,
+    process_and_save_parallel,
+)
 from postprocessors.event_bill_linker import link_events_to_bills_pipeline
 
-# Define state abbreviation and paths
-BASE_FOLDER = Path(__file__).parent
-SESSION_MAPPING = {}
+logger = get_logger(__name__)
+
+
+def validate_input_path(ctx, param, value):
+    if value.is_file() and not is_archive(value):
+        raise click.BadParameter(
+            "must be a folder or a .tar, .tar.gz, .tgz, .tar.zst or .zip archive"
+        )
+    return value
+
+
+def validate_compress(ctx, param, value):
+    if not compression_available(value):
+        raise click.BadParameter(
+            f"{value} requires the 'zstandard' package (pip install zstandard)"
+        )
+    return value
 
 
 @click.command()
@@ -21,9 +82,10 @@ SESSION_MAPPING = {}
 )
 @click.option(
     "--input-folder",
-    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    type=click.Path(exists=True, file_okay=True, dir_okay=True, path_type=Path),
     required=True,
-    help="Path to the input folder containing JSON files.",
+    callback=validate_input_path,
+    help="Path to the input folder containing JSON files, or a .tar.gz/.tar.zst/.zip archive of them.",
 )
 @click.option(
     "--output-folder",
@@ -34,71 +96,646 @@ SESSION_MAPPING = {}
 @click.option(
     "--cache-folder",
     type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
-    default=mkdtemp(),
-    help="Path to a temporary cache folder.",
+    default=default_cache_folder,
+    show_default="~/.cache/openstates_scraped_data_formatter",
+    help="Cache shared across runs and jurisdictions (session lists, bill indexes, PDFs).",
+)
+@click.option(
+    "--session-ttl",
+    type=click.IntRange(min=0),
+    default=DEFAULT_SESSION_TTL,
+    show_default=True,
+    help="Seconds a cached session list is used before it is revalidated against the OpenStates API.",
 )
 @click.option(
     "--allow-session-fix/--no-allow-session-fix",
     default=True,
     help="Allow interactive session fixes when session names are missing.",
 )
+@click.option(
+    "--incremental/--no-incremental",
+    default=False,
+    help="Only reprocess inputs that changed since the last incremental run (tracked in input_manifest.json).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes used to parse and handle input files.",
+)
+@click.option(
+    "--write-threads",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Background threads writing output files (per worker); 0 writes inline.",
+)
+@click.option(
+    "--fsync-output/--no-fsync-output",
+    default=False,
+    help="fsync every output file before linking and finishing the run.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["folder", "sqlite"]),
+    default="folder",
+    help=f"Write the output tree as files, or as rows of output-folder/{SQLITE_FILENAME}.",
+)
+@click.option(
+    "--compress",
+    type=click.Choice(["none", "gzip", "zstd"]),
+    default="none",
+    callback=validate_compress,
+    help="Compress each processed and error output file (.json.gz / .json.zst).",
+)
+@click.option(
+    "--download-pdfs/--no-download-pdfs",
+    default=False,
+    help="Save each bill version's PDF into the bill's files/ folder (cached under cache-folder/pdfs).",
+)
+@click.option(
+    "--pdf-connections",
+    type=click.IntRange(min=1),
+    default=4,
+    help="Concurrent PDF downloads per host.",
+)
+@click.option(
+    "--metrics-out",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write per-stage timings, file/byte counts and error counts as JSON.",
+)
+@click.option(
+    "--log-level",
+    type=click.Choice(list(LOG_LEVELS)),
+    default="info",
+    help="Console verbosity; per-file messages are only shown at debug.",
+)
+@click.option(
+    "--log-json",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Also append every log record, down to debug, to this JSON-lines file.",
+)
+@click.option(
+    "--progress-interval",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_PROGRESS_INTERVAL,
+    show_default=True,
+    help="Seconds between progress lines (files/sec, MB/sec, done/total, ETA); 0 turns them off.",
+)
 def main(
     jur: str,
     input_folder: Path,
     output_folder: Path,
     cache_folder: Path,
+    session_ttl: int,
     allow_session_fix: bool,
+    incremental: bool,
+    workers: int,
+    write_threads: int,
+    fsync_output: bool,
+    output_format: str,
+    compress: str,
+    download_pdfs: bool,
+    pdf_connections: int,
+    metrics_out: Path,
+    log_level: str,
+    log_json: Path,
+    progress_interval: float,
 ):
+    if output_format == "sqlite" and incremental:
+        raise click.UsageError("--incremental requires --output-format folder")
+    if output_format == "sqlite" and download_pdfs:
+        raise click.UsageError("--download-pdfs requires --output-format folder")
+
+    configure_logging(log_level, log_json)
+    try:
+        run_pipeline(
+            jur,
+            input_folder,
+            output_folder,
+            cache_folder,
+            allow_session_fix=allow_session_fix,
+            incremental=incremental,
+            workers=workers,
+            write_threads=write_threads,
+            fsync_output=fsync_output,
+            output_format=output_format,
+            compress=compress,
+            download_pdfs=download_pdfs,
+            pdf_connections=pdf_connections,
+            session_ttl=session_ttl,
+            metrics_out=metrics_out,
+            progress_interval=progress_interval,
+        )
+    finally:
+        flush_logs()
+
+
+def run_pipeline(
+    jur: str,
+    input_folder: Path,
+    output_folder: Path,
+    cache_folder: Path,
+    allow_session_fix: bool = False,
+    incremental: bool = False,
+    workers: int = 1,
+    write_threads: int = 0,
+    fsync_output: bool = False,
+    output_format: str = "folder",
+    compress: str = "none",
+    download_pdfs: bool = False,
+    pdf_connections: int = 4,
+    session_ttl: int = DEFAULT_SESSION_TTL,
+    metrics_out: Path = None,
+    progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+) -> dict:
+    """
+    Runs the whole pipeline for one jurisdiction; the CLI options of main map
+    one-to-one onto the arguments.
+
+    Safe to call repeatedly in one process (e.g. by batch.py): everything the
+    run writes or accumulates lives in its own run context (see
+    utils.run_context).
+
+    Returns:
+        dict: {
+            "jurisdiction": jur,
+            "counts": {"bills": n, "votes": n, "events": n},
+            "write_stats": written/skipped files per category,
+            "link_counts": linker counts, or None if nothing was linked,
+            "write_errors": number of failed output writes,
+            "pdf_stats": download counts, or None without --download-pdfs,
+            "seconds": wall-clock duration,
+            "metrics": per-stage metrics (see utils.metrics),
+        }
+
+        The same summary is written to metrics_out as JSON when given. Stage
+        timings of worker processes and writer threads are summed, so they can
+        add up to more than the wall-clock duration.
+    """
+    if output_format == "sqlite" and incremental:
+        raise ValueError("--incremental requires --output-format folder")
+    if output_format == "sqlite" and download_pdfs:
+        raise ValueError("--download-pdfs requires --output-format folder")
+    if not compression_available(compress):
+        raise ValueError(f"--compress {compress} requires the 'zstandard' package")
+
+    started = time.perf_counter()
     STATE_ABBR = jur
-    DATA_PROCESSED_FOLDER = output_folder / "data_processed"
-    DATA_NOT_PROCESSED_FOLDER = output_folder / "data_not_processed"
-    EVENT_ARCHIVE_FOLDER = output_folder / "event_archive"
-    EVENT_ARCHIVE_FOLDER.mkdir(parents=True, exist_ok=True)
-    BILL_SESSION_MAPPING_FILE = BASE_FOLDER / "bill_session_mapping" / f"{STATE_ABBR}.json"
-    SESSION_MAPPING_FILE = BASE_FOLDER / "sessions" / f"{STATE_ABBR}.json"
-    SESSION_LOG_PATH = output_folder / "new_sessions_added.txt"
-
-    # 1. Clean previous outputs
-    clear_DATA_OUTPUT_FOLDER(output_folder)
-
-    # 2. Ensure state specific session mapping is available
-    SESSION_MAPPING.update(
-        ensure_session_mapping(STATE_ABBR, cache_folder, input_folder)
-    )
+    # ensure_session_mapping caches the session list under the cache folder,
+    # and the linker saves its bill-to-session index next to it
+    SESSION_MAPPING_FILE = cache_folder / "sessions" / f"{STATE_ABBR}.json"
+    BILL_SESSION_MAPPING_FILE = cache_folder / "bill_session_mapping" / f"{STATE_ABBR}.json"
 
-    # 3. Load and parse all input JSON files
-    all_json_files = load_json_files(
-        input_folder, EVENT_ARCHIVE_FOLDER, DATA_NOT_PROCESSED_FOLDER
-    )
+    with open_run(
+        jurisdiction=STATE_ABBR,
+        compression=None if compress == "none" else compress,
+        write_threads=write_threads,
+        fsync_output=fsync_output,
+        record_outputs=incremental,
+        collect_pdfs=download_pdfs,
+        progress_interval=progress_interval,
+    ) as run:
+        # 1. Ensure state specific session mapping is available
+        with timed_stage("session_resolution"):
+            SESSION_MAPPING, session_index = resolve_sessions(
+                STATE_ABBR, cache_folder, input_folder, session_ttl
+            )
 
-    # 4. Route and process by handler (returns counts)
-    counts = process_and_save(
-        STATE_ABBR,
-        all_json_files,
-        DATA_NOT_PROCESSED_FOLDER,
-        SESSION_MAPPING,
-        SESSION_LOG_PATH,
-        DATA_PROCESSED_FOLDER,
-    )
+        # 2. Build a fresh tree in a staging folder, or only redo what changed
+        # since the last incremental run (in place)
+        with timed_stage("prepare_output"):
+            plan = prepare_build(
+                run, input_folder, output_folder, SESSION_MAPPING, incremental, output_format
+            )
+        build_folder = plan["build_folder"]
+        DATA_PROCESSED_FOLDER = build_folder / "data_processed"
+        DATA_NOT_PROCESSED_FOLDER = build_folder / "data_not_processed"
+        EVENT_ARCHIVE_FOLDER = build_folder / "event_archive"
+        SESSION_LOG_PATH = build_folder / "new_sessions_added.txt"
+
+        # 3-4. Parse and route every input (wall time of load, parse, handle
+        # and write together)
+        with timed_stage("process"):
+            counts, archived_events, bill_index, input_bills = process_inputs(
+                STATE_ABBR,
+                input_folder,
+                EVENT_ARCHIVE_FOLDER,
+                DATA_NOT_PROCESSED_FOLDER,
+                SESSION_MAPPING,
+                SESSION_LOG_PATH,
+                DATA_PROCESSED_FOLDER,
+                session_index,
+                plan["filenames"],
+                workers,
+                allow_session_fix,
+            )
 
-    # 5. Link archived event logs to state sessions and save
-    if EVENT_ARCHIVE_FOLDER.exists():
-        print("Linking event references to related bills...")
-        link_events_to_bills_pipeline(
+        # Fetch the queued PDFs (before pruning, so they count as this run's outputs)
+        pdf_stats = None
+        if download_pdfs:
+            pdf_stats = save_bill_pdfs(run, cache_folder, pdf_connections)
+
+        # Drop outputs of changed or removed inputs that this run didn't rewrite
+        if incremental and plan["stale_inputs"]:
+            with timed_stage("stale_cleanup"):
+                remove_unclaimed_outputs(plan)
+
+        # Bills kept from an earlier incremental run aren't in the live index:
+        # rebuild it from each input's bill folder, in input order, as a full
+        # run would have recorded it
+        if incremental and plan["kept_inputs"]:
+            bill_index = merge_kept_bills(plan, input_bills)
+
+        # 5. Link archived event logs to state sessions and save
+        link_counts = link_events(
             STATE_ABBR,
             EVENT_ARCHIVE_FOLDER,
             DATA_PROCESSED_FOLDER,
             DATA_NOT_PROCESSED_FOLDER,
             BILL_SESSION_MAPPING_FILE,
             SESSION_MAPPING_FILE,
+            archived_events,
+            bill_index,
+            session_index,
+            SESSION_MAPPING,
+        )
+
+        # 6-7. Save the manifest and swap the finished tree in
+        with timed_stage("finalize"):
+            write_errors = finalize_build(
+                run, plan, output_folder, incremental, input_bills
+            )
+        write_stats = get_write_stats()
+        metrics = get_metrics()
+
+    summary = {
+        "jurisdiction": STATE_ABBR,
+        "counts": counts,
+        "write_stats": write_stats,
+        "link_counts": link_counts,
+        "write_errors": len(write_errors),
+        "pdf_stats": pdf_stats,
+        "seconds": round(time.perf_counter() - started, 3),
+        "metrics": metrics,
+    }
+    print_summary(summary, write_errors)
+    if metrics_out is not None:
+        write_metrics_report(
+            metrics_out,
+            {
+                **{key: value for key, value in summary.items() if key != "metrics"},
+                "workers": workers,
+                "write_threads": write_threads,
+                "incremental": incremental,
+                **summary["metrics"],
+            },
+        )
+        print(f"📊 Wrote run metrics to {metrics_out}")
+    return summary
+
+
+def resolve_sessions(STATE_ABBR, cache_folder, input_folder, session_ttl):
+    """
+    Returns the jurisdiction's session mapping and the reverse name index
+    shared by the formatter and the linker; names shared by several date
+    folders only fail when they are looked up.
+    """
+    SESSION_MAPPING = ensure_session_mapping(
+        STATE_ABBR, cache_folder, input_folder, ttl=session_ttl
+    )
+    return SESSION_MAPPING, build_session_name_index(SESSION_MAPPING)
+
+
+def prepare_build(
+    run, input_folder, output_folder, SESSION_MAPPING, incremental, output_format
+) -> dict:
+    """
+    Decides which folder the run builds and which inputs it processes, then
+    opens the run's outputs there.
+
+    An incremental run whose manifest still matches (same jurisdiction,
+    session mapping and compression) updates the live output in place and
+    only processes new or changed inputs. Every other run builds a fresh
+    tree in a staging folder, and the live output stays untouched until it
+    is swapped in (see finalize_build).
+
+    Returns:
+        dict: {
+            "build_folder": folder the run writes to,
+            "filenames": inputs to process, or None for all of them,
+            "session_fingerprint": see session_mapping_fingerprint,
+            "fingerprints": every input's fingerprint (incremental runs only),
+            "kept_inputs": manifest entries of unchanged inputs,
+            "stale_inputs": manifest entries whose outputs may be stale,
+        }
+    """
+    STATE_ABBR = run.jurisdiction
+    plan = {
+        "build_folder": output_folder,
+        "filenames": None,
+        "session_fingerprint": session_mapping_fingerprint(SESSION_MAPPING),
+        "fingerprints": None,
+        "kept_inputs": {},
+        "stale_inputs": {},
+    }
+    manifest = load_manifest(output_folder) if incremental else None
+    if (
+        manifest
+        and manifest.get("jurisdiction") == STATE_ABBR
+        and manifest.get("session_mapping") == plan["session_fingerprint"]
+        and manifest.get("compression") == run.compression
+    ):
+        # Without a manifest, a crash mid-run forces a full rebuild next time
+        discard_manifest(output_folder)
+        fingerprints = fingerprint_inputs(input_folder, manifest["inputs"])
+        to_process, plan["kept_inputs"], plan["stale_inputs"] = plan_incremental_run(
+            manifest["inputs"], fingerprints
+        )
+        plan["fingerprints"] = fingerprints
+        plan["filenames"] = [name for name in fingerprints if name in to_process]
+        set_input_total(len(plan["filenames"]))
+        logger.info(
+            f"♻️ Incremental run: {len(plan['filenames'])} new or changed inputs, "
+            f"{len(plan['kept_inputs'])} unchanged"
         )
     else:
-        print(
+        if incremental:
+            logger.info("♻️ No usable input manifest found — running a full rebuild")
+        # The live output stays untouched until the new tree replaces it
+        build_folder = plan["build_folder"] = staging_folder_for(output_folder)
+        if build_folder.exists():  # left over from a crashed run
+            clear_DATA_OUTPUT_FOLDER(build_folder)
+        build_folder.mkdir(parents=True)
+        # Nothing on disk can match, so skip the per-file comparison
+        run.compare_existing = False
+        if incremental:
+            plan["fingerprints"] = fingerprint_inputs(input_folder, {})
+
+    # Handlers hand their writes to a write-behind thread pool or a SQLite
+    # store when enabled
+    run.output_root = plan["build_folder"]
+    if output_format == "sqlite":
+        run.sqlite_path = plan["build_folder"] / SQLITE_FILENAME
+    open_outputs(run)
+    return plan
+
+
+def process_inputs(
+    STATE_ABBR,
+    input_folder,
+    EVENT_ARCHIVE_FOLDER,
+    DATA_NOT_PROCESSED_FOLDER,
+    SESSION_MAPPING,
+    SESSION_LOG_PATH,
+    DATA_PROCESSED_FOLDER,
+    session_index,
+    filenames,
+    workers,
+    allow_session_fix,
+):
+    """
+    Parses and routes the inputs (only filenames, when given), in this
+    process or across a pool of workers, and waits until every output is
+    written.
+
+    Returns:
+        tuple: (process_and_save counts,
+                parsed events kept for the linking stage so the archive
+                isn't re-read,
+                bill folders written this run, so the linker needn't glob
+                the output tree,
+                the bill folder each input wrote, for the input manifest)
+    """
+    archived_events = []
+    bill_index = {}
+    input_bills = {}
+    if workers > 1:
+        # 3-4. Parse and route chunks of the input across a process pool
+        if allow_session_fix:
+            logger.info("ℹ️ Interactive session fixes are disabled when --workers > 1")
+        counts = process_and_save_parallel(
+            STATE_ABBR,
+            input_folder,
+            EVENT_ARCHIVE_FOLDER,
+            DATA_NOT_PROCESSED_FOLDER,
+            SESSION_MAPPING,
+            SESSION_LOG_PATH,
+            DATA_PROCESSED_FOLDER,
+            workers,
+            event_sink=archived_events,
+            filenames=filenames,
+            bill_index=bill_index,
+            input_bills=input_bills,
+        )
+    else:
+        # 3. Stream input JSON files one at a time (nothing is materialized up front)
+        json_files = iter_json_files(
+            input_folder,
+            EVENT_ARCHIVE_FOLDER,
+            DATA_NOT_PROCESSED_FOLDER,
+            filenames=filenames,
+            event_sink=archived_events,
+        )
+
+        # 4. Route and process by handler as files stream in (returns counts)
+        counts = process_and_save(
+            STATE_ABBR,
+            json_files,
+            DATA_NOT_PROCESSED_FOLDER,
+            SESSION_MAPPING,
+            SESSION_LOG_PATH,
+            DATA_PROCESSED_FOLDER,
+            allow_session_fix=allow_session_fix,
+            bill_index=bill_index,
+            session_index=session_index,
+            input_bills=input_bills,
+        )
+
+    # Barrier: every processed file is on disk before stale outputs are pruned
+    # and events are linked
+    flush_background_writes()
+    return counts, archived_events, bill_index, input_bills
+
+
+def save_bill_pdfs(run, cache_folder, pdf_connections) -> dict:
+    """
+    Downloads the PDFs the run's bills queued (see queue_bill_pdfs) into
+    their files/ folders.
+
+    Returns:
+        dict: Download counts (see download_bill_pdfs).
+    """
+    logger.info(f"📄 Saving {len(run.pdf_jobs)} bill PDFs")
+    pdf_stats = download_bill_pdfs(
+        run.pdf_jobs, cache_folder / "pdfs", per_host=pdf_connections
+    )
+    add_stage_metrics(
+        "pdf_download",
+        pdf_stats["seconds"],
+        files=pdf_stats["downloaded"] + pdf_stats["cached"],
+        bytes_written=pdf_stats["bytes"],
+    )
+    return pdf_stats
+
+
+def merge_kept_bills(plan, input_bills) -> dict:
+    """
+    Returns the bill index of an incremental run: the bill folders of kept
+    inputs (saved in the manifest) and of this run's inputs, last input
+    wins in input order, so a bill identifier found in several sessions
+    resolves as in a full run.
+    """
+    bill_folders = {
+        name: entry.get("bill_folder") for name, entry in plan["kept_inputs"].items()
+    }
+    bill_folders.update(input_bills)
+    return bill_index_from_inputs(
+        bill_folders.get(name) for name in plan["fingerprints"]
+    )
+
+
+def remove_unclaimed_outputs(plan):
+    """
+    Removes the outputs of changed or removed inputs that neither this run
+    nor a kept input produced.
+    """
+    claimed = recorded_output_paths().union(
+        *(entry.get("outputs", []) for entry in plan["kept_inputs"].values())
+    )
+    removed = remove_stale_outputs(plan["build_folder"], plan["stale_inputs"], claimed)
+    # Pruning may have deleted folders the registry remembers
+    reset_path_registry()
+    logger.info(f"🧹 Removed {removed} stale outputs")
+
+
+def link_events(
+    STATE_ABBR,
+    EVENT_ARCHIVE_FOLDER,
+    DATA_PROCESSED_FOLDER,
+    DATA_NOT_PROCESSED_FOLDER,
+    BILL_SESSION_MAPPING_FILE,
+    SESSION_MAPPING_FILE,
+    archived_events,
+    bill_to_session,
+    session_index,
+    SESSION_MAPPING,
+):
+    """
+    Links the archived events to their bills' sessions and saves them.
+
+    Returns:
+        dict: Linker counts, or None when the run archived no events.
+    """
+    if not output_exists(EVENT_ARCHIVE_FOLDER):
+        logger.info(
             f"⚠️ Event archive folder {EVENT_ARCHIVE_FOLDER} does not exist. Skipping event linking.\n🚀 Processing complete."
         )
+        return None
+    logger.info("Linking event references to related bills...")
+    return link_events_to_bills_pipeline(
+        STATE_ABBR,
+        EVENT_ARCHIVE_FOLDER,
+        DATA_PROCESSED_FOLDER,
+        DATA_NOT_PROCESSED_FOLDER,
+        BILL_SESSION_MAPPING_FILE,
+        SESSION_MAPPING_FILE,
+        events=archived_events,
+        bill_to_session=bill_to_session,
+        session_index=session_index,
+        session_mapping=SESSION_MAPPING,
+    )
+
+
+def finalize_build(run, plan, output_folder, incremental, input_bills) -> list:
+    """
+    Closes the run's outputs, saves the input manifest of an incremental run
+    (with the outputs and bill folder of every input) and swaps a staged
+    tree in. A run with failed writes saves no manifest
+    and keeps serving the previous output.
+
+    Returns:
+        list: The run's failed writes (see get_write_errors).
+    """
+    STATE_ABBR = run.jurisdiction
+    build_folder = plan["build_folder"]
+    sqlite_output = run.sqlite_path is not None
+    close_outputs(run)
+    if sqlite_output:
+        logger.info(f"🗄️ Saved output to {output_folder / SQLITE_FILENAME}")
+    write_errors = get_write_errors()
+
+    # 6. Record which outputs each input produced for the next incremental run
+    if incremental and write_errors:
+        logger.warning("⚠️ Some outputs failed to write — not saving the input manifest")
+    elif incremental:
+        recorded = get_recorded_outputs()
+        fingerprints = plan["fingerprints"]
+        inputs = dict(plan["kept_inputs"])
+        filenames = plan["filenames"]
+        for name in filenames if filenames is not None else fingerprints:
+            inputs[name] = {**fingerprints[name], "outputs": recorded.get(name, [])}
+            if name in input_bills:
+                inputs[name]["bill_folder"] = input_bills[name]
+        save_manifest(
+            build_folder, STATE_ABBR, plan["session_fingerprint"], inputs, run.compression
+        )
+        logger.info(f"🧾 Saved input manifest ({len(inputs)} inputs)")
+
+    # 7. Swap the finished tree in; a failed build keeps serving the old output
+    if build_folder != output_folder:
+        if write_errors:
+            logger.warning(
+                f"⚠️ Some outputs failed to write — keeping the previous output; "
+                f"the partial build is in {build_folder}"
+            )
+        else:
+            swap_in_staging(build_folder, output_folder)
+            logger.info(f"🔁 Swapped the new output into {output_folder}")
+    return write_errors
+
+
+def print_summary(summary, write_errors):
+    """
+    Logs the run's warning summary, then prints the processing summary.
+    """
+    log_warning_summary(summary["metrics"])
+    # The summary below is printed directly, after everything logged so far
+    flush_logs()
     print("Processing summary:")
-    print(f"Bills saved: {counts.get('bills', 0)}")
-    print(f"Vote events saved: {counts.get('votes', 0)}")
+    counts = summary["counts"]
+    bill_files = summarize_write_stats(summary["write_stats"], ("bill", "action"))
+    vote_files = summarize_write_stats(
+        summary["write_stats"], ("vote_event", "placeholder")
+    )
+    print(
+        f"Bills saved: {counts.get('bills', 0)} "
+        f"(files written: {bill_files['written']}, unchanged: {bill_files['skipped']})"
+    )
+    print(
+        f"Vote events saved: {counts.get('votes', 0)} "
+        f"(files written: {vote_files['written']}, unchanged: {vote_files['skipped']})"
+    )
+    link_counts = summary["link_counts"]
+    if link_counts is not None:
+        print(
+            f"Events linked to bills: {link_counts['linked']} "
+            f"(unlinked: {link_counts['unlinked']}, "
+            f"ambiguous: {link_counts['ambiguous']}, "
+            f"without bill references: {link_counts['no_bill_refs']})"
+        )
+    pdf_stats = summary["pdf_stats"]
+    if pdf_stats is not None:
+        print(
+            f"PDFs saved: {pdf_stats['downloaded'] + pdf_stats['cached']} "
+            f"(downloaded: {pdf_stats['downloaded']}, from cache: {pdf_stats['cached']}, "
+            f"failed: {pdf_stats['failed']})"
+        )
+    if write_errors:
+        print(f"❌ Failed output writes: {len(write_errors)}")
+        for error in write_errors[:10]:
+            print(f"   {error['path']}: {error['error']}")
     # # TO delete later if not needed
     # print(f"Events saved: {counts.get('events', 0)}")
 
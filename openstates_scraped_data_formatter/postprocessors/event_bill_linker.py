@@ -1,12 +1,22 @@
-import json
 from pathlib import Path
 from postprocessors.helpers import (
+    build_bill_id_index,
+    resolve_bill_id,
     load_bill_to_session_mapping,
+    save_bill_to_session_mapping,
     extract_bill_ids_from_event,
     run_handle_event,
 )
 from utils.file_utils import list_json_files
-from utils.session_utils import load_session_mapping
+from utils.compression import read_output_json
+from utils.log_utils import get_logger
+from utils.manifest_utils import discard_output, set_current_input
+from utils.metrics import add_stage_metrics, timed_stage
+from utils.output_writer import list_output_folder, output_file_path, remove_output
+from utils.progress import advance_progress, set_progress_total
+from utils.session_utils import load_session_name_index
+
+logger = get_logger(__name__)
 
 
 def link_events_to_bills_pipeline(
@@ -16,84 +26,182 @@ def link_events_to_bills_pipeline(
     data_not_processed_folder: Path,
     bill_to_session_file: Path,
     session_mapping_file: Path,
+    events: list = None,
+    bill_to_session: dict = None,
+    session_index: dict = None,
+    session_mapping: dict = None,
 ):
     """
     Main pipeline for linking events to bills and saving them in the correct folder.
+
+    Args:
+        events (list, optional): Already parsed (filename, content) events from
+            the load stage. When given, the archive is not re-read; archived
+            copies are still removed once their event is linked.
+        bill_to_session (dict, optional): Live bill index recorded by
+            process_and_save. When given, the data_processed tree is not
+            globbed and the index is persisted to bill_to_session_file once
+            at the end. Otherwise the mapping is rebuilt from disk once.
+        session_index (dict, optional): Session name index already built by
+            the formatter; loaded from session_mapping_file when omitted.
+        session_mapping (dict, optional): {identifier: metadata}, used to turn
+            an event's legislative_session into a hint for ambiguous bill IDs.
+
+    Returns:
+        dict: {"linked": n, "unlinked": n, "ambiguous": n, "no_bill_refs": n}
+        event counts.
     """
-    print("\n📦 Starting event-to-bill linking pipeline")
-
-    session_mapping = load_session_mapping(session_mapping_file)
-    bill_to_session = load_bill_to_session_mapping(
-        bill_to_session_file,
-        data_processed_folder,
-        session_mapping=session_mapping,
-        force_rebuild=True,
+    logger.info("\n📦 Starting event-to-bill linking pipeline")
+
+    live_index = bill_to_session is not None
+    if not live_index:
+        if session_index is None:
+            session_index = load_session_name_index(session_mapping_file)
+        with timed_stage("mapping_rebuild"):
+            bill_to_session = load_bill_to_session_mapping(
+                bill_to_session_file,
+                data_processed_folder,
+                force_rebuild=True,
+                session_index=session_index,
+            )
+
+    logger.info("📂 Loaded %s bill-session mappings", len(bill_to_session))
+
+    if events is None:
+        event_files = list_json_files(event_archive_folder)
+        events = (
+            (event_file.name, read_output_json(event_file)) for event_file in event_files
+        )
+        set_progress_total("link", len(event_files))
+    else:
+        # Same order as a sorted scan of the archive folder
+        events = sorted(events, key=lambda event: event[0])
+        set_progress_total("link", len(events))
+
+    with timed_stage("event_linking"):
+        linked, counts = link_events(
+            state_abbr,
+            events,
+            bill_to_session,
+            data_processed_folder,
+            data_not_processed_folder,
+            session_mapping=session_mapping,
+        )
+        remove_linked_event_copies(
+            linked, event_archive_folder, data_not_processed_folder / "missing_session"
+        )
+    add_stage_metrics("event_linking", files=sum(counts.values()))
+
+    if live_index:
+        with timed_stage("mapping_rebuild"):
+            save_bill_to_session_mapping(bill_to_session_file, bill_to_session)
+
+    logger.info(
+        "🔗 Linked %s events to bills; %s reference unknown bills, %s ambiguous, "
+        "%s reference no bills",
+        counts["linked"],
+        counts["unlinked"],
+        counts["ambiguous"],
+        counts["no_bill_refs"],
     )
+    logger.info("\n✅ Event-to-bill linking complete")
+    return counts
 
-    print(f"📂 Loaded {len(bill_to_session)} bill-session mappings")
 
-    skipped = []
-    for event_file in list_json_files(event_archive_folder):
-        with open(event_file) as f:
-            content = json.load(f)
+def link_events(
+    state_abbr: str,
+    events,
+    bill_to_session: dict,
+    data_processed_folder: Path,
+    data_not_processed_folder: Path,
+    session_mapping: dict = None,
+):
+    """
+    Resolves and saves every event in a single pass over parsed events.
+
+    Each event is saved under the session of the first referenced bill that
+    resolves, exactly or through its normalized spelling ("H.B. 123" matches
+    a "HB 123" folder). Saving an event never adds a bill folder, so events
+    left unresolved here can't be resolved by a later pass either.
+
+    Args:
+        events: Iterable of (filename, content) pairs.
+        session_mapping (dict, optional): Resolves an event's
+            legislative_session to the session name used as a hint.
 
+    Returns:
+        tuple: (linked filenames in link order,
+                {"linked": n, "unlinked": n, "ambiguous": n, "no_bill_refs": n})
+    """
+    bill_id_index = build_bill_id_index(bill_to_session)
+    linked = []
+    counts = {"linked": 0, "unlinked": 0, "ambiguous": 0, "no_bill_refs": 0}
+    for filename, content in events:
+        advance_progress("link")
         bill_ids = extract_bill_ids_from_event(content)
         if not bill_ids:
+            counts["no_bill_refs"] += 1
             continue
 
-        for bill_id in bill_ids:
-            session_meta = bill_to_session.get(bill_id)
-            if session_meta:
-                run_handle_event(
-                    state_abbr,
-                    content,
-                    session_meta["name"],
-                    session_meta["date_folder"],
-                    data_processed_folder,
-                    data_not_processed_folder,
-                    bill_id,
-                    filename=event_file.name,
-                )
-                event_file.unlink()
-                missing_path = (
-                    data_not_processed_folder / "missing_session" / event_file.name
-                )
-                if missing_path.exists():
-                    missing_path.unlink()
+        session_hint = content.get("legislative_session")
+        if session_mapping and session_hint in session_mapping:
+            session_hint = session_mapping[session_hint]["name"]
+
+        bill_id, ambiguous = None, []
+        for raw in bill_ids:
+            bill_id, candidates = resolve_bill_id(
+                raw, bill_to_session, bill_id_index, session_hint
+            )
+            if bill_id:
                 break
-        else:
-            skipped.append((event_file, bill_ids))
+            if candidates:
+                ambiguous.append(f"{raw} -> {', '.join(candidates)}")
+        if bill_id is None:
+            if ambiguous:
+                logger.debug(
+                    "⚠️ Ambiguous bill references in %s: %s",
+                    filename,
+                    "; ".join(ambiguous),
+                )
+                counts["ambiguous"] += 1
+            else:
+                counts["unlinked"] += 1
+            continue
 
-    if skipped:
-        bill_to_session = load_bill_to_session_mapping(
-            bill_to_session_file,
+        set_current_input(filename)
+        session_meta = bill_to_session[bill_id]
+        run_handle_event(
+            state_abbr,
+            content,
+            session_meta["name"],
+            session_meta["date_folder"],
             data_processed_folder,
-            session_mapping=session_mapping,
-            force_rebuild=True,
+            data_not_processed_folder,
+            bill_id,
+            filename=filename,
         )
+        linked.append(filename)
+        counts["linked"] += 1
+
+    return linked, counts
+
+
+def remove_linked_event_copies(linked, event_archive_folder, missing_session_folder):
+    """
+    Deletes the archived and missing_session copies of linked events in one
+    batch, listing missing_session once instead of checking every event.
+    """
+    missing = list_output_folder(missing_session_folder)
+    archived = list_output_folder(event_archive_folder)
 
-        for event_file, bill_ids in skipped:
-            for bill_id in bill_ids:
-                session_meta = bill_to_session.get(bill_id)
-                if session_meta:
-                    with open(event_file) as f:
-                        content = json.load(f)
-                    run_handle_event(
-                        state_abbr,
-                        content,
-                        session_meta["name"],
-                        session_meta["date_folder"],
-                        data_processed_folder,
-                        data_not_processed_folder,
-                        referenced_bill_id=bill_id,
-                        filename=event_file.name,
-                    )
-                    event_file.unlink()
-                    missing_path = (
-                        data_not_processed_folder / "missing_session" / event_file.name
-                    )
-                    if missing_path.exists():
-                        missing_path.unlink()
-                    break
-
-    print("\n✅ Event-to-bill linking complete")
+    for filename in linked:
+        set_current_input(filename)
+        if filename in archived:
+            event_file = event_archive_folder / filename
+            remove_output(event_file)
+            discard_output(event_file)
+        missing_name = output_file_path(filename)
+        if missing_name in missing:
+            missing_path = missing_session_folder / missing_name
+            remove_output(missing_path)
+            discard_output(missing_path)
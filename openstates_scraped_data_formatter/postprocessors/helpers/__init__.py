@@ -1,10 +1,22 @@
-from .load_bill_to_session_mapping import load_bill_to_session_mapping
+from .load_bill_to_session_mapping import (
+    load_bill_to_session_mapping,
+    save_bill_to_session_mapping,
+)
+from .build_bill_id_index import (
+    build_bill_id_index,
+    normalize_bill_id,
+    resolve_bill_id,
+)
 from .extract_bill_ids_from_event import extract_bill_ids_from_event
 from .find_session_from_bill_id import find_session_from_bill_id
 from .run_handle_event import run_handle_event
 
 __all__ = [
     "load_bill_to_session_mapping",
+    "save_bill_to_session_mapping",
+    "build_bill_id_index",
+    "normalize_bill_id",
+    "resolve_bill_id",
     "extract_bill_ids_from_event",
     "find_session_from_bill_ids",
     "run_handle_event",
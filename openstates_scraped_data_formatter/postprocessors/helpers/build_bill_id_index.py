@@ -0,0 +1,66 @@
+import re
+
+# Punctuation and spacing that varies between spellings ("H.B. 123", "HB-123")
+_SEPARATORS = re.compile(r"[\s.\-_]+")
+# Chamber/type prefix, number without leading zeros, optional letter suffix
+_BILL_ID = re.compile(r"^([A-Z]+)0*(\d+)([A-Z]?)$")
+
+
+def normalize_bill_id(raw: str) -> str:
+    """
+    Returns the canonical form of a bill identifier, so "HB 123", "H.B. 123",
+    "hb-123" and "HB0123" all become "HB123".
+
+    Identifiers that don't look like prefix + number are only upper-cased and
+    stripped of separators.
+    """
+    compact = _SEPARATORS.sub("", raw).upper()
+    match = _BILL_ID.match(compact)
+    if not match:
+        return compact
+    prefix, number, suffix = match.groups()
+    return f"{prefix}{number}{suffix}"
+
+
+def build_bill_id_index(bill_to_session: dict) -> dict:
+    """
+    Builds a reverse index from normalized bill identifier to the bill IDs
+    (folder names) that share it, alongside the bill-to-session mapping.
+
+    Returns:
+        dict: {"HB123": ["HB 123"], "SB5": ["SB 5", "SB0005"], ...}
+    """
+    index = {}
+    for bill_id in bill_to_session:
+        index.setdefault(normalize_bill_id(bill_id), []).append(bill_id)
+    return index
+
+
+def resolve_bill_id(
+    raw: str, bill_to_session: dict, bill_id_index: dict, session_hint: str = None
+):
+    """
+    Resolves an event's bill reference to a bill ID in bill_to_session.
+
+    An exact match wins; otherwise the normalized spelling is looked up. When
+    several bills share the normalized spelling, session_hint (a session name)
+    may narrow them down to one; anything still ambiguous is not guessed.
+
+    Returns:
+        tuple: (bill_id or None, candidates) where candidates lists the
+        competing bill IDs when the reference was ambiguous.
+    """
+    if raw in bill_to_session:
+        return raw, []
+
+    candidates = bill_id_index.get(normalize_bill_id(raw), [])
+    if len(candidates) > 1 and session_hint:
+        hinted = [
+            bill_id
+            for bill_id in candidates
+            if bill_to_session[bill_id]["name"] == session_hint
+        ]
+        candidates = hinted or candidates
+    if len(candidates) == 1:
+        return candidates[0], []
+    return None, candidates
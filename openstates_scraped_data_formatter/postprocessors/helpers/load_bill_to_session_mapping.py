@@ -1,5 +1,9 @@
-import json
 from pathlib import Path
+from utils.json_codec import read_json, write_json
+from utils.log_utils import get_logger
+from utils.session_utils import build_session_name_index
+
+logger = get_logger(__name__)
 
 
 def load_bill_to_session_mapping(
@@ -7,6 +11,7 @@ def load_bill_to_session_mapping(
     data_processed_folder: Path,
     session_mapping: dict = None,
     force_rebuild: bool = False,
+    session_index: dict = None,
 ) -> dict:
     """
     Loads or rebuilds a mapping from bill IDs to full session metadata.
@@ -16,6 +21,9 @@ def load_bill_to_session_mapping(
         data_processed_folder (Path): Folder where processed bills are stored.
         session_mapping (dict): Optional session metadata with name and date_folder.
         force_rebuild (bool): If True, rebuild mapping from folder structure.
+        session_index (dict): Optional prebuilt {name: metadata} index (see
+            utils.session_utils.build_session_name_index); built from
+            session_mapping when omitted.
 
     Returns:
         dict: {
@@ -26,14 +34,15 @@ def load_bill_to_session_mapping(
         }
     """
     if mapping_file.exists() and not force_rebuild:
-        with open(mapping_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(mapping_file)
 
-    print("🔄 Rebuilding bill-to-session mapping from saved bill data...")
+    logger.info("🔄 Rebuilding bill-to-session mapping from saved bill data...")
     bill_to_session = {}
 
-    if session_mapping is None:
-        raise ValueError("❌ session_mapping is required when rebuilding.")
+    if session_index is None:
+        if session_mapping is None:
+            raise ValueError("❌ session_mapping is required when rebuilding.")
+        session_index = build_session_name_index(session_mapping)
 
     for bill_path in data_processed_folder.glob("**/bills/*"):
         if not bill_path.is_dir():
@@ -46,16 +55,23 @@ def load_bill_to_session_mapping(
             continue
 
         # Match session metadata
-        for meta in session_mapping.values():
-            if meta["name"] == session_name:
-                bill_to_session[bill_id] = {
-                    "name": session_name,
-                    "date_folder": meta["date_folder"],
-                }
-                break
-
-    with open(mapping_file, "w", encoding="utf-8") as f:
-        json.dump(bill_to_session, f, indent=2)
-    print(f"✅ Saved bill-to-session mapping to {mapping_file}")
+        meta = session_index.get(session_name)
+        if meta:
+            bill_to_session[bill_id] = {
+                "name": session_name,
+                "date_folder": meta["date_folder"],
+            }
+
+    save_bill_to_session_mapping(mapping_file, bill_to_session)
 
     return bill_to_session
+
+
+def save_bill_to_session_mapping(mapping_file: Path, bill_to_session: dict):
+    """
+    Persists a bill-to-session mapping (e.g. the live index built while
+    processing) in the same format load_bill_to_session_mapping reads.
+    """
+    mapping_file.parent.mkdir(parents=True, exist_ok=True)
+    write_json(mapping_file, bill_to_session)
+    logger.info("✅ Saved bill-to-session mapping to %s", mapping_file)
@@ -1,5 +1,8 @@
 from handlers.event import handle_event
 from pathlib import Path
+from utils.log_utils import get_logger, warn
+
+logger = get_logger(__name__)
 
 
 def run_handle_event(
@@ -35,4 +38,4 @@ def run_handle_event(
             bill_id,
         )
     except Exception as e:
-        print(f"❌ Failed to handle event {filename}: {e}")
+        warn(logger, "event_handler_failed", "❌ Failed to handle event %s: %s", filename, e)
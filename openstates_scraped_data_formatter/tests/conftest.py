@@ -0,0 +1,103 @@
+import contextlib
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+import main
+from benchmarks.regression import COUNT_RATIO, TIME_RATIO
+from tests.dir_comp import dirs_match
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory, monkeypatch):
+    """
+    Runs that don't pass --cache-folder use a temporary cache (outside the
+    test's tmp_path) instead of the user's ~/.cache.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("xdg_cache")))
+
+
+@pytest.fixture
+def sample_input():
+    """
+    The sample Illinois scrape that tests/sample_expected_out.tgz was built from.
+    """
+    return Path("tests/sample_input_files")
+
+
+@pytest.fixture
+def build_archive(sample_input):
+    """
+    Returns build(archive_path), which packs the sample input into a .zip or
+    .tar.gz archive (under il/) and returns its path.
+    """
+
+    def build(archive_path):
+        files = sorted(sample_input.glob("*.json"))
+        if archive_path.suffix == ".zip":
+            with zipfile.ZipFile(archive_path, "w") as zf:
+                for path in files:
+                    zf.write(path, f"il/{path.name}")
+        else:
+            with tarfile.open(archive_path, "w:gz") as tar:
+                for path in files:
+                    tar.add(path, f"il/{path.name}")
+        return archive_path
+
+    return build
+
+
+@pytest.fixture
+def run_main(sample_input):
+    """
+    Returns run(output_folder, *extra_args, input_folder=sample input), which
+    runs main.py for Illinois and returns the click result.
+    """
+
+    def run(output_folder, *extra_args, input_folder=sample_input):
+        return CliRunner().invoke(
+            main.main,
+            [
+                "--jur",
+                "il",
+                "--input-folder",
+                str(input_folder),
+                "--output-folder",
+                str(output_folder),
+                *extra_args,
+            ],
+        )
+
+    return run
+
+
+@pytest.fixture
+def assert_matches_expected():
+    """
+    Returns a check that an output folder matches tests/sample_expected_out.tgz.
+    """
+
+    def check(output_folder):
+        with tarfile.open("tests/sample_expected_out.tgz", "r:gz") as tar:
+            with tempfile.TemporaryDirectory() as tmpdirname:
+                with contextlib.chdir(tmpdirname):
+                    tar.extractall(filter="data")
+                    assert dirs_match("sample_expected_out", output_folder)
+
+    return check
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "performance regression gate")
+    group.addoption(
+        "--perf-timings",
+        action="store_true",
+        help="Also gate stage timings against the baseline (only meaningful on "
+        "the machine that recorded it; counts are always checked).",
+    )
+    group.addoption("--perf-time-ratio", type=float, default=TIME_RATIO)
+    group.addoption("--perf-count-ratio", type=float, default=COUNT_RATIO)
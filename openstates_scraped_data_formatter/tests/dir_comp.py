@@ -1,29 +1,43 @@
-import filecmp
+import os
 
+from utils.compression import read_output_bytes, strip_compression_suffix
 
-def dirs_match(dir1, dir2):
-    """Check if two directories match 100%"""
-    dcmp = filecmp.dircmp(dir1, dir2)
 
-    # Check if there are any differences at all
-    if dcmp.left_only or dcmp.right_only or dcmp.funny_files or dcmp.diff_files:
-        return False
+def _entries(folder):
+    """
+    Maps logical names (compression suffix stripped) to (is_dir, path).
+    """
+    with os.scandir(folder) as it:
+        return {
+            (entry.name if entry.is_dir() else strip_compression_suffix(entry.name)): (
+                entry.is_dir(),
+                entry.path,
+            )
+            for entry in it
+        }
 
-    # Recursively check subdirectories
-    for sub_dcmp in dcmp.subdirs.values():
-        if not dirs_match_recursive(sub_dcmp):
-            return False
 
-    return True
+def dirs_match(dir1, dir2):
+    """Check if two directories match 100%
 
+    Files are compared by content after decompression, so a tree written
+    with --compress matches its uncompressed equivalent.
+    """
+    left, right = _entries(dir1), _entries(dir2)
 
-def dirs_match_recursive(dcmp):
-    """Helper to check dircmp object recursively"""
-    if dcmp.left_only or dcmp.right_only or dcmp.funny_files or dcmp.diff_files:
+    # Check if there are any differences at all
+    if left.keys() != right.keys():
         return False
 
-    for sub_dcmp in dcmp.subdirs.values():
-        if not dirs_match_recursive(sub_dcmp):
+    for name, (left_is_dir, left_path) in left.items():
+        right_is_dir, right_path = right[name]
+        if left_is_dir != right_is_dir:
+            return False
+        # Recursively check subdirectories
+        if left_is_dir:
+            if not dirs_match(left_path, right_path):
+                return False
+        elif read_output_bytes(left_path) != read_output_bytes(right_path):
             return False
 
     return True
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "archive_name, extra_args",
+    [
+        ("il.tar.gz", []),
+        ("il.zip", []),
+        ("il.tar.gz", ["--workers", "3"]),
+    ],
+)
+def test_main_reads_archive_input(
+    tmp_path, archive_name, extra_args, build_archive, run_main, assert_matches_expected
+):
+    archive_path = build_archive(tmp_path / archive_name)
+    output_folder = tmp_path / "out"
+    result = run_main(
+        output_folder,
+        "--cache-folder",
+        str(tmp_path / "cache"),
+        *extra_args,
+        input_folder=archive_path,
+    )
+    assert result.exit_code == 0, result.output
+    assert "Found jurisdiction file" in result.output
+    assert_matches_expected(output_folder)
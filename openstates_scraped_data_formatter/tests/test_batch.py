@@ -0,0 +1,71 @@
+import contextlib
+import json
+import shutil
+import tarfile
+import tempfile
+
+from click.testing import CliRunner
+
+import batch
+from tests.dir_comp import dirs_match
+
+
+def test_batch_runs_each_jurisdiction(tmp_path):
+    input_root = tmp_path / "in"
+    input_root.mkdir()
+    shutil.copytree("tests/sample_input_files", input_root / "il")
+    # An unreadable jurisdiction file: this jurisdiction fails
+    (input_root / "broken").mkdir()
+    (input_root / "broken" / "jurisdiction_broken.json").write_text("{not json")
+    (input_root / "notes.txt").write_text("ignored")
+    output_root = tmp_path / "out"
+    summary_out = tmp_path / "summary.json"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        batch.main,
+        [
+            "--input-root",
+            str(input_root),
+            "--output-root",
+            str(output_root),
+            "--cache-folder",
+            str(tmp_path / "cache"),
+            "--log-folder",
+            str(tmp_path / "logs"),
+            "--summary-out",
+            str(summary_out),
+            "--concurrency",
+            "2",
+        ],
+    )
+    print(result.output)
+
+    # One failed jurisdiction fails the batch without stopping the others
+    assert result.exit_code == 1
+    summary = json.loads(summary_out.read_text())
+    by_jur = {job["jurisdiction"]: job for job in summary["jurisdictions"]}
+    assert set(by_jur) == {"il", "broken"}
+    assert by_jur["il"]["status"] == "ok"
+    assert by_jur["il"]["counts"]["bills"] == 101
+    assert by_jur["il"]["counts"]["votes"] == 109
+    assert by_jur["broken"]["status"].startswith("failed")
+    assert "Bills saved: 101" in (tmp_path / "logs" / "il.log").read_text()
+
+    with tarfile.open("tests/sample_expected_out.tgz", "r:gz") as tar:
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            with contextlib.chdir(tmpdirname):
+                tar.extractall(filter="data")
+                assert dirs_match("sample_expected_out", output_root / "il")
+
+
+def test_find_jurisdiction_inputs(tmp_path):
+    (tmp_path / "il").mkdir()
+    (tmp_path / "ca.tar.gz").write_bytes(b"")
+    (tmp_path / "tx.zip").write_bytes(b"")
+    (tmp_path / "readme.md").write_text("")
+
+    inputs = batch.find_jurisdiction_inputs(tmp_path)
+    assert sorted(inputs) == ["ca", "il", "tx"]
+    assert inputs["ca"] == tmp_path / "ca.tar.gz"
+    assert list(batch.find_jurisdiction_inputs(tmp_path, ("tx",))) == ["tx"]
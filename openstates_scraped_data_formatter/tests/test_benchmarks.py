@@ -0,0 +1,58 @@
+import json
+
+from click.testing import CliRunner
+
+import main
+from benchmarks import run_benchmarks
+from benchmarks.corpus import generate_corpus
+
+
+def test_corpus_is_deterministic_and_runs_through_main(tmp_path):
+    written = generate_corpus(tmp_path / "a", bills=40, events=10, unknown_bill_ratio=0.3)
+    generate_corpus(tmp_path / "b", bills=40, events=10, unknown_bill_ratio=0.3)
+    files = sorted(path.name for path in (tmp_path / "a").iterdir())
+    assert files == sorted(path.name for path in (tmp_path / "b").iterdir())
+    assert all(
+        (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+        for name in files
+    )
+    assert (written["bill"], written["vote_event"], written["event"]) == (40, 80, 10)
+
+    metrics_out = tmp_path / "metrics.json"
+    result = CliRunner().invoke(
+        main.main,
+        [
+            "--jur",
+            "il",
+            "--input-folder",
+            str(tmp_path / "a"),
+            "--output-folder",
+            str(tmp_path / "out"),
+            "--cache-folder",
+            str(tmp_path / "cache"),
+            "--metrics-out",
+            str(metrics_out),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(metrics_out.read_text())
+    assert (report["counts"]["bills"], report["counts"]["votes"]) == (40, 80)
+    link_counts = report["link_counts"]
+    assert link_counts["linked"] + link_counts["unlinked"] == 10
+    assert link_counts["linked"] and link_counts["unlinked"]
+
+
+def test_benchmark_runner(tmp_path):
+    json_out = tmp_path / "bench.json"
+    result = CliRunner().invoke(
+        run_benchmarks.main,
+        ["--scales", "20,40", "--no-trace-memory", "--json-out", str(json_out)],
+    )
+    assert result.exit_code == 0, result.output
+    results = json.loads(json_out.read_text())["results"]
+
+    assert [r["bills"] for r in results] == [20, 40]
+    for r in results:
+        assert set(r["stages"]) == set(run_benchmarks.STAGES)
+        assert r["counts"]["bills"] == r["bills"]
+        assert r["stages"]["mapping_rebuild"]["files"] == r["bills"]
@@ -0,0 +1,36 @@
+from postprocessors.helpers import (
+    build_bill_id_index,
+    normalize_bill_id,
+    resolve_bill_id,
+)
+
+BILLS = {
+    "HB 123": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+    "SB 5": {"name": "103rd General Assembly", "date_folder": "2023-2024"},
+    "SB0005": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+}
+
+
+def test_normalize_common_spellings():
+    for raw in ("HB 123", "H.B. 123", "hb-123", "HB0123", " HB_123 "):
+        assert normalize_bill_id(raw) == "HB123"
+    assert normalize_bill_id("SJR 5A") == "SJR5A"
+    assert normalize_bill_id("Executive Order 7") == "EXECUTIVEORDER7"
+
+
+def test_resolve_exact_and_normalized_matches():
+    index = build_bill_id_index(BILLS)
+
+    assert resolve_bill_id("HB 123", BILLS, index) == ("HB 123", [])
+    assert resolve_bill_id("H.B. 0123", BILLS, index) == ("HB 123", [])
+    assert resolve_bill_id("HB 999", BILLS, index) == (None, [])
+
+
+def test_ambiguous_matches_are_reported_unless_hinted():
+    index = build_bill_id_index(BILLS)
+
+    assert resolve_bill_id("S.B. 5", BILLS, index) == (None, ["SB 5", "SB0005"])
+    assert resolve_bill_id("S.B. 5", BILLS, index, "104th General Assembly") == (
+        "SB0005",
+        [],
+    )
@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+
+from utils import compression, output_writer
+from utils.compression import compress_bytes, decompress_bytes, read_output_json
+from utils.run_context import open_run
+
+
+def test_gzip_output_is_deterministic_and_readable(tmp_path):
+    raw = b'{\n  "identifier": "HB1"\n}'
+    compressed = compress_bytes(raw, "gzip")
+    assert compressed == compress_bytes(raw, "gzip")
+    assert gzip.decompress(compressed) == raw
+
+    (tmp_path / "bill.json.gz").write_bytes(compressed)
+    (tmp_path / "bill.json").write_bytes(raw)
+    assert read_output_json(tmp_path / "bill.json.gz") == {"identifier": "HB1"}
+    assert read_output_json(tmp_path / "bill.json") == {"identifier": "HB1"}
+
+
+def test_unchanged_compressed_output_is_not_rewritten(tmp_path):
+    path = tmp_path / "20250101T000000Z_entire_bill.json"
+    with open_run(compression="gzip"):
+        assert output_writer.write_output(path, {"identifier": "HB1"}, "bill")
+        assert not output_writer.write_output(path, {"identifier": "HB1"}, "bill")
+
+    assert [p.name for p in tmp_path.iterdir()] == [path.name + ".gz"]
+
+
+def test_compressed_output_matches_expected(tmp_path, run_main, assert_matches_expected):
+    output_folder = tmp_path / "out"
+    result = run_main(output_folder, "--compress", "gzip")
+    assert result.exit_code == 0, result.output
+    assert not list(output_folder.glob("data_processed/**/*.json"))
+    assert_matches_expected(output_folder)
+
+
+def test_zstd_output_round_trips(tmp_path, run_main, assert_matches_expected):
+    pytest.importorskip("zstandard")
+    raw = b'{\n  "identifier": "HB1"\n}'
+    compressed = compress_bytes(raw, "zstd")
+    assert compressed == compress_bytes(raw, "zstd")
+    assert decompress_bytes(compressed) == raw
+
+    output_folder = tmp_path / "out"
+    result = run_main(output_folder, "--compress", "zstd")
+    assert result.exit_code == 0, result.output
+    assert list(output_folder.glob("data_processed/**/*.json.zst"))
+    assert_matches_expected(output_folder)
+
+
+def test_zstd_without_backend_fails_before_writing(tmp_path, monkeypatch, run_main):
+    monkeypatch.setattr(compression, "zstandard", None)
+    monkeypatch.setattr(compression, "stdlib_zstd", None)
+
+    result = run_main(tmp_path / "out", "--compress", "zstd")
+
+    assert result.exit_code == 2
+    assert "requires the 'zstandard' package" in result.output
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,132 @@
+import json
+import os
+
+from postprocessors.event_bill_linker import link_events_to_bills_pipeline
+from utils.io_utils import archive_event_file
+
+EVENT = {
+    "name": "Executive Committee Hearing",
+    "start_date": "2025-03-04T10:00:00",
+    "agenda": [
+        {"related_entities": [{"entity_type": "bill", "name": "HB935"}]},
+    ],
+}
+SESSION = {"name": "104th Regular Session", "date_folder": "2025-2025"}
+
+
+def test_archive_is_a_copy_of_the_input(tmp_path):
+    source = tmp_path / "event_1.json"
+    source.write_text(json.dumps(EVENT, indent=2), encoding="utf-8")
+    archive_path = tmp_path / "archive_event_1.json"
+    # An archive hardlinked to the input by an older run
+    os.link(source, archive_path)
+
+    archive_event_file(archive_path, EVENT)
+    # The scraper rewrites its input in place
+    source.write_text(json.dumps({"rewritten": True}), encoding="utf-8")
+
+    assert not os.path.samefile(source, archive_path)
+    assert archive_path.read_text(encoding="utf-8") == json.dumps(EVENT, indent=2)
+
+
+def test_archive_rewrites_non_canonical_event(tmp_path):
+    source = tmp_path / "event_1.json"
+    source.write_text(json.dumps(EVENT), encoding="utf-8")
+    archive_path = tmp_path / "archive_event_1.json"
+
+    archive_event_file(archive_path, EVENT)
+
+    assert archive_path.read_text(encoding="utf-8") == json.dumps(EVENT, indent=2)
+
+
+def test_linker_uses_parsed_events_without_rereading_archive(tmp_path):
+    processed = tmp_path / "data_processed"
+    session_folder = processed.joinpath(
+        "country:us", "state:il", "sessions", "ocd-session", "country:us",
+        "state:il", SESSION["date_folder"], SESSION["name"],
+    )
+    (session_folder / "bills" / "HB935" / "logs").mkdir(parents=True)
+    session_mapping_file = tmp_path / "sessions.json"
+    session_mapping_file.write_text(json.dumps({"104th": SESSION}), encoding="utf-8")
+
+    archive = tmp_path / "event_archive"
+    archive.mkdir()
+    # The archived copy is unreadable on purpose: only the parsed event is used
+    (archive / "event_1.json").write_text("not json", encoding="utf-8")
+
+    link_events_to_bills_pipeline(
+        "il",
+        archive,
+        processed,
+        tmp_path / "data_not_processed",
+        tmp_path / "bill_to_session.json",
+        session_mapping_file,
+        events=[("event_1.json", EVENT)],
+    )
+
+    saved = session_folder / "events" / "20250304T100000Z_executive_committee_hearing.json"
+    assert json.loads(saved.read_text(encoding="utf-8")) == EVENT
+    assert not (archive / "event_1.json").exists()
+
+
+def test_linker_uses_live_bill_index_without_scanning_output(tmp_path):
+    processed = tmp_path / "data_processed"
+    session_folder = processed.joinpath(
+        "country:us", "state:il", "sessions", "ocd-session", "country:us",
+        "state:il", SESSION["date_folder"], SESSION["name"],
+    )
+    # No bill folder and no session mapping file: only the index can resolve HB935
+    processed.mkdir()
+    archive = tmp_path / "event_archive"
+    archive.mkdir()
+    (archive / "event_1.json").write_text(json.dumps(EVENT, indent=2), encoding="utf-8")
+    mapping_file = tmp_path / "bill_to_session.json"
+
+    link_events_to_bills_pipeline(
+        "il",
+        archive,
+        processed,
+        tmp_path / "data_not_processed",
+        mapping_file,
+        tmp_path / "missing_sessions.json",
+        events=[("event_1.json", EVENT)],
+        bill_to_session={"HB935": SESSION},
+    )
+
+    assert (session_folder / "events").is_dir()
+    assert not (archive / "event_1.json").exists()
+    assert json.loads(mapping_file.read_text(encoding="utf-8")) == {"HB935": SESSION}
+
+
+def test_linker_reports_counts_and_removes_linked_copies(tmp_path):
+    archive = tmp_path / "event_archive"
+    archive.mkdir()
+    missing_session = tmp_path / "data_not_processed" / "missing_session"
+    missing_session.mkdir(parents=True)
+    unknown_bill = {
+        **EVENT,
+        "agenda": [{"related_entities": [{"entity_type": "bill", "name": "SB1"}]}],
+    }
+    events = [
+        ("event_1.json", EVENT),
+        ("event_2.json", unknown_bill),
+        ("event_3.json", {**EVENT, "agenda": []}),
+    ]
+    for filename, content in events:
+        (archive / filename).write_text(json.dumps(content), encoding="utf-8")
+    (missing_session / "event_1.json").write_text("{}", encoding="utf-8")
+
+    counts = link_events_to_bills_pipeline(
+        "il",
+        archive,
+        tmp_path / "data_processed",
+        tmp_path / "data_not_processed",
+        tmp_path / "bill_to_session.json",
+        tmp_path / "missing_sessions.json",
+        events=events,
+        bill_to_session={"HB935": SESSION},
+    )
+
+    assert counts == {"linked": 1, "unlinked": 1, "ambiguous": 0, "no_bill_refs": 1}
+    assert sorted(p.name for p in archive.iterdir()) == ["event_2.json", "event_3.json"]
+    assert not (missing_session / "event_1.json").exists()
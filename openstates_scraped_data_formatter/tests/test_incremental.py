@@ -0,0 +1,152 @@
+import io
+import json
+import shutil
+import tarfile
+
+import pytest
+
+from tests.dir_comp import dirs_match
+
+
+@pytest.fixture
+def run(run_main):
+    def run(input_folder, output_folder, cache_folder, *extra_args):
+        result = run_main(
+            output_folder,
+            "--cache-folder",
+            str(cache_folder),
+            *extra_args,
+            input_folder=input_folder,
+        )
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    return run
+
+
+def assert_same_tree(expected, actual):
+    for name in ("data_processed", "data_not_processed"):
+        assert dirs_match(expected / name, actual / name), name
+
+
+def test_incremental_run_matches_full_rebuild(tmp_path, sample_input, run):
+    input_folder = tmp_path / "input"
+    shutil.copytree(sample_input, input_folder)
+    output_folder = tmp_path / "out"
+    cache_folder = tmp_path / "cache"
+
+    output = run(input_folder, output_folder, cache_folder, "--incremental")
+    assert "running a full rebuild" in output
+    assert (output_folder / "input_manifest.json").exists()
+
+    output = run(input_folder, output_folder, cache_folder, "--incremental")
+    assert "0 new or changed inputs" in output
+
+    # Change one bill, drop one vote and one bill, then compare with a full run
+    bill_files = sorted(input_folder.glob("bill_*.json"))
+    changed = json.loads(bill_files[0].read_text(encoding="utf-8"))
+    changed["actions"][0]["description"] = "Changed description"
+    bill_files[0].write_text(json.dumps(changed), encoding="utf-8")
+    bill_files[1].unlink()
+    sorted(input_folder.glob("vote_event_*.json"))[0].unlink()
+
+    output = run(input_folder, output_folder, cache_folder, "--incremental")
+    assert "1 new or changed inputs" in output
+
+    full_output_folder = tmp_path / "full"
+    run(input_folder, full_output_folder, cache_folder)
+    assert_same_tree(full_output_folder, output_folder)
+
+
+def test_incremental_run_relinks_events_when_a_bill_is_removed(
+    tmp_path, sample_input, run
+):
+    input_folder = tmp_path / "input"
+    shutil.copytree(sample_input, input_folder)
+    event = {
+        "name": "Committee Hearing",
+        "start_date": "2025-03-20T10:00:00",
+        "agenda": [{"related_entities": [{"entity_type": "bill", "name": "HB907"}]}],
+    }
+    (input_folder / "event_hearing.json").write_text(json.dumps(event), encoding="utf-8")
+    output_folder = tmp_path / "out"
+    cache_folder = tmp_path / "cache"
+
+    output = run(input_folder, output_folder, cache_folder, "--incremental")
+    assert "Events linked to bills: 1 " in output
+    # The linker's bill index is kept in the cache, not the source tree
+    assert (cache_folder / "bill_session_mapping" / "il.json").exists()
+
+    # Remove the linked bill and its votes; the event input itself is unchanged
+    for path in list(input_folder.glob("*.json")):
+        content = json.loads(path.read_text(encoding="utf-8"))
+        if "HB907" in (content.get("identifier"), content.get("bill_identifier")):
+            path.unlink()
+
+    output = run(input_folder, output_folder, cache_folder, "--incremental")
+    assert "Events linked to bills: 0 " in output
+
+    full_output_folder = tmp_path / "full"
+    run(input_folder, full_output_folder, cache_folder)
+    assert_same_tree(full_output_folder, output_folder)
+    assert dirs_match(full_output_folder / "event_archive", output_folder / "event_archive")
+    assert not list(output_folder.glob("data_processed/**/events/*.json"))
+
+
+def write_archive(archive_path, members):
+    with tarfile.open(archive_path, "w:gz") as tar:
+        for name, content in members:
+            raw = json.dumps(content).encode("utf-8")
+            info = tarfile.TarInfo(f"il/{name}")
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+
+
+def test_incremental_run_resolves_bills_in_several_sessions_like_a_full_run(
+    tmp_path, sample_input, run
+):
+    # An archive keeps the input order fixed. Each of the first bills is
+    # scraped again in another session, before the original for half of
+    # them and after it for the rest, so the last input wins differently
+    # per bill whichever order the output folders are listed in
+    members = [
+        (path.name, json.loads(path.read_text(encoding="utf-8")))
+        for path in sorted(sample_input.glob("*.json"))
+    ]
+    bills = [(name, content) for name, content in members if name.startswith("bill_")]
+    for i, (name, content) in enumerate(bills[:6]):
+        rescrape = (f"bill_rescrape_{i}.json", {**content, "legislative_session": "103rd"})
+        index = members.index((name, content))
+        members.insert(index if i % 2 else index + 1, rescrape)
+        event = {
+            "name": f"Hearing {i}",
+            "start_date": "2025-03-20T10:00:00",
+            "agenda": [
+                {
+                    "related_entities": [
+                        {"entity_type": "bill", "name": content["identifier"]}
+                    ]
+                }
+            ],
+        }
+        members.append((f"event_hearing_{i}.json", event))
+    archive = tmp_path / "il.tar.gz"
+    write_archive(archive, members)
+    output_folder = tmp_path / "out"
+    cache_folder = tmp_path / "cache"
+    run(archive, output_folder, cache_folder, "--incremental")
+
+    # Change an unrelated bill: every other bill input is kept
+    name, content = bills[-1]
+    changed = json.loads(json.dumps(content))
+    changed["actions"][0]["description"] = "Changed description"
+    members[members.index((name, content))] = (name, changed)
+    write_archive(archive, members)
+    output = run(archive, output_folder, cache_folder, "--incremental", "--workers", "3")
+    # The changed bill and every event, which is relinked
+    assert "7 new or changed inputs" in output
+
+    full_output_folder = tmp_path / "full"
+    run(archive, full_output_folder, cache_folder)
+    assert_same_tree(full_output_folder, output_folder)
+    assert len(list(output_folder.glob("data_processed/**/events/*.json"))) == 6
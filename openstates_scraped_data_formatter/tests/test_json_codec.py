@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from utils import json_codec
+
+EDGE_CASES = [
+    {"empty_list": [], "empty_dict": {}, "nested": [[], {"a": None}]},
+    {"text": "é — “quoted” 😀 \x7f \x00 \t \n \" \\ /"},
+    {"floats": [0.1, 1.0, -0.0, 1e16, 1.5e-05, 0.0001, 123456789.123, 1e-9]},
+    {"special": [float("nan"), float("inf"), -float("inf")]},
+    {"ints": [0, -1, 2**63 - 1, 2**64 - 1, 2**64, -(2**63), -(2**63) - 1, -(2**70)]},
+    {1: "non-string key", "b": True},
+    [],
+    "plain string",
+]
+
+
+def test_dumps_matches_stdlib_on_sample_input():
+    for path in Path("tests/sample_input_files").glob("*.json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        assert json_codec.dumps(data) == json.dumps(data, indent=2), path.name
+
+
+@pytest.mark.skipif(json_codec.orjson is None, reason="orjson not installed")
+def test_orjson_path_matches_stdlib_on_bills(monkeypatch):
+    # Bills are full of OCD ids with hex digits ("...-9eaa-...") and dates;
+    # none of them may push dumps onto the stdlib fallback
+    expected = {}
+    for path in Path("tests/sample_input_files").glob("*.json"):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        expected[path.name] = (data, json.dumps(data, indent=2))
+
+    def no_fallback(*args, **kwargs):
+        raise AssertionError("fell back to the stdlib")
+
+    monkeypatch.setattr(json_codec, "json", SimpleNamespace(dumps=no_fallback))
+    for name, (data, text) in expected.items():
+        assert json_codec.dumps(data) == text, name
+
+
+def test_dumps_matches_stdlib_on_edge_cases():
+    for data in EDGE_CASES:
+        assert json_codec.dumps(data) == json.dumps(data, indent=2)
+
+
+def test_loads_round_trips_like_stdlib():
+    for data in EDGE_CASES:
+        text = json.dumps(data, indent=2)
+        # repr, as NaN != NaN
+        assert repr(json_codec.loads(text)) == repr(json.loads(text))
+        assert repr(json_codec.loads(text.encode("utf-8"))) == repr(json.loads(text))
+
+    for raw in [
+        "[NaN, Infinity]",
+        "[1e400]",
+        str(10**30),
+        str(-(10**19) + 1),
+        '"\\ud800"',
+    ]:
+        assert json_codec.dumps(json_codec.loads(raw)) == json.dumps(
+            json.loads(raw), indent=2
+        )
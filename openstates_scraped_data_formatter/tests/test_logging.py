@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+
+
+@pytest.fixture
+def run(tmp_path, run_main):
+    def run(input_folder, *extra_args):
+        result = run_main(
+            tmp_path / "out",
+            "--cache-folder",
+            str(tmp_path / "cache"),
+            "--no-allow-session-fix",
+            *extra_args,
+            input_folder=input_folder,
+        )
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    return run
+
+
+def test_per_file_messages_are_aggregated(tmp_path, run):
+    input_folder = tmp_path / "in"
+    generate_corpus(input_folder, bills=12, actions_per_bill=0, votes_per_bill=1, events=0)
+    log_json = tmp_path / "log.jsonl"
+
+    output = run(input_folder, "--log-json", str(log_json))
+
+    assert "Saved bill" not in output
+    assert "missing action dates" in output
+    assert output.count("missing action dates") == 1
+    assert "⚠️ 12 bills missing action dates" in output
+    # The summary still comes last
+    assert output.index("bills missing action dates") < output.index("Bills saved: 12")
+
+    records = [json.loads(line) for line in log_json.read_text().splitlines()]
+    per_file = [r for r in records if r.get("category") == "bill_missing_action_dates"]
+    assert len([r for r in per_file if r["level"] == "debug"]) == 12
+    summary = [r for r in per_file if r["level"] == "warning"]
+    assert [r["count"] for r in summary] == [12]
+    assert sum(r["message"].startswith("✅ Saved bill") for r in records) == 12
+
+
+def test_log_levels(sample_input, run):
+    quiet = run(sample_input, "--log-level", "warning")
+    assert "Found jurisdiction file" not in quiet
+    assert "⚠️ 1 files saved to data_not_processed/missing_session" in quiet
+    assert "Bills saved: 101" in quiet
+
+    debug = run(sample_input, "--log-level", "debug")
+    assert debug.count("✅ Saved bill ") == 101
+    assert debug.count("✅ Saved vote event for bill ") == 109
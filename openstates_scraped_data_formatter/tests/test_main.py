@@ -38,3 +38,61 @@ def test_main(tmpdir):
                 assert dirs_match("sample_expected_out", output_folder)
 
     assert result.exit_code == 0
+
+
+def test_main_with_workers(tmpdir):
+    input_folder = "tests/sample_input_files"
+    output_folder = tmpdir.mkdir("out")
+    runner = CliRunner()
+    result = runner.invoke(
+        main.main,
+        [
+            "--jur",
+            "il",
+            "--input-folder",
+            input_folder,
+            "--output-folder",
+            output_folder,
+            "--workers",
+            "4",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    with tarfile.open("tests/sample_expected_out.tgz", "r:gz") as tar:
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            with contextlib.chdir(tmpdirname):
+                tar.extractall(filter="data")
+                assert dirs_match("sample_expected_out", output_folder)
+
+    assert "Bills saved: 101" in result.output
+    assert "Vote events saved: 109" in result.output
+
+
+def test_main_with_write_threads(tmpdir):
+    input_folder = "tests/sample_input_files"
+    output_folder = tmpdir.mkdir("out")
+    runner = CliRunner()
+    result = runner.invoke(
+        main.main,
+        [
+            "--jur",
+            "il",
+            "--input-folder",
+            input_folder,
+            "--output-folder",
+            output_folder,
+            "--write-threads",
+            "4",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    with tarfile.open("tests/sample_expected_out.tgz", "r:gz") as tar:
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            with contextlib.chdir(tmpdirname):
+                tar.extractall(filter="data")
+                assert dirs_match("sample_expected_out", output_folder)
+
+    assert "Bills saved: 101" in result.output
+    assert "Failed output writes" not in result.output
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def run_with_metrics(tmp_path, run_main):
+    def run(name, *extra_args):
+        metrics_out = tmp_path / f"{name}.json"
+        result = run_main(
+            tmp_path / name,
+            "--cache-folder",
+            str(tmp_path / "cache"),
+            "--metrics-out",
+            str(metrics_out),
+            *extra_args,
+        )
+        assert result.exit_code == 0, result.output
+        return json.loads(metrics_out.read_text())
+
+    return run
+
+
+def test_metrics_report(run_with_metrics):
+    report = run_with_metrics("serial")
+    stages = report["stages"]
+
+    assert report["counts"]["bills"] == 101
+    assert stages["load"]["files"] == 211
+    assert stages["load"]["bytes_read"] > 0
+    assert stages["parse"]["files"] == 211
+    assert stages["handle_bill"]["files"] == 101
+    assert stages["handle_vote_event"]["files"] == 109
+    assert stages["write_bill"]["files"] == 101
+    assert stages["write_action"]["bytes_written"] > 0
+    assert report["errors"] == {"missing_session": 1}
+    for stage in ("session_resolution", "prepare_output", "process", "finalize"):
+        assert stage in stages
+
+    # Workers' metrics are merged: the same work is counted once
+    parallel = run_with_metrics("parallel", "--workers", "2")
+    for stage in ("load", "parse", "handle_bill", "write_bill", "write_action"):
+        for key in ("files", "bytes_read", "bytes_written"):
+            assert parallel["stages"][stage][key] == stages[stage][key]
+    assert parallel["stages"]["shard_scan"]["files"] == 211
+    assert parallel["errors"] == report["errors"]
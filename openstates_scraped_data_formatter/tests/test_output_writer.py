@@ -0,0 +1,82 @@
+import os
+import threading
+
+from utils import output_writer
+from utils.run_context import open_run
+
+
+def test_write_output_skips_identical_content(tmp_path):
+    path = tmp_path / "20250101T000000Z_entire_bill.json"
+
+    with open_run():
+        assert output_writer.write_output(path, {"identifier": "HB1"}, "bill")
+        os.utime(path, ns=(0, 0))
+        assert not output_writer.write_output(path, {"identifier": "HB1"}, "bill")
+        assert os.stat(path).st_mtime_ns == 0
+        assert output_writer.write_output(path, {"identifier": "HB2"}, "bill")
+
+        assert output_writer.get_write_stats() == {"bill": {"written": 2, "skipped": 1}}
+
+
+def test_background_writer_flushes_and_collects_errors(tmp_path):
+    with open_run(write_threads=3, max_pending_writes=4) as run:
+        output_writer.open_outputs(run)
+        for n in range(20):
+            folder = tmp_path / f"HB{n % 5}"
+            folder.mkdir(exist_ok=True)
+            output_writer.write_output(folder / f"{n}.json", {"n": n}, "action")
+        # The parent folder doesn't exist, so this write fails in the background
+        output_writer.write_output(tmp_path / "missing" / "x.json", {}, "error")
+        assert output_writer.output_exists(tmp_path / "HB0" / "0.json")
+        output_writer.flush_background_writes()
+
+    assert run.writer is None
+    assert (tmp_path / "HB4" / "19.json").read_text() == '{\n  "n": 19\n}'
+    assert run.write_stats == {"action": {"written": 20, "skipped": 0}}
+    [error] = run.write_errors
+    assert error["path"] == str(tmp_path / "missing" / "x.json")
+    assert "FileNotFoundError" in error["error"]
+
+
+def test_runs_keep_their_own_state(tmp_path):
+    with open_run(compression="gzip") as outer:
+        output_writer.write_output(tmp_path / "a.json", {}, "bill")
+        with open_run() as inner:
+            output_writer.write_output(tmp_path / "b.json", {}, "bill")
+        output_writer.write_output(tmp_path / "c.json", {}, "bill")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "a.json.gz",
+        "b.json",
+        "c.json.gz",
+    ]
+    assert outer.write_stats == {"bill": {"written": 2, "skipped": 0}}
+    assert inner.write_stats == {"bill": {"written": 1, "skipped": 0}}
+
+
+def test_path_stays_pending_until_its_last_queued_write(tmp_path, monkeypatch):
+    path = tmp_path / "placeholder.json"
+    calls = []
+    second_started = threading.Event()
+    release = threading.Event()
+
+    def write(run, path, encoded, category):
+        calls.append(path)
+        if len(calls) == 2:
+            second_started.set()
+            release.wait(5)
+
+    monkeypatch.setattr(output_writer, "_write_encoded", write)
+    with open_run(write_threads=1) as run:
+        output_writer.open_outputs(run)
+        try:
+            output_writer.write_output(path, {"n": 1}, "placeholder")
+            output_writer.write_output(path, {"n": 2}, "placeholder")
+            assert second_started.wait(5)
+            # The first write is done, the second one is still running
+            assert output_writer.output_exists(path)
+            release.set()
+            output_writer.flush_background_writes()
+            assert not output_writer.output_exists(path)
+        finally:
+            release.set()
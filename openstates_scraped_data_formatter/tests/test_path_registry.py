@@ -0,0 +1,43 @@
+from utils import path_registry
+from utils.run_context import open_run
+
+
+def test_bill_folders_and_placeholders_are_looked_up_once(tmp_path, monkeypatch):
+    mkdirs = []
+    real_make_output_folder = path_registry.make_output_folder
+
+    def recording_make_output_folder(folder):
+        mkdirs.append(folder)
+        real_make_output_folder(folder)
+
+    monkeypatch.setattr(
+        path_registry, "make_output_folder", recording_make_output_folder
+    )
+
+    with open_run():
+        bill_folder = path_registry.ensure_bill_folder(
+            tmp_path, "il", "2025-2026", "104th", "HB 1"
+        )
+        first_call_mkdirs = list(mkdirs)
+        for _ in range(2):
+            path_registry.ensure_bill_folder(tmp_path, "il", "2025-2026", "104th", "HB 1")
+        assert bill_folder == tmp_path.joinpath(
+            "country:us", "state:il", "sessions", "ocd-session", "country:us",
+            "state:il", "2025-2026", "104th", "bills", "HB 1",
+        )
+        assert (bill_folder / "logs").is_dir() and (bill_folder / "files").is_dir()
+        assert mkdirs == first_call_mkdirs
+        assert mkdirs == [bill_folder / "logs", bill_folder / "files"]
+
+        placeholder = bill_folder / "placeholder.json"
+        assert not path_registry.placeholder_exists(placeholder)
+        path_registry.remember_placeholder(placeholder)
+        assert path_registry.placeholder_exists(placeholder)
+
+        path_registry.reset_path_registry()
+        assert not path_registry.placeholder_exists(placeholder)
+
+    # A new run starts without the previous run's paths
+    path_registry.remember_placeholder(placeholder)
+    with open_run():
+        assert not path_registry.placeholder_exists(placeholder)
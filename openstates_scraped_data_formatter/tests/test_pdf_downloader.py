@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from utils.pdf_downloader import PdfCache, download_bill_pdfs, queue_bill_pdfs
+from utils.run_context import open_run
+
+PDFS = {
+    "/a.pdf": b"%PDF-1.4 first version" * 100,
+    "/flaky.pdf": b"%PDF-1.4 flaky" * 100,
+    "/cut.pdf": b"%PDF-1.4 cut short" * 1000,
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serves PDFS with Range support. /flaky.pdf fails once with a 503,
+    /cut.pdf drops the connection halfway through its first response and
+    /error.pdf is an HTML error page served with status 200.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        requests = self.server.requests
+        requests.append((self.path, self.headers.get("Range")))
+        seen = sum(1 for path, _ in requests if path == self.path)
+
+        if self.path == "/moved.pdf":
+            self.send_response(302)
+            self.send_header("Location", "/a.pdf")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/error.pdf":
+            body = b"<html><body>Document not available</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path not in PDFS:
+            self.send_error(404)
+            return
+        if self.path == "/flaky.pdf" and seen == 1:
+            self.send_error(503)
+            return
+
+        body = PDFS[self.path]
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        if self.path == "/cut.pdf" and seen == 1:
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_retries_resumes_and_caches(server, tmp_path):
+    base = f"http://127.0.0.1:{server.server_port}"
+    bill_files = tmp_path / "bill" / "files"
+    jobs = [
+        (f"{base}/a.pdf", bill_files / "a.pdf", "bill_1.json"),
+        (f"{base}/flaky.pdf", bill_files / "flaky.pdf", "bill_1.json"),
+        (f"{base}/cut.pdf", bill_files / "cut.pdf", "bill_1.json"),
+        (f"{base}/moved.pdf", bill_files / "moved.pdf", "bill_1.json"),
+        (f"{base}/missing.pdf", bill_files / "missing.pdf", "bill_1.json"),
+        # The same URL from another bill is fetched once
+        (f"{base}/a.pdf", tmp_path / "other" / "files" / "a.pdf", "bill_2.json"),
+    ]
+
+    stats = download_bill_pdfs(jobs, tmp_path / "cache", per_host=2, backoff=0)
+
+    assert (stats["downloaded"], stats["cached"], stats["failed"]) == (4, 0, 1)
+    assert (bill_files / "a.pdf").read_bytes() == PDFS["/a.pdf"]
+    assert (bill_files / "moved.pdf").read_bytes() == PDFS["/a.pdf"]
+    assert (bill_files / "flaky.pdf").read_bytes() == PDFS["/flaky.pdf"]
+    assert (bill_files / "cut.pdf").read_bytes() == PDFS["/cut.pdf"]
+    assert (tmp_path / "other" / "files" / "a.pdf").read_bytes() == PDFS["/a.pdf"]
+    assert not (bill_files / "missing.pdf").exists()
+    # The interrupted download resumed where it stopped
+    half = len(PDFS["/cut.pdf"]) // 2
+    assert ("/cut.pdf", f"bytes={half}-") in server.requests
+    # a.pdf: once directly, once through the redirect
+    assert server.requests.count(("/a.pdf", None)) == 2
+
+    # A second run (new output folder, same cache) fetches only what failed
+    server.requests.clear()
+    rerun = [
+        (url, tmp_path / "rerun" / Path(target).name, source)
+        for url, target, source in jobs
+    ]
+    stats = download_bill_pdfs(rerun, tmp_path / "cache", backoff=0)
+    assert (stats["downloaded"], stats["cached"], stats["failed"]) == (0, 4, 1)
+    assert {path for path, _ in server.requests} == {"/missing.pdf"}
+    assert (tmp_path / "rerun" / "cut.pdf").read_bytes() == PDFS["/cut.pdf"]
+
+
+def test_saved_pdfs_are_copies_of_the_cache(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_port}/a.pdf"
+    target = tmp_path / "bill" / "files" / "a.pdf"
+    cache = PdfCache(tmp_path / "cache")
+
+    download_bill_pdfs([(url, target, None)], cache.root, backoff=0)
+    # Editing the output in place leaves the shared cache intact
+    with open(target, "r+b") as f:
+        f.write(b"edited")
+
+    cached = cache.lookup(url)
+    assert not os.path.samefile(cached, target)
+    assert cached.read_bytes() == PDFS["/a.pdf"]
+    # The next run restores the edited output from the cache
+    stats = download_bill_pdfs([(url, target, None)], cache.root, backoff=0)
+    assert stats["cached"] == 1
+    assert target.read_bytes() == PDFS["/a.pdf"]
+    assert [p.name for p in target.parent.iterdir()] == ["a.pdf"]
+
+
+def test_pages_that_are_not_pdfs_are_not_stored(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_port}/error.pdf"
+    target = tmp_path / "bill" / "files" / "error.pdf"
+
+    stats = download_bill_pdfs([(url, target, None)], tmp_path / "cache", backoff=0)
+
+    assert (stats["downloaded"], stats["cached"], stats["failed"]) == (0, 0, 1)
+    assert not target.exists()
+    assert not (tmp_path / "cache" / "objects").exists()
+    assert not PdfCache(tmp_path / "cache").partial_path(url).exists()
+
+
+def test_runs_take_turns_downloading_a_url(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_port}/a.pdf"
+    target = tmp_path / "bill" / "files" / "a.pdf"
+    cache = PdfCache(tmp_path / "cache")
+    results = []
+
+    # Another run is downloading the URL
+    lock = cache.lock_partial(url)
+    thread = threading.Thread(
+        target=lambda: results.append(
+            download_bill_pdfs([(url, target, None)], cache.root, backoff=0)
+        )
+    )
+    thread.start()
+    time.sleep(0.2)
+    partial = cache.partial_path(url)
+    partial.write_bytes(PDFS["/a.pdf"])
+    cache.store(url, partial)
+    lock.close()
+    thread.join()
+
+    [stats] = results
+    assert (stats["downloaded"], stats["cached"], stats["failed"]) == (0, 1, 0)
+    assert server.requests == []
+    assert target.read_bytes() == PDFS["/a.pdf"]
+
+
+def test_each_version_gets_its_own_file(tmp_path):
+    content = {
+        "identifier": "HB 1",
+        "versions": [
+            {
+                "note": "Introduced",
+                "links": [
+                    {"url": "https://example.org/HB1.pdf", "media_type": "application/pdf"},
+                    {"url": "https://example.org/HB1.html", "media_type": "text/html"},
+                ],
+            },
+            {
+                "note": "House Amendment 001",
+                "links": [
+                    {"url": "https://example.org/doc?id=2", "media_type": "application/pdf"}
+                ],
+            },
+        ],
+    }
+
+    with open_run():
+        queue_bill_pdfs(content, tmp_path)  # not collecting: no-op
+    with open_run(collect_pdfs=True) as run:
+        queue_bill_pdfs(content, tmp_path, "bill_1.json")
+    jobs = run.pdf_jobs
+
+    assert [url for url, _, _ in jobs] == [
+        "https://example.org/HB1.pdf",
+        "https://example.org/doc?id=2",
+    ]
+    names = [target.name for _, target, _ in jobs]
+    assert names[0].startswith("introduced_") and names[0].endswith(".pdf")
+    assert names[1].startswith("house_amendment_001_")
@@ -0,0 +1,45 @@
+import glob
+
+from benchmarks import regression
+from utils import process_utils
+
+
+def test_no_regression_against_baseline(request, tmp_path):
+    check_timings = request.config.getoption("--perf-timings")
+    measured = regression.measure_baseline_corpora(
+        tmp_path, repeats=3 if check_timings else 1
+    )
+
+    regressions = regression.compare_to_baseline(
+        measured,
+        regression.load_baseline(regression.BASELINE_FILE),
+        time_ratio=request.config.getoption("--perf-time-ratio"),
+        # Timings of a baseline recorded elsewhere say little; counts are
+        # the same on every machine
+        time_slack=0.25 if check_timings else float("inf"),
+        count_ratio=request.config.getoption("--perf-count-ratio"),
+    )
+    assert not regressions, "\n".join(regressions)
+
+
+def test_per_file_glob_is_caught(monkeypatch, tmp_path):
+    baseline = {
+        "sample": regression.measure_corpus(
+            regression.SAMPLE_INPUT_FOLDER, tmp_path / "before", repeats=1
+        )
+    }
+    route_handler = process_utils.route_handler
+
+    def route_with_glob(*args, **kwargs):
+        glob.glob(str(tmp_path / "*.json"))
+        return route_handler(*args, **kwargs)
+
+    monkeypatch.setattr(process_utils, "route_handler", route_with_glob)
+    current = {
+        "sample": regression.measure_corpus(
+            regression.SAMPLE_INPUT_FOLDER, tmp_path / "after", repeats=1
+        )
+    }
+
+    regressions = regression.compare_to_baseline(current, baseline, time_slack=float("inf"))
+    assert "sample: glob.glob calls: 210 (baseline 0, limit 0)" in regressions
@@ -0,0 +1,88 @@
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+import main
+from utils import progress
+from utils.io_utils import iter_raw_json_files
+from utils.run_context import RunContext, open_run
+
+
+def test_progress_line():
+    reporter = progress.ProgressReporter(RunContext(), 10)
+    reporter.last_line = 0.0
+    totals = {"load": 1000}
+
+    line = reporter.progress_line(
+        10.0,
+        counts={"load": (500, 5_000_000), "process": (490, 0), "link": (0, 0)},
+        totals=totals,
+    )
+    assert line == (
+        "⏳ load 500/1,000 (50%), 50 files/s, 0.5 MB/s, ETA 0:00:10"
+        " | process 490, 49 files/s"
+    )
+
+    # Nothing happened since the last line: stuck, and the ETA grows
+    line = reporter.progress_line(
+        20.0,
+        counts={"load": (500, 5_000_000), "process": (490, 0), "link": (0, 0)},
+        totals=totals,
+    )
+    assert line.startswith("⏳ load 500/1,000 (50%), 0 files/s, 0.0 MB/s, ETA 0:00:20")
+
+    # Linking started: loading and processing are done
+    totals["link"] = 40
+    line = reporter.progress_line(
+        30.0,
+        counts={"load": (1000, 9_000_000), "process": (1000, 0), "link": (10, 0)},
+        totals=totals,
+    )
+    assert line == "⏳ link 10/40 (25%), 1 files/s, ETA 0:00:30"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_progress_counts(monkeypatch, tmp_path, sample_input, workers):
+    seen = {}
+    stop_progress = progress.stop_progress
+
+    def snapshot_then_stop(run):
+        seen.update(run.progress_reporter.snapshot())
+        seen["totals"] = dict(run.progress_totals)
+        seen["run"] = run
+        stop_progress(run)
+
+    monkeypatch.setattr(progress, "stop_progress", snapshot_then_stop)
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.run_pipeline(
+            "il",
+            sample_input,
+            tmp_path / "out",
+            tmp_path / "cache",
+            workers=workers,
+            progress_interval=3600,
+        )
+
+    # Every input is processed, including the one that isn't valid JSON
+    assert seen["totals"] == {"load": 211, "process": 211}
+    assert seen["load"][0] == 211
+    assert seen["load"][1] > 0
+    assert seen["process"] == (211, 0)
+    assert seen["run"].progress_counters is None
+    assert seen["run"].progress_reporter is None
+
+
+@pytest.mark.parametrize("archive_name", ["il.tar.gz", "il.zip"])
+def test_archive_totals_are_estimated_while_streaming(
+    tmp_path, build_archive, archive_name
+):
+    archive = build_archive(tmp_path / archive_name)
+    with open_run(progress_interval=3600) as run:
+        members = iter_raw_json_files(archive)
+        next(members)
+        assert run.progress_totals["load"] == run.progress_totals["process"] > 0
+        remaining = sum(1 for _ in members)
+        assert run.progress_totals == {"load": 211, "process": 211}
+    assert remaining == 210
@@ -0,0 +1,103 @@
+import json
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from utils.file_utils import ensure_session_mapping
+from utils.session_cache import make_http_fetcher
+
+JURISDICTION = {
+    "id": "ocd-jurisdiction/country:us/state:il/government",
+    "legislative_sessions": [
+        {
+            "identifier": "104th",
+            "name": "104th Regular Session",
+            "start_date": "2025-01-08",
+            "end_date": "2026-01-13",
+        }
+    ],
+}
+ETAG = '"sessions-v1"'
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(JURISDICTION).encode()
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def api():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_ttl_and_revalidation(api, tmp_path):
+    fetcher = make_http_fetcher(f"http://127.0.0.1:{api.server_port}")
+    empty_input = tmp_path / "in"
+    empty_input.mkdir()
+    cache = tmp_path / "cache"
+    expected = {"104th": {"name": "104th Regular Session", "date_folder": "2025-2026"}}
+
+    # No jurisdiction file and no cache: fetched
+    assert ensure_session_mapping("il", cache, empty_input, fetcher) == expected
+    assert len(api.requests) == 1
+    path, headers = api.requests[0]
+    assert path.startswith(
+        "/jurisdictions/ocd-jurisdiction%2Fcountry%3Aus%2Fstate%3Ail%2Fgovernment"
+    )
+    assert "If-None-Match" not in headers
+    mapping_file = cache / "sessions" / "il.json"
+    written = mapping_file.stat().st_mtime_ns
+
+    # Fresh: served from the cache, no request
+    assert ensure_session_mapping("il", cache, empty_input, fetcher) == expected
+    assert len(api.requests) == 1
+
+    # Stale: revalidated with the stored ETag; a 304 doesn't rewrite the file
+    assert ensure_session_mapping("il", cache, empty_input, fetcher, ttl=0) == expected
+    assert api.requests[1][1]["If-None-Match"] == ETAG
+    assert mapping_file.stat().st_mtime_ns == written
+
+    # API unreachable: the stale copy is still used
+    def offline(state_abbr, headers):
+        raise OSError("network is unreachable")
+
+    assert ensure_session_mapping("il", cache, empty_input, offline, ttl=0) == expected
+
+
+def test_jurisdiction_file_rewrites_only_on_change(tmp_path):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    for jurisdiction_file in Path("tests/sample_input_files").glob("jurisdiction_*.json"):
+        shutil.copy(jurisdiction_file, input_folder)
+    cache = tmp_path / "cache"
+
+    def no_network(state_abbr, headers):
+        raise AssertionError("the jurisdiction file should be used")
+
+    first = ensure_session_mapping("il", cache, input_folder, no_network)
+    mapping_file = cache / "sessions" / "il.json"
+    written = mapping_file.stat().st_mtime_ns
+
+    assert ensure_session_mapping("il", cache, input_folder, no_network) == first
+    assert mapping_file.stat().st_mtime_ns == written
@@ -0,0 +1,58 @@
+import pytest
+
+from postprocessors.helpers import load_bill_to_session_mapping
+from utils.metrics import get_metrics
+from utils.run_context import open_run
+from utils.session_utils import build_session_name_index
+
+SESSIONS = {
+    "103rd": {"name": "103rd General Assembly", "date_folder": "2023-2024"},
+    "104th": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+    # Same session listed under a second identifier
+    "104": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+}
+
+
+def test_name_index_resolves_sessions_by_name():
+    index = build_session_name_index(SESSIONS)
+
+    assert index["104th General Assembly"]["date_folder"] == "2025-2026"
+    assert len(index) == 2
+
+
+def test_name_index_fails_only_on_lookups_of_ambiguous_names():
+    sessions = dict(SESSIONS)
+    sessions["104s"] = {"name": "104th General Assembly", "date_folder": "2025-2025"}
+
+    index = build_session_name_index(sessions)
+
+    assert index["103rd General Assembly"]["date_folder"] == "2023-2024"
+    with open_run():
+        assert index.get("104th General Assembly") is None
+        assert get_metrics()["warnings"] == {"ambiguous_session_name": 1}
+    with pytest.raises(ValueError, match="2025-2025, 2025-2026"):
+        index["104th General Assembly"]
+
+
+def test_bill_mapping_rebuild_uses_name_index(tmp_path):
+    processed = tmp_path / "data_processed"
+    for date_folder, name, bill_id in (
+        ("2023-2024", "103rd General Assembly", "HB1"),
+        ("2025-2026", "104th General Assembly", "SB2"),
+        ("2025-2026", "Unknown Session", "SB3"),
+    ):
+        (processed / "state:il" / date_folder / name / "bills" / bill_id).mkdir(
+            parents=True
+        )
+
+    mapping = load_bill_to_session_mapping(
+        tmp_path / "bill_to_session.json",
+        processed,
+        force_rebuild=True,
+        session_index=build_session_name_index(SESSIONS),
+    )
+
+    assert mapping == {
+        "HB1": {"name": "103rd General Assembly", "date_folder": "2023-2024"},
+        "SB2": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+    }
@@ -0,0 +1,133 @@
+import json
+import shutil
+
+from tests.dir_comp import dirs_match
+from utils import process_utils
+from utils.process_utils import shard_for
+
+SAMPLE_BILL = "bill_d6641d9a-1727-11f0-9eaa-86812f74cec2.json"
+
+
+SESSIONS = {
+    "104th": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+    # Another identifier of the same session: same output folder
+    "104": {"name": "104th General Assembly", "date_folder": "2025-2026"},
+    "103rd": {"name": "103rd General Assembly", "date_folder": "2023-2024"},
+}
+
+
+def test_bill_and_its_votes_share_a_shard():
+    bill = {"legislative_session": "104th", "identifier": "HB871"}
+    vote = {"legislative_session": "104", "bill_identifier": "HB871"}
+    other_session = {"legislative_session": "103rd", "identifier": "HB871"}
+    unknown_session = {"legislative_session": "99th", "identifier": "HB871"}
+
+    shards = [
+        shard_for(name, content, 16, SESSIONS)
+        for name, content in [("bill_a.json", bill), ("vote_event_b.json", vote)]
+    ]
+    assert shards[0] == shards[1]
+    # crc32, not hash(): the same in every process and every run
+    assert shards[0] == shard_for("bill_c.json", bill, 16, SESSIONS) == 1
+    assert shard_for("bill_a.json", other_session, 16, SESSIONS) == 3
+    # Files without a bill folder are spread by filename
+    assert shard_for("event_x.json", {}, 16, SESSIONS) == shard_for(
+        "event_x.json", None, 16, SESSIONS
+    )
+    assert shard_for("bill_a.json", unknown_session, 16, SESSIONS) == shard_for(
+        "bill_a.json", None, 16, SESSIONS
+    )
+
+
+def test_events_saved_under_the_same_name_share_a_shard():
+    hearing = {
+        "legislative_session": "104th",
+        "start_date": "2025-03-20T10:00:00",
+        "name": "Committee Hearing",
+        "bill_identifier": "HB871",
+    }
+    rescheduled = dict(hearing, legislative_session="104", bill_identifier="SB1")
+
+    assert shard_for("event_a.json", hearing, 16, SESSIONS) == shard_for(
+        "event_b.json", rescheduled, 16, SESSIONS
+    )
+    assert process_utils.shard_key("event_a.json", hearing, SESSIONS) == (
+        "2025-2026",
+        "104th General Assembly",
+        "events",
+        "20250320T100000Z_committee_hearing",
+    )
+    # Events that handle_event won't save are spread by filename
+    undated = dict(hearing, start_date=None)
+    assert process_utils.shard_key("event_a.json", undated, SESSIONS) is None
+
+
+def test_shard_fields_are_read_without_decoding_the_file(monkeypatch):
+    raw = json.dumps(
+        {
+            "legislative_session": "104th",
+            "identifier": "HB \"871\"",
+            "title": 'Not the "identifier": "HB1"',
+            "other_identifiers": [],
+        }
+    ).encode()
+    decoded = []
+    monkeypatch.setattr(
+        process_utils, "loads", lambda raw: decoded.append(raw) or json.loads(raw)
+    )
+
+    assert process_utils.read_shard_fields("bill_a.json", raw) == {
+        "legislative_session": "104th",
+        "identifier": 'HB "871"',
+    }
+    assert len(decoded) == 2 and all(len(value) < 20 for value in decoded)
+    assert process_utils.read_shard_fields("jurisdiction_il.json", raw) is None
+    # Events are only decoded when they have a session
+    assert process_utils.read_shard_fields("event_a.json", b'{"name": "x"}') == {}
+    assert process_utils.read_shard_fields("event_a.json", raw)["title"]
+
+    # A key that also occurs nested is only found by decoding the file
+    raw = json.dumps(
+        {
+            "related_bills": [{"legislative_session": "103rd", "identifier": "HB1"}],
+            "legislative_session": "104th",
+            "identifier": "HB871",
+        }
+    ).encode()
+    fields = process_utils.read_shard_fields("bill_a.json", raw)
+    assert (fields["legislative_session"], fields["identifier"]) == ("104th", "HB871")
+    fields = process_utils.read_shard_fields("bill_a.json", b'{"identifier": 871}')
+    assert fields == {"identifier": 871}
+    assert process_utils.read_shard_fields("bill_a.json", b'{"identifier": 8') is None
+
+
+def test_workers_match_serial_with_duplicate_scrapes(tmp_path, sample_input, run_main):
+    input_folder = tmp_path / "in"
+    shutil.copytree(sample_input, input_folder)
+    # A second scrape of the same bill writes to the same output files; the
+    # later input must win, as in a serial run
+    duplicate = json.loads((input_folder / SAMPLE_BILL).read_text())
+    duplicate["title"] = "Rescraped title"
+    (input_folder / "bill_zz-duplicate.json").write_text(json.dumps(duplicate))
+    # So do events saved under the same start date and name
+    for name, bill_identifier in (("event_a.json", "HB871"), ("event_b.json", "SB1")):
+        event = {
+            "legislative_session": "104th",
+            "start_date": "2025-03-20T10:00:00",
+            "name": "Committee Hearing",
+            "bill_identifier": bill_identifier,
+        }
+        (input_folder / name).write_text(json.dumps(event))
+
+    outputs = {}
+    for workers in ("1", "3"):
+        outputs[workers] = tmp_path / f"out_{workers}"
+        result = run_main(
+            outputs[workers], "--workers", workers, input_folder=input_folder
+        )
+        assert result.exit_code == 0, result.output
+        assert "Bills saved: 102" in result.output
+
+    events = list(outputs["1"].glob("data_processed/**/events/20250320T100000Z_*.json"))
+    assert len(events) == 1
+    assert dirs_match(outputs["1"], outputs["3"])
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+from utils.sqlite_store import SQLITE_FILENAME, SqliteOutputStore, export_sqlite_output
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--workers", "3"]])
+def test_sqlite_output_exports_to_expected_tree(
+    tmp_path, extra_args, run_main, assert_matches_expected
+):
+    output_folder = tmp_path / "out"
+    result = run_main(output_folder, "--output-format", "sqlite", *extra_args)
+    assert result.exit_code == 0, result.output
+    assert [p.name for p in output_folder.iterdir()] == [SQLITE_FILENAME]
+
+    db_path = output_folder / SQLITE_FILENAME
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM bills").fetchone() == (101,)
+        row = conn.execute(
+            "SELECT jurisdiction, bill_identifier, timestamp FROM actions LIMIT 1"
+        ).fetchone()
+        assert row[0] == "il" and row[1] and row[2].endswith("Z")
+
+    exported = tmp_path / "exported"
+    export_sqlite_output(db_path, exported)
+    assert_matches_expected(exported)
+
+
+def test_sqlite_output_rejects_incremental(tmp_path, run_main):
+    result = run_main(tmp_path / "out", "--output-format", "sqlite", "--incremental")
+    assert result.exit_code != 0
+    assert "--incremental requires --output-format folder" in result.output
+
+
+def test_lookups_never_commit(tmp_path):
+    store = SqliteOutputStore(tmp_path / "out.sqlite", tmp_path, "il")
+    statements = []
+    store.conn.set_trace_callback(statements.append)
+    folder = tmp_path / "event_archive"
+    store.add_folder(folder)
+    store.put(folder / "event_1.json", b"{}", "event_archive")
+    store.flush()
+    store.put(folder / "event_2.json", b"{}", "event_archive")
+    del statements[:]
+
+    assert store.exists(folder) and store.exists(folder / "event_1.json")
+    assert store.exists(folder / "event_2.json")
+    assert not store.exists(folder / "event_3.json")
+    assert store.list_folder(folder) == {"event_1.json", "event_2.json"}
+    store.remove(folder / "event_1.json")
+    store.remove(folder / "event_2.json")
+    assert not store.exists(folder / "event_1.json")
+    assert not store.exists(folder / "event_2.json")
+    assert store.list_folder(folder) == set()
+    assert "COMMIT" not in statements
+
+    store.close()
+    with sqlite3.connect(tmp_path / "out.sqlite") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM event_archive").fetchone() == (0,)
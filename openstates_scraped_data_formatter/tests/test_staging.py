@@ -0,0 +1,53 @@
+import threading
+
+import main
+from utils import staging_utils
+
+
+def wait_for_cleanup():
+    for thread in threading.enumerate():
+        if thread.name == "output-cleanup":
+            thread.join()
+
+
+def test_rebuild_replaces_previous_output(tmp_path, run_main, assert_matches_expected):
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    (output_folder / "previous_run.txt").write_text("old", encoding="utf-8")
+
+    result = run_main(output_folder)
+    assert result.exit_code == 0, result.output
+    wait_for_cleanup()
+
+    assert_matches_expected(output_folder)
+    assert [p.name for p in tmp_path.iterdir()] == ["out"]
+
+
+def test_failed_rebuild_keeps_previous_output(tmp_path, monkeypatch, run_main):
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    (output_folder / "previous_run.txt").write_text("old", encoding="utf-8")
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(main, "process_and_save", crash)
+    result = run_main(output_folder)
+    assert result.exit_code != 0
+
+    assert [p.name for p in output_folder.iterdir()] == ["previous_run.txt"]
+
+
+def test_swap_without_rename_exchange(tmp_path, monkeypatch):
+    monkeypatch.setattr(staging_utils, "_exchange_paths", lambda a, b: False)
+    output_folder = tmp_path / "out"
+    output_folder.mkdir()
+    (output_folder / "old.json").write_text("{}", encoding="utf-8")
+    staging = staging_utils.staging_folder_for(output_folder)
+    staging.mkdir()
+    (staging / "new.json").write_text("{}", encoding="utf-8")
+
+    staging_utils.swap_in_staging(staging, output_folder).join()
+
+    assert [p.name for p in output_folder.iterdir()] == ["new.json"]
+    assert [p.name for p in tmp_path.iterdir()] == ["out"]
@@ -0,0 +1,112 @@
+import fnmatch
+import os
+import tarfile
+import zipfile
+from contextlib import closing, contextmanager
+
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz")
+ZSTD_TAR_SUFFIXES = (".tar.zst", ".tar.zstd", ".tzst")
+ZIP_SUFFIXES = (".zip",)
+
+
+def is_archive(path) -> bool:
+    """
+    Returns True if path points to a scraper archive we can read members from.
+    """
+    name = str(path).lower()
+    return os.path.isfile(path) and name.endswith(
+        TAR_SUFFIXES + ZSTD_TAR_SUFFIXES + ZIP_SUFFIXES
+    )
+
+
+def _open_zstd_stream(fileobj):
+    """
+    Wraps a binary file object in a streaming zstd decompressor.
+    Uses the `zstandard` package, or the stdlib `compression.zstd` on Python 3.14+.
+    """
+    try:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(fileobj)
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+
+        return zstd.ZstdFile(fileobj, mode="rb")
+    except ImportError:
+        raise RuntimeError(
+            "❌ Reading .tar.zst archives requires the 'zstandard' package (pip install zstandard)"
+        )
+
+
+@contextmanager
+def _open_tar_stream(archive_path, raw):
+    name = str(archive_path).lower()
+    if name.endswith(ZSTD_TAR_SUFFIXES):
+        stream = _open_zstd_stream(raw)
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            yield tar
+    else:
+        # "r|*" streams members sequentially and detects gzip/bz2/xz transparently
+        with tarfile.open(fileobj=raw, mode="r|*") as tar:
+            yield tar
+
+
+def iter_archive_members(archive_path, pattern="*.json", with_position=False):
+    """
+    Yields (filename, raw_bytes) for every file member whose basename matches
+    pattern, in archive order, without extracting anything to disk.
+
+    Members are read one at a time, so only the current member is held in memory.
+    Directory prefixes inside the archive are dropped from the yielded filename.
+
+    With with_position, yields (filename, raw_bytes, fraction) instead, where
+    fraction is how far through the archive reading got: matching members
+    read over all of them for zip archives (listed in the central directory),
+    and compressed bytes read over the archive size for tar streams.
+    """
+    if str(archive_path).lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive_path) as zf:
+            members = [
+                (os.path.basename(info.filename), info)
+                for info in zf.infolist()
+                if not info.is_dir()
+            ]
+            members = [
+                (filename, info)
+                for filename, info in members
+                if fnmatch.fnmatch(filename, pattern)
+            ]
+            for i, (filename, info) in enumerate(members, 1):
+                raw = zf.read(info)
+                if with_position:
+                    yield filename, raw, i / len(members)
+                else:
+                    yield filename, raw
+        return
+
+    with open(archive_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        with _open_tar_stream(archive_path, f) as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                filename = os.path.basename(member.name)
+                if fnmatch.fnmatch(filename, pattern):
+                    raw = tar.extractfile(member).read()
+                    if with_position:
+                        yield filename, raw, f.tell() / size if size else 1.0
+                    else:
+                        yield filename, raw
+
+
+def read_first_archive_member(archive_path, pattern):
+    """
+    Returns (filename, raw_bytes) for the first member matching pattern, or None.
+
+    Zip archives are resolved from the central directory; tar streams are read
+    only as far as the first match.
+    """
+    with closing(iter_archive_members(archive_path, pattern)) as members:
+        return next(members, None)
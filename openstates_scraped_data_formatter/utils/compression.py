@@ -0,0 +1,104 @@
+import gzip
+import os
+from pathlib import Path
+
+from utils.json_codec import loads
+
+try:
+    import zstandard
+except ImportError:  # optional; the stdlib has zstd from Python 3.14
+    zstandard = None
+try:
+    from compression import zstd as stdlib_zstd
+except ImportError:
+    stdlib_zstd = None
+
+# --compress method -> suffix appended to every compressed output file
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_zstd_compressor = zstandard.ZstdCompressor() if zstandard is not None else None
+
+
+def _zstd(operation):
+    if zstandard is None and stdlib_zstd is None:
+        raise RuntimeError(
+            "❌ zstd compression requires the 'zstandard' package (pip install zstandard)"
+        )
+    if operation == "compress":
+        if zstandard is not None:
+            return _zstd_compressor.compress
+        return stdlib_zstd.compress
+    if zstandard is not None:
+        # A fresh decompressobj also handles frames without a content size
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    return stdlib_zstd.decompress
+
+
+def compression_available(method) -> bool:
+    """
+    False if method needs a package that isn't installed (zstd without
+    'zstandard' before Python 3.14), so it can be rejected before a run
+    writes anything.
+    """
+    return method != "zstd" or zstandard is not None or stdlib_zstd is not None
+
+
+def compress_bytes(raw: bytes, method) -> bytes:
+    """
+    Compresses raw deterministically: the same input always gives the same
+    bytes (gzip headers carry no timestamp or filename), so unchanged outputs
+    can still be detected by comparing bytes.
+    """
+    if method == "gzip":
+        return gzip.compress(raw, mtime=0)
+    if method == "zstd":
+        return _zstd("compress")(raw)
+    raise ValueError(f"❌ Unknown compression method: {method}")
+
+
+def compressed_path(path, method):
+    """
+    Returns path with the suffix of method appended ("x.json" -> "x.json.gz"),
+    or path unchanged when method is None.
+    """
+    if method is None:
+        return path
+    suffix = COMPRESSION_SUFFIXES[method]
+    if isinstance(path, Path):
+        return path.with_name(path.name + suffix)
+    return os.fspath(path) + suffix
+
+
+def strip_compression_suffix(name: str) -> str:
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def decompress_bytes(raw: bytes) -> bytes:
+    """
+    Returns raw decompressed if it is gzip or zstd data, else raw unchanged.
+    """
+    if raw.startswith(_GZIP_MAGIC):
+        return gzip.decompress(raw)
+    if raw.startswith(_ZSTD_MAGIC):
+        return _zstd("decompress")(raw)
+    return raw
+
+
+def read_output_bytes(path) -> bytes:
+    """
+    Reads an output file, decompressing it if it was written with --compress.
+    """
+    with open(path, "rb") as f:
+        return decompress_bytes(f.read())
+
+
+def read_output_json(path):
+    """
+    Reads and parses a plain or compressed JSON output file.
+    """
+    return loads(read_output_bytes(path))
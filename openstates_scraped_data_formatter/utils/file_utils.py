@@ -1,8 +1,20 @@
 import re
+import time
 from datetime import datetime
-import json
 from pathlib import Path
-from urllib import request
+from utils.archive_utils import is_archive, read_first_archive_member
+from utils.json_codec import loads, read_json
+from utils.log_utils import get_logger
+from utils.metrics import count_error
+from utils.output_writer import write_output
+from utils.path_registry import ensure_folder
+from utils.session_cache import (
+    DEFAULT_SESSION_TTL,
+    SessionCacheEntry,
+    make_http_fetcher,
+)
+
+logger = get_logger(__name__)
 
 
 def format_timestamp(date_str):
@@ -39,79 +51,110 @@ def extract_session_mapping(jurisdiction_data):
     return session_mapping
 
 
-def ensure_session_mapping(state_abbr, base_path, input_folder):
+def find_jurisdiction_data(input_path):
+    """
+    Returns the parsed jurisdiction_*.json from an input folder or archive,
+    or None if there isn't one.
+    """
+    if is_archive(input_path):
+        member = read_first_archive_member(input_path, "jurisdiction_*.json")
+        return loads(member[1]) if member else None
+
+    jurisdiction_files = list(Path(input_path).glob("jurisdiction_*.json"))
+    return read_json(jurisdiction_files[0]) if jurisdiction_files else None
+
+
+def ensure_session_mapping(
+    state_abbr, base_path, input_folder, fetcher=None, ttl=DEFAULT_SESSION_TTL
+):
     """
-    Ensures sessions/{state_abbr}.json exists.
-    - If jurisdiction_*.json is found, extract and overwrite session cache.
-    - If not found, fallback to OpenStates API only if cache doesn't already exist.
+    Ensures sessions/{state_abbr}.json exists in the cache folder and returns it.
+    - If jurisdiction_*.json is found (input_folder may also be a scraper
+      archive), its session list is used; the cache is only rewritten when
+      that list changed.
+    - Otherwise the cached list is used while it is younger than ttl seconds.
+    - Once it is stale (or missing) it is revalidated against the OpenStates
+      API with If-None-Match / If-Modified-Since, so an unchanged list costs a
+      304 and no rewrite. If the API can't be reached, a stale cache is used.
     Returns a dictionary like:
     {
         "119": {"name": "119th Congress", "date_folder": "2023-2024"},
         ...
     }
+
+    Args:
+        fetcher (callable, optional): See utils.session_cache.make_http_fetcher
+            (the default).
     """
-    session_cache_path = base_path / "sessions" / f"{state_abbr}.json"
-    sessions_folder = base_path / "sessions"
-    sessions_folder.mkdir(parents=True, exist_ok=True)
-
-    # 1. Look for jurisdiction file
-    jurisdiction_files = list(Path(input_folder).glob("jurisdiction_*.json"))
-    if jurisdiction_files:
-        print(f"🔍 Found jurisdiction file — updating sessions/{state_abbr}.json")
-        with open(jurisdiction_files[0], "r", encoding="utf-8") as f:
-            jurisdiction_data = json.load(f)
+    cache = SessionCacheEntry(base_path, state_abbr)
+    cached, meta = cache.load()
+
+    # 1. Look for jurisdiction file (in the input folder or inside the input archive)
+    jurisdiction_data = find_jurisdiction_data(input_folder)
+    if jurisdiction_data is not None:
+        logger.info("🔍 Found jurisdiction file for %s", state_abbr)
         session_mapping = extract_session_mapping(jurisdiction_data)
         if session_mapping:
-            with open(session_cache_path, "w", encoding="utf-8") as f:
-                json.dump(session_mapping, f, indent=2)
-            print(f"📅 Wrote extracted session mapping to sessions/{state_abbr}.json")
+            meta = {"source": "jurisdiction_file", "fetched_at": time.time()}
+            if cache.save(session_mapping, meta, previous=cached):
+                logger.info("📅 Wrote extracted session mapping to sessions/%s.json", state_abbr)
+            else:
+                logger.info("✔️ sessions/%s.json matches the jurisdiction file", state_abbr)
             return session_mapping
 
-    # 2. If no jurisdiction file, use existing session cache if it exists
-    if session_cache_path.exists():
-        print(f"✔️ Using existing sessions/{state_abbr}.json")
-        with open(session_cache_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    # 3. Fallback: fetch from OpenStates API
-    print(f"🌐 Fetching session list from OpenStates API")
-    url = f"https://v3.openstates.org/jurisdictions/{state_abbr}/sessions"
+    # 2. If no jurisdiction file, use the cached list while it is fresh
+    if cached is not None and cache.is_fresh(meta, ttl):
+        logger.info("✔️ Using cached sessions/%s.json", state_abbr)
+        return cached
+
+    # 3. Fetch (or revalidate) from the OpenStates API
+    logger.info("🌐 Fetching session list from OpenStates API")
+    headers = {"Accept": "application/json"}
+    if cached is not None and meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    fetcher = fetcher or make_http_fetcher()
     try:
-        response = request.get(url, timeout=10)
-        if response.status_code == 200:
-            sessions = response.json()
-            session_mapping = {}
-            for s in sessions:
-                identifier = s.get("identifier")
-                name = s.get("name")
-                start = s.get("start_date", "")[:4]
-                end = s.get("end_date", "")[:4]
-                if identifier and name and start and end:
-                    session_mapping[identifier] = {
-                        "name": name,
-                        "date_folder": f"{start}-{end}",
-                    }
-            with open(session_cache_path, "w", encoding="utf-8") as f:
-                json.dump(session_mapping, f, indent=2)
-            print(f"✅ Wrote session mapping to sessions/{state_abbr}.json")
-            return session_mapping
-        else:
-            print(f"⚠️ Failed to fetch sessions (status {response.status_code})")
+        status, response_headers, body = fetcher(state_abbr, headers)
     except Exception as e:
-        print(f"❌ Error fetching sessions: {e}")
+        logger.warning("❌ Error fetching sessions: %s", e)
+        status = None
+
+    if status == 304 and cached is not None:
+        cache.save(cached, {**meta, "fetched_at": time.time()}, previous=cached)
+        logger.info("✔️ sessions/%s.json is still current", state_abbr)
+        return cached
+    if status == 200:
+        session_mapping = extract_session_mapping(loads(body))
+        if session_mapping:
+            meta = {
+                "source": "api",
+                "fetched_at": time.time(),
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+            }
+            if cache.save(session_mapping, meta, previous=cached):
+                logger.info("✅ Wrote session mapping to sessions/%s.json", state_abbr)
+            return session_mapping
+    if status is not None:
+        logger.warning("⚠️ Failed to fetch sessions (status %s)", status)
 
+    if cached is not None:
+        logger.warning("⚠️ Using stale sessions/%s.json", state_abbr)
+        return cached
     return {}
 
 
 def record_error_file(
     error_folder, category, filename, content, original_filename=None
 ):
-    folder = Path(error_folder) / category
-    folder.mkdir(parents=True, exist_ok=True)
+    count_error(category)
+    folder = ensure_folder(Path(error_folder) / category)
     if original_filename:
         content["_original_filename"] = original_filename
-    with open(folder / filename, "w", encoding="utf-8") as f:
-        json.dump(content, f, indent=2)
+    write_output(folder / filename, content, "error")
 
 
 def slugify(text, max_length=100):
@@ -142,8 +185,9 @@ def write_action_logs(actions, bill_identifier, log_folder):
         filename = f"{timestamp}_{slug}.json"
         output_file = Path(log_folder) / filename
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump({"action": action, "bill_id": bill_identifier}, f, indent=2)
+        write_output(
+            output_file, {"action": action, "bill_id": bill_identifier}, "action"
+        )
 
 
 
@@ -159,8 +203,7 @@ def write_vote_event_log(vote_event, bill_identifier, log_folder):
     filename = f"{timestamp}_vote_event_{slugify(result)}.json"
 
     output_file = Path(log_folder) / filename
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(vote_event, f, indent=2)
+    write_output(output_file, vote_event, "vote_event")
 
 
 def list_json_files(folder: Path) -> list[Path]:
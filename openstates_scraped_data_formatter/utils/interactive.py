@@ -2,6 +2,8 @@ import os
 import shutil
 from pathlib import Path
 
+from utils.log_utils import flush_logs
+
 SKIP_DELETE_PROMPT = True  # Toggle False to enable interactive CLI prompt for deletions
 
 
@@ -51,6 +53,8 @@ def prompt_for_session_fix(filename, original_session_name, log_path=None):
     Returns:
         str or None: The new session name, or None if the user skips.
     """
+    # Buffered log lines belong above the prompt
+    flush_logs()
     print(f"⚠️ Unknown session for {filename}: '{original_session_name}'")
     new_session = input(
         f"📝 Enter correct session for {filename} (or press Enter to skip): "
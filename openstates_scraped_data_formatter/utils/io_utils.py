@@ -1,43 +1,231 @@
+import io
 import os
 import json
+import pickle
+import time
+from utils.archive_utils import is_archive, iter_archive_members
 from utils.file_utils import record_error_file
+from utils.json_codec import dumps, loads
+from utils.log_utils import get_logger
+from utils.manifest_utils import discard_output, record_output, set_current_input
+from utils.metrics import add_stage_metrics
+from utils.output_writer import (
+    get_output_store,
+    output_exists,
+    output_file_path,
+    remove_output,
+    write_raw_output,
+)
+from utils.path_registry import ensure_folder
+from utils.progress import advance_progress, set_input_total
 
+logger = get_logger(__name__)
 
-def load_json_files(input_folder, EVENT_ARCHIVE_FOLDER, ERROR_FOLDER):
-    all_data = []
-    for filename in os.listdir(input_folder):
-        if filename.endswith(".json"):
-            filepath = os.path.join(input_folder, filename)
+
+def scan_json_filenames(input_folder):
+    """
+    Returns the names of all *.json files in input_folder, in os.scandir order.
+    """
+    with os.scandir(input_folder) as entries:
+        return [
+            entry.name
+            for entry in entries
+            if entry.name.endswith(".json") and entry.is_file()
+        ]
+
+
+def _measured(raw_files, stage):
+    """
+    Passes (filename, raw_bytes) pairs through, adding the time spent reading
+    each one and its size to stage.
+    """
+    raw_files = iter(raw_files)
+    while True:
+        started = time.perf_counter()
+        try:
+            filename, raw = next(raw_files)
+        except StopIteration:
+            return
+        add_stage_metrics(
+            stage, time.perf_counter() - started, files=1, bytes_read=len(raw)
+        )
+        if stage == "load":
+            advance_progress("load", bytes_read=len(raw))
+        yield filename, raw
+
+
+def iter_raw_json_files(input_path, filenames=None, stage="load"):
+    """
+    Yields (filename, raw_bytes) for every *.json input, one file at a time.
+
+    Args:
+        input_path (Path): A folder of scraped files, or a .tar.gz/.tar.zst/.zip
+            archive whose members are streamed without extracting them.
+        filenames (list[str], optional): Restrict the input to these files
+            (folders are read in the given order), e.g. one worker's share of
+            the input or the changed files of an incremental run.
+        stage (str): Metrics stage the reads are counted in.
+    """
+    return _measured(_iter_raw_json_files(input_path, filenames, stage), stage)
+
+
+def _iter_raw_json_files(input_path, filenames, stage):
+    # Reading the whole input as the load stage sets the progress totals
+    count_input = filenames is None and stage == "load"
+    if is_archive(input_path):
+        if not count_input:
+            wanted = None if filenames is None else set(filenames)
+            for filename, raw in iter_archive_members(input_path, "*.json"):
+                if wanted is None or filename in wanted:
+                    yield filename, raw
+            return
+        # Members can't be counted without reading the archive: estimate the
+        # total from how far through it reading got
+        read = 0
+        for filename, raw, fraction in iter_archive_members(
+            input_path, "*.json", with_position=True
+        ):
+            read += 1
+            set_input_total(max(read, round(read / fraction)))
+            yield filename, raw
+        set_input_total(read)
+        return
+
+    if filenames is None:
+        filenames = scan_json_filenames(input_path)
+        if count_input:
+            set_input_total(len(filenames))
+    for filename in filenames:
+        with open(os.path.join(input_path, filename), "rb") as f:
+            yield filename, f.read()
+
+
+def spool_raw_json_file(spool, filename, raw):
+    """
+    Appends one (filename, raw_bytes) input to an open spool file, e.g. one
+    shard of an archive, which is then read back with iter_spooled_json_files
+    instead of streaming the archive again.
+    """
+    pickle.dump((filename, raw), spool, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _iter_spool(spool_path):
+    with open(spool_path, "rb") as f:
+        while True:
             try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    all_data.append((filename, data))
-
-                    # Archive all event_*.json files to a centralized folder
-                    # These files often lack a legislative_session and are skipped by the main processor
-                    # This preserves raw event data for post-processing, analysis,
-                    # or bill association steps later in the pipeline
-                    if filename.startswith("event_"):
-                        EVENT_ARCHIVE_FOLDER.mkdir(parents=True, exist_ok=True)
-
-                        # If file exists in missing_session, remove it before archiving
-                        missing_event_file = ERROR_FOLDER / "missing_session" / filename
-                        if missing_event_file.exists():
-                            missing_event_file.unlink()
-
-                        archive_path = EVENT_ARCHIVE_FOLDER / filename
-                        with open(archive_path, "w", encoding="utf-8") as archive_f:
-                            json.dump(data, archive_f, indent=2)
-
-            except json.JSONDecodeError:
-                print(f"❌ Skipping {filename}: could not parse JSON")
-                with open(filepath, "r", encoding="utf-8") as f:
-                    raw_text = f.read()
-                record_error_file(
-                    ERROR_FOLDER,
-                    "invalid_json",
-                    filename,
-                    {"error": "Could not parse JSON", "raw": raw_text},
-                    original_filename=filename,
-                )
-    return all_data
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def iter_spooled_json_files(spool_path):
+    """
+    Yields the (filename, raw_bytes) inputs of a spool file in the order they
+    were spooled; reads are counted as loading the input.
+    """
+    return _measured(_iter_spool(spool_path), "load")
+
+
+def archive_event_file(archive_path, data):
+    """
+    Archives one event in the standard format. The archive is always a file
+    of its own, never a link to the input, so scrapers may rewrite their
+    input in place. With a SQLite output store, the bytes are stored instead.
+    """
+    canonical = dumps(data).encode("utf-8")
+    if get_output_store() is not None:
+        write_raw_output(archive_path, canonical, "event_archive")
+        return
+
+    # Archives of older runs may still be hardlinks to an input file: replace
+    # them rather than writing through them
+    archive_path.unlink(missing_ok=True)
+    record_output(archive_path)
+    archive_path.write_bytes(canonical)
+
+
+def parse_json_files(raw_files, EVENT_ARCHIVE_FOLDER, ERROR_FOLDER, event_sink=None):
+    """
+    Lazily parses (filename, raw_bytes) pairs into (filename, data) pairs.
+
+    Event files are archived as they stream past, and unparseable files are
+    recorded under ERROR_FOLDER/invalid_json without interrupting the stream.
+
+    Args:
+        event_sink (list, optional): Receives (filename, data) for every event,
+            letting the linker reuse the parsed objects instead of re-reading
+            the archive.
+    """
+    for filename, raw in raw_files:
+        set_current_input(filename)
+        started = time.perf_counter()
+        try:
+            data = loads(raw)
+        except json.JSONDecodeError:
+            add_stage_metrics("parse", time.perf_counter() - started, files=1)
+            # Done with here: the file never reaches process_and_save
+            advance_progress("process")
+            logger.debug("❌ Skipping %s: could not parse JSON", filename)
+            # Decode the way text-mode open() would, including newline handling
+            raw_text = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8").read()
+            record_error_file(
+                ERROR_FOLDER,
+                "invalid_json",
+                filename,
+                {"error": "Could not parse JSON", "raw": raw_text},
+                original_filename=filename,
+            )
+            continue
+        add_stage_metrics("parse", time.perf_counter() - started, files=1)
+
+        # Archive all event_*.json files to a centralized folder
+        # These files often lack a legislative_session and are skipped by the main processor
+        # This preserves raw event data for post-processing, analysis,
+        # or bill association steps later in the pipeline
+        if filename.startswith("event_"):
+            ensure_folder(EVENT_ARCHIVE_FOLDER)
+
+            # If file exists in missing_session, remove it before archiving
+            missing_event_file = output_file_path(
+                ERROR_FOLDER / "missing_session" / filename
+            )
+            if output_exists(missing_event_file):
+                remove_output(missing_event_file)
+                discard_output(missing_event_file)
+
+            archive_event_file(EVENT_ARCHIVE_FOLDER / filename, data)
+            if event_sink is not None:
+                event_sink.append((filename, data))
+
+        yield filename, data
+
+
+def iter_json_files(
+    input_path, EVENT_ARCHIVE_FOLDER, ERROR_FOLDER, filenames=None, event_sink=None
+):
+    """
+    Lazily yields (filename, data) for every *.json file in input_path.
+
+    Folders are visited in os.scandir order and archives in member order, and
+    files are parsed one at a time, so only the file currently being routed is
+    held in memory.
+
+    Args:
+        input_path (Path): Input folder or scraper archive.
+        filenames (list[str], optional): Restrict the input to these files.
+        event_sink (list, optional): Collects parsed events for the linker.
+    """
+    return parse_json_files(
+        iter_raw_json_files(input_path, filenames),
+        EVENT_ARCHIVE_FOLDER,
+        ERROR_FOLDER,
+        event_sink=event_sink,
+    )
+
+
+def load_json_files(input_folder, EVENT_ARCHIVE_FOLDER, ERROR_FOLDER):
+    """
+    Eagerly loads every *.json file in input_folder into a list of
+    (filename, data) tuples. Prefer iter_json_files for large scrapes.
+    """
+    return list(iter_json_files(input_folder, EVENT_ARCHIVE_FOLDER, ERROR_FOLDER))
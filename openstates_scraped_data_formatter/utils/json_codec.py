@@ -0,0 +1,119 @@
+import json
+import os
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib is always available
+    orjson = None
+
+# Set OSDF_JSON_BACKEND=json to force the stdlib backend even if orjson is installed
+if os.environ.get("OSDF_JSON_BACKEND", "").lower() == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+# orjson writes non-ASCII characters (and DEL) raw, while json.dump escapes them
+_NEEDS_ASCII_ESCAPE = re.compile(r"[^\x00-\x7e]")
+# orjson turns integers outside [-2**63, 2**64) into floats instead of Python ints
+_WIDE_INT_BYTES = re.compile(rb"-\d{19}|\d{20}")
+_WIDE_INT_STR = re.compile(r"-\d{19}|\d{20}")
+
+
+class _StdlibFloat(float):
+    """
+    Float parsed by the stdlib fallback (NaN, Infinity, ...). orjson refuses to
+    serialize float subclasses, so these always round-trip through the stdlib.
+    """
+
+
+def _escape_non_ascii(match):
+    n = ord(match.group())
+    if n < 0x10000:
+        return "\\u%04x" % n
+    n -= 0x10000
+    return "\\u%04x\\u%04x" % (0xD800 | (n >> 10), 0xDC00 | (n & 0x3FF))
+
+
+def _differs_from_repr(value) -> bool:
+    """
+    True for floats orjson formats differently from float.__repr__: NaN and
+    infinities (orjson writes null) and anything repr puts in exponent
+    notation ("1e16" vs "1e+16", "0.00001" vs "1e-05").
+    """
+    return value != 0 and not 1e-4 <= abs(value) < 1e16
+
+
+def _has_ambiguous_float(data) -> bool:
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        # Strings are most of the values; test the exact types first
+        if kind is str:
+            continue
+        if kind is dict or isinstance(value, dict):
+            stack.extend(value.values())
+        elif kind is list or isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, float) and _differs_from_repr(value):
+            return True
+    return False
+
+
+def dumps(data) -> str:
+    """
+    Serializes data exactly like json.dumps(data, indent=2).
+
+    Uses orjson when available and falls back to the stdlib for anything
+    orjson would format differently (the floats of _differs_from_repr) or
+    refuses (ints wider than 64 bits, non-string keys, float subclasses,
+    lone surrogates), so output is byte-identical either way.
+    """
+    if orjson is not None and not _has_ambiguous_float(data):
+        try:
+            text = orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass
+        else:
+            return _NEEDS_ASCII_ESCAPE.sub(_escape_non_ascii, text)
+    return json.dumps(data, indent=2)
+
+
+def loads(raw):
+    """
+    Parses JSON from str or bytes, returning the same objects as json.loads.
+
+    Raises:
+        json.JSONDecodeError: If raw is not valid JSON.
+    """
+    if orjson is None:
+        return json.loads(raw)
+
+    wide_int = _WIDE_INT_BYTES if isinstance(raw, bytes) else _WIDE_INT_STR
+    if not wide_int.search(raw):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+
+    # Inputs orjson rejects or would alter (NaN, huge ints, lone surrogates)
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    return json.loads(raw, parse_float=_StdlibFloat, parse_constant=_StdlibFloat)
+
+
+def read_json(path):
+    """
+    Reads and parses a JSON file.
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_json(path, data):
+    """
+    Writes data to path in the pipeline's standard format (indent=2).
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(data))
@@ -0,0 +1,171 @@
+import json
+import logging
+import sys
+
+from utils.metrics import count_warning
+
+# Every module logs under this logger (see get_logger); configure_logging
+# attaches the handlers to it
+LOGGER_NAME = "formatter"
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+# Per-file conditions are counted by warn() and logged once per run by
+# log_warning_summary: {category: (level, summary)}
+WARNING_SUMMARIES = {
+    "bill_missing_action_dates": (logging.WARNING, "⚠️ {count} bills missing action dates"),
+    "placeholder_bill": (
+        logging.INFO,
+        "📝 Created {count} bill placeholders for vote events",
+    ),
+    "unrecognized_file": (logging.WARNING, "❓ {count} files of unrecognized type"),
+    "event_handler_failed": (logging.WARNING, "❌ {count} events failed to save"),
+    "ambiguous_session_name": (
+        logging.WARNING,
+        "⚠️ {count} lookups of session names shared by several date folders",
+    ),
+}
+
+
+def get_logger(name) -> logging.Logger:
+    """
+    Returns the logger for a module (pass __name__).
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class BufferedHandler(logging.Handler):
+    """
+    Collects formatted records and writes them out in one call every
+    `capacity` records, on records at flush_level or above, and on flush().
+
+    Without a stream, records go to whatever sys.stdout is at write time, so
+    redirect_stdout (batch.py logs, click's test runner) still applies.
+    """
+
+    def __init__(self, stream=None, capacity=500, flush_level=logging.ERROR):
+        super().__init__()
+        self.stream = stream
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.buffer = []
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self.buffer.append(line)
+        if len(self.buffer) >= self.capacity or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.buffer:
+                stream = self.stream or sys.stdout
+                stream.write("\n".join(self.buffer) + "\n")
+                stream.flush()
+                self.buffer.clear()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        if self.stream is not None:
+            self.stream.close()
+        super().close()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, logger, message, and the
+    category/count of warn() and log_warning_summary records.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("category", "count"):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level="info", json_path=None, capacity=500):
+    """
+    Sets up console logging at `level` (per-file messages are debug) and,
+    optionally, a JSON-lines sink at json_path that records everything down
+    to debug. Replaces the handlers of an earlier call.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = False
+
+    console = BufferedHandler(capacity=capacity)
+    console.setLevel(LOG_LEVELS[level])
+    console.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(console)
+    logger.setLevel(LOG_LEVELS[level])
+
+    if json_path is not None:
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        sink = BufferedHandler(open(json_path, "a", encoding="utf-8"), capacity)
+        sink.setLevel(logging.DEBUG)
+        sink.setFormatter(JsonLinesFormatter())
+        logger.addHandler(sink)
+        logger.setLevel(logging.DEBUG)
+
+
+def flush_logs():
+    """
+    Writes out buffered records, e.g. before printing or prompting directly,
+    or before forking worker processes (which would inherit the buffer).
+    """
+    for handler in logging.getLogger(LOGGER_NAME).handlers:
+        handler.flush()
+
+
+def warn(logger, category, message, *args):
+    """
+    Counts a per-file condition under category (see WARNING_SUMMARIES) and
+    logs the file's own message at debug level only.
+    """
+    count_warning(category)
+    logger.debug(message, *args, extra={"category": category})
+
+
+def log_warning_summary(metrics):
+    """
+    Logs one line per warning category counted this run, and one per
+    data_not_processed/ category files were saved to.
+
+    Args:
+        metrics (dict): As returned by utils.metrics.get_metrics.
+    """
+    logger = get_logger(__name__)
+    for category, count in sorted(metrics["warnings"].items()):
+        level, summary = WARNING_SUMMARIES.get(
+            category, (logging.WARNING, f"⚠️ {{count}} × {category}")
+        )
+        logger.log(
+            level, summary.format(count=count), extra={"category": category, "count": count}
+        )
+    for category, count in sorted(metrics["errors"].items()):
+        logger.warning(
+            f"⚠️ {count} files saved to data_not_processed/{category}",
+            extra={"category": category, "count": count},
+        )
@@ -0,0 +1,259 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from utils.archive_utils import is_archive
+from utils.json_codec import dumps, read_json, write_json
+from utils.run_context import current_run
+
+MANIFEST_FILENAME = "input_manifest.json"
+# 2: entries record the bill folder each input wrote ("bill_folder")
+MANIFEST_VERSION = 2
+
+
+def hash_bytes(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+# Outputs are only recorded in runs started with record_outputs=True (see
+# utils.run_context.RunContext), relative to the run's output_root
+
+
+def get_recorded_outputs() -> dict:
+    """
+    Returns {input_filename: [relative output paths]} recorded in the current
+    run so far.
+    """
+    outputs = current_run().recorded_outputs or {}
+    return {name: sorted(paths) for name, paths in outputs.items()}
+
+
+def merge_recorded_outputs(outputs: dict):
+    """
+    Folds outputs recorded elsewhere (e.g. by worker processes) into the
+    current run's recording, so later stages can still discard them.
+    """
+    recorded = current_run().recorded_outputs
+    if recorded is not None:
+        for name, paths in outputs.items():
+            recorded.setdefault(name, set()).update(paths)
+
+
+def recorded_output_paths() -> set:
+    """
+    Returns every output path recorded so far in this run.
+    """
+    return set().union(*(current_run().recorded_outputs or {}).values())
+
+
+def set_current_input(filename):
+    run = current_run()
+    if run.recorded_outputs is not None:
+        run.current_input = filename
+        run.recorded_outputs.setdefault(filename, set())
+
+
+def _relative(run, path):
+    path = str(path)
+    root = str(run.output_root).rstrip(os.sep) + os.sep
+    return path[len(root) :] if path.startswith(root) else os.path.relpath(path, root)
+
+
+def record_output(path):
+    """
+    Attributes an output file to the current input (no-op when not recording).
+    """
+    run = current_run()
+    if run.recorded_outputs is not None and run.current_input is not None:
+        run.recorded_outputs[run.current_input].add(_relative(run, path))
+
+
+def record_output_for(filename, path):
+    """
+    Attributes an output file to a given input, for outputs written after the
+    input itself was processed (e.g. downloaded PDFs).
+    """
+    run = current_run()
+    if run.recorded_outputs is not None:
+        run.recorded_outputs.setdefault(filename, set()).add(_relative(run, path))
+
+
+def discard_output(path):
+    """
+    Forgets an output of the current input that was deleted during the run
+    (e.g. an archived event removed once it was linked).
+    """
+    run = current_run()
+    if run.recorded_outputs is not None and run.current_input is not None:
+        run.recorded_outputs[run.current_input].discard(_relative(run, path))
+
+
+def session_mapping_fingerprint(session_mapping: dict) -> str:
+    return hash_bytes(dumps(session_mapping).encode("utf-8"))
+
+
+def load_manifest(output_folder: Path):
+    """
+    Returns the manifest from the previous incremental run, or None.
+    """
+    manifest_path = output_folder / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return None
+    manifest = read_json(manifest_path)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(
+    output_folder: Path, jurisdiction, session_fingerprint, inputs, compression=None
+):
+    output_folder.mkdir(parents=True, exist_ok=True)
+    write_json(
+        output_folder / MANIFEST_FILENAME,
+        {
+            "version": MANIFEST_VERSION,
+            "jurisdiction": jurisdiction,
+            "session_mapping": session_fingerprint,
+            "compression": compression,
+            "inputs": dict(sorted(inputs.items())),
+        },
+    )
+
+
+def discard_manifest(output_folder: Path):
+    """
+    Removes the manifest so a crashed incremental run forces a full rebuild.
+    """
+    (output_folder / MANIFEST_FILENAME).unlink(missing_ok=True)
+
+
+def fingerprint_inputs(input_path, previous_inputs):
+    """
+    Fingerprints every *.json input without decoding it.
+
+    Folder inputs whose size and mtime match the previous manifest reuse the
+    stored hash without being read; everything else is hashed from its bytes.
+
+    Returns:
+        dict: {filename: {"hash": ..., "size": ..., "mtime_ns": ...}}
+    """
+    # Imported here: io_utils depends on this module for output recording
+    from utils.io_utils import iter_raw_json_files, scan_json_filenames
+
+    fingerprints = {}
+    if is_archive(input_path):
+        for filename, raw in iter_raw_json_files(input_path, stage="fingerprint"):
+            fingerprints[filename] = {"hash": hash_bytes(raw), "size": len(raw)}
+        return fingerprints
+
+    for filename in scan_json_filenames(input_path):
+        stat = os.stat(os.path.join(input_path, filename))
+        previous = previous_inputs.get(filename)
+        if (
+            previous
+            and previous.get("size") == stat.st_size
+            and previous.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            digest = previous["hash"]
+        else:
+            with open(os.path.join(input_path, filename), "rb") as f:
+                digest = hash_bytes(f.read())
+        fingerprints[filename] = {
+            "hash": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    return fingerprints
+
+
+def plan_incremental_run(previous_inputs, fingerprints):
+    """
+    Splits inputs into those that can be kept and those that must be (re)processed.
+
+    An input is reprocessed when it is new or its hash changed. Whether and
+    where an event is linked depends on every bill, so when any bill or vote
+    input is new, changed or removed, every event is reprocessed (and
+    relinked) as well.
+
+    Returns:
+        tuple: (to_process: set of filenames,
+                kept: {filename: manifest entry},
+                stale: {filename: manifest entry} whose outputs must be removed)
+    """
+    # Imported here: process_utils depends on this module for output recording
+    from utils.process_utils import handler_kind
+
+    changed = {
+        filename
+        for filename, fingerprint in fingerprints.items()
+        if previous_inputs.get(filename, {}).get("hash") != fingerprint["hash"]
+    }
+    removed = set(previous_inputs) - set(fingerprints)
+    bills_changed = any(
+        handler_kind(filename) in ("bill", "vote_event") for filename in changed | removed
+    )
+
+    to_process, kept, stale = set(), {}, {}
+    for filename, fingerprint in fingerprints.items():
+        previous = previous_inputs.get(filename)
+        relink = bills_changed and handler_kind(filename) == "event"
+        if filename not in changed and not relink:
+            kept[filename] = {**previous, **fingerprint}
+        else:
+            to_process.add(filename)
+            if previous:
+                stale[filename] = previous
+
+    for filename in removed:
+        stale[filename] = previous_inputs[filename]
+
+    return to_process, kept, stale
+
+
+def _is_hollow(folder: Path) -> bool:
+    """True if folder contains nothing but (recursively) empty folders."""
+    return all(
+        child.is_dir() and not child.is_symlink() and _is_hollow(child)
+        for child in folder.iterdir()
+    )
+
+
+def remove_stale_outputs(output_folder: Path, stale, claimed):
+    """
+    Deletes outputs of changed or removed inputs that are no longer claimed,
+    i.e. not produced by a kept input nor rewritten during this run, then
+    prunes folders (e.g. a bill's logs/ and files/) left without any files.
+
+    Args:
+        stale (dict): Previous manifest entries of changed or removed inputs.
+        claimed (set): Relative output paths that must be kept.
+
+    Returns:
+        int: Number of files removed.
+    """
+    removed = 0
+    touched_folders = set()
+    for entry in stale.values():
+        for relative in entry.get("outputs", []):
+            if relative in claimed:
+                continue
+            path = output_folder / relative
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            touched_folders.add(path.parent)
+
+    root = output_folder.resolve()
+    for folder in sorted(touched_folders, key=lambda p: len(p.parts), reverse=True):
+        # Walk up while the folder holds no files at all
+        hollow = None
+        while folder.exists() and folder.resolve() != root and _is_hollow(folder):
+            hollow, folder = folder, folder.parent
+        if hollow is not None:
+            shutil.rmtree(hollow)
+
+    return removed
@@ -0,0 +1,99 @@
+import time
+from contextlib import contextmanager
+
+from utils.json_codec import write_json
+from utils.run_context import current_run
+
+# Metrics are kept per run (see utils.run_context.RunContext): stage totals,
+# where stages are e.g. "load", "parse", "handle_bill", "write_action", error
+# files per category, and warnings, summarized once per run (see
+# utils.log_utils)
+
+
+def _empty_stage():
+    return {"seconds": 0.0, "files": 0, "bytes_read": 0, "bytes_written": 0}
+
+
+def add_stage_metrics(
+    stage, seconds=0.0, files=0, bytes_read=0, bytes_written=0, run=None
+):
+    """
+    Adds to a stage's totals in run (the current run by default). Safe to
+    call from background writer threads.
+    """
+    run = run or current_run()
+    with run.lock:
+        totals = run.stages.get(stage)
+        if totals is None:
+            totals = run.stages[stage] = _empty_stage()
+        totals["seconds"] += seconds
+        totals["files"] += files
+        totals["bytes_read"] += bytes_read
+        totals["bytes_written"] += bytes_written
+
+
+@contextmanager
+def timed_stage(stage):
+    """
+    Adds the wall time of the with-block to stage.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_stage_metrics(stage, time.perf_counter() - started)
+
+
+def count_error(category):
+    run = current_run()
+    with run.lock:
+        run.errors[category] = run.errors.get(category, 0) + 1
+
+
+def count_warning(category):
+    run = current_run()
+    with run.lock:
+        run.warnings[category] = run.warnings.get(category, 0) + 1
+
+
+def get_metrics() -> dict:
+    """
+    Returns a copy of the current run's metrics:
+    {"stages": ..., "errors": ..., "warnings": ...}.
+    """
+    run = current_run()
+    with run.lock:
+        return {
+            "stages": {stage: dict(totals) for stage, totals in run.stages.items()},
+            "errors": dict(run.errors),
+            "warnings": dict(run.warnings),
+        }
+
+
+def add_metrics(metrics):
+    """
+    Adds metrics gathered elsewhere (e.g. by a worker process) to the current
+    run's totals.
+    """
+    run = current_run()
+    for stage, totals in metrics["stages"].items():
+        add_stage_metrics(stage, run=run, **totals)
+    with run.lock:
+        for category, count in metrics["errors"].items():
+            run.errors[category] = run.errors.get(category, 0) + count
+        for category, count in metrics["warnings"].items():
+            run.warnings[category] = run.warnings.get(category, 0) + count
+
+
+def write_metrics_report(path, report):
+    """
+    Writes a run report (see main.run_pipeline) as JSON, rounding stage
+    timings to the millisecond.
+    """
+    report = dict(report)
+    report["stages"] = {
+        stage: {**totals, "seconds": round(totals["seconds"], 3)}
+        for stage, totals in sorted(report["stages"].items())
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, report)
@@ -0,0 +1,327 @@
+import os
+import queue
+import threading
+import time
+
+from utils.compression import compress_bytes, compressed_path
+from utils.json_codec import dumps
+from utils.manifest_utils import record_output
+from utils.metrics import add_stage_metrics
+from utils.run_context import current_run
+from utils.sqlite_store import SqliteOutputStore
+
+
+def get_write_stats() -> dict:
+    run = current_run()
+    return {category: dict(stats) for category, stats in run.write_stats.items()}
+
+
+def get_write_errors() -> list:
+    return list(current_run().write_errors)
+
+
+def add_write_errors(errors):
+    """
+    Adds write errors reported elsewhere (e.g. by a worker process).
+    """
+    current_run().write_errors.extend(errors)
+
+
+def add_write_stats(stats):
+    """
+    Adds write stats gathered elsewhere (e.g. by a worker process) to the
+    current run's totals.
+    """
+    run = current_run()
+    for category, counts in stats.items():
+        target = run.write_stats.setdefault(category, {"written": 0, "skipped": 0})
+        for key, value in counts.items():
+            target[key] += value
+
+
+def _count_write(run, category, written):
+    with run.lock:
+        stats = run.write_stats.setdefault(category, {"written": 0, "skipped": 0})
+        stats["written" if written else "skipped"] += 1
+
+
+def summarize_write_stats(stats, categories) -> dict:
+    """
+    Totals written/skipped counts over several categories, e.g. a bill's
+    snapshot plus its action logs.
+    """
+    return {
+        key: sum(stats.get(category, {}).get(key, 0) for category in categories)
+        for key in ("written", "skipped")
+    }
+
+
+def _matches_existing(path, encoded: bytes) -> bool:
+    try:
+        if os.stat(path).st_size != len(encoded):
+            return False
+    except FileNotFoundError:
+        return False
+    with open(path, "rb") as f:
+        return f.read() == encoded
+
+
+def _write_encoded(run, path, encoded: bytes, category) -> bool:
+    started = time.perf_counter()
+    if run.compare_existing and _matches_existing(path, encoded):
+        written = False
+    else:
+        with open(path, "wb") as f:
+            f.write(encoded)
+            if run.fsync_output:
+                f.flush()
+                os.fsync(f.fileno())
+        written = True
+    add_stage_metrics(
+        f"write_{category}",
+        time.perf_counter() - started,
+        files=1,
+        bytes_written=len(encoded) if written else 0,
+        run=run,
+    )
+    _count_write(run, category, written)
+    return written
+
+
+class _BackgroundWriter:
+    """
+    Thread pool that performs output writes behind the caller's back.
+
+    Each thread owns a bounded queue, and every write is routed to a queue by
+    its directory, so writes to one folder land in submission order and a
+    producer that outruns the disk blocks instead of buffering everything.
+    Writes are made, counted and reported as failed in the run that started
+    the writer.
+    """
+
+    def __init__(self, run):
+        self.run = run
+        threads = run.write_threads
+        # {path: queued or running writes}; a path submitted twice stays
+        # pending until both writes are done
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.queues = [
+            queue.Queue(maxsize=max(1, run.max_pending_writes // threads))
+            for _ in range(threads)
+        ]
+        self.threads = [
+            threading.Thread(target=self._run, args=(q,), daemon=True)
+            for q in self.queues
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, path, encoded, category):
+        path = os.fspath(path)
+        with self.pending_lock:
+            self.pending[path] = self.pending.get(path, 0) + 1
+        shard = hash(os.path.dirname(path)) % len(self.queues)
+        self.queues[shard].put((path, encoded, category))
+
+    def _run(self, q):
+        while True:
+            item = q.get()
+            try:
+                if item is None:
+                    return
+                path, encoded, category = item
+                try:
+                    _write_encoded(self.run, path, encoded, category)
+                except Exception as e:
+                    with self.run.lock:
+                        self.run.write_errors.append({"path": path, "error": repr(e)})
+                finally:
+                    self._done(path)
+            finally:
+                q.task_done()
+
+    def _done(self, path):
+        with self.pending_lock:
+            if self.pending[path] == 1:
+                del self.pending[path]
+            else:
+                self.pending[path] -= 1
+
+    def is_pending(self, path) -> bool:
+        return os.fspath(path) in self.pending
+
+    def flush(self):
+        for q in self.queues:
+            q.join()
+
+    def close(self):
+        self.flush()
+        for q in self.queues:
+            q.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+def open_outputs(run):
+    """
+    Starts writing the run's outputs the way it is configured to: into a
+    SQLite store at run.sqlite_path, through run.write_threads background
+    threads, or inline. close_outputs (called by utils.run_context.open_run
+    on the way out at the latest) finishes them.
+    """
+    close_outputs(run)
+    if run.sqlite_path is not None:
+        run.store = SqliteOutputStore(run.sqlite_path, run.output_root, run.jurisdiction)
+    elif run.write_threads:
+        run.writer = _BackgroundWriter(run)
+
+
+def flush_background_writes():
+    """
+    Blocks until every write submitted in the current run has reached the
+    disk (or failed). With fsync_output this is also a durability barrier.
+    """
+    writer = current_run().writer
+    if writer is not None:
+        writer.flush()
+
+
+def close_outputs(run):
+    """
+    Drains the run's background writer and commits and closes its SQLite
+    store; outputs are written inline afterwards. Safe to call repeatedly.
+    """
+    writer, run.writer = run.writer, None
+    store, run.store = run.store, None
+    try:
+        if writer is not None:
+            writer.close()
+    finally:
+        if store is not None:
+            store.close()
+
+
+def output_file_path(path):
+    """
+    Returns the path write_output actually writes for path, i.e. with the
+    .gz/.zst suffix when output compression is enabled.
+    """
+    return compressed_path(path, current_run().compression)
+
+
+def get_output_store():
+    """
+    Returns the current run's SQLite output store, or None while outputs are
+    written as files.
+    """
+    return current_run().store
+
+
+def output_exists(path) -> bool:
+    """
+    True if path exists (on disk or in the output store) or is still queued
+    for a background write.
+    """
+    run = current_run()
+    if run.store is not None:
+        return run.store.exists(path)
+    return (run.writer is not None and run.writer.is_pending(path)) or os.path.exists(
+        path
+    )
+
+
+def make_output_folder(folder):
+    store = current_run().store
+    if store is not None:
+        store.add_folder(folder)
+    else:
+        os.makedirs(folder, exist_ok=True)
+
+
+def list_output_folder(folder) -> set:
+    """
+    Returns the names of the entries directly inside an output folder.
+    """
+    store = current_run().store
+    if store is not None:
+        return store.list_folder(folder)
+    if not os.path.isdir(folder):
+        return set()
+    with os.scandir(folder) as entries:
+        return {entry.name for entry in entries}
+
+
+def remove_output(path):
+    store = current_run().store
+    if store is not None:
+        store.remove(path)
+    else:
+        os.unlink(path)
+
+
+def write_raw_output(path, raw: bytes, category):
+    """
+    Writes already-encoded bytes (e.g. an archived event) as they are, to the
+    output store or to disk. Not counted in the write stats.
+    """
+    record_output(path)
+    started = time.perf_counter()
+    store = current_run().store
+    if store is not None:
+        store.put(path, raw, category)
+    else:
+        with open(path, "wb") as f:
+            f.write(raw)
+    add_stage_metrics(
+        f"write_{category}",
+        time.perf_counter() - started,
+        files=1,
+        bytes_written=len(raw),
+    )
+
+
+def write_output(path, data, category):
+    """
+    Writes one processed or error output file and attributes it to the input
+    currently being handled (used by incremental runs).
+
+    Writes follow the current run's settings (see utils.run_context). The
+    write is skipped when the file already holds exactly these bytes, so
+    unchanged outputs keep their mtime. While a background writer is running,
+    data is encoded here but compared and written on a writer thread; failures
+    are collected for the run summary (see get_write_errors). With output
+    compression enabled, the compressed bytes are written to path + ".gz" or
+    ".zst" (see output_file_path).
+
+    Args:
+        category (str): Kind of output for the run summary, e.g. "bill",
+            "action", "vote_event", "placeholder", "event" or "error".
+
+    Returns:
+        bool: True if the file was written, False if it was already up to
+        date, or None if the write was queued.
+    """
+    run = current_run()
+    encoded = dumps(data).encode("utf-8")
+    if run.compression is not None:
+        path = compressed_path(path, run.compression)
+        encoded = compress_bytes(encoded, run.compression)
+    record_output(path)
+
+    if run.store is not None:
+        started = time.perf_counter()
+        run.store.put(path, encoded, category)
+        add_stage_metrics(
+            f"write_{category}",
+            time.perf_counter() - started,
+            files=1,
+            bytes_written=len(encoded),
+            run=run,
+        )
+        _count_write(run, category, True)
+        return True
+    if run.writer is not None:
+        run.writer.submit(path, encoded, category)
+        return None
+    return _write_encoded(run, path, encoded, category)
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from utils.output_writer import make_output_folder, output_exists, output_file_path
+from utils.run_context import current_run
+
+# The caches below are kept per run (see utils.run_context.RunContext)
+
+
+def reset_path_registry():
+    """
+    Forgets every path seen so far in the current run, e.g. once outputs were
+    deleted mid-run.
+    """
+    run = current_run()
+    run.session_paths.clear()
+    run.known_folders.clear()
+    run.known_placeholders.clear()
+
+
+def session_path(output_folder, STATE_ABBR, date_folder, session_name) -> Path:
+    """
+    Returns the output folder of one session, building the path only once per run:
+    output_folder/country:us/state:xx/sessions/ocd-session/country:us/state:xx/<date_folder>/<session_name>
+    """
+    session_paths = current_run().session_paths
+    key = (output_folder, STATE_ABBR, date_folder, session_name)
+    path = session_paths.get(key)
+    if path is None:
+        path = session_paths[key] = Path(output_folder).joinpath(
+            f"country:us",
+            f"state:{STATE_ABBR}",
+            "sessions",
+            "ocd-session",
+            f"country:us",
+            f"state:{STATE_ABBR}",
+            date_folder,
+            session_name,
+        )
+    return path
+
+
+def ensure_folder(folder: Path) -> Path:
+    """
+    Creates folder (and its parents) the first time it is seen in this run.
+    """
+    known_folders = current_run().known_folders
+    if folder not in known_folders:
+        make_output_folder(folder)
+        known_folders.add(folder)
+    return folder
+
+
+def ensure_bill_folder(
+    output_folder, STATE_ABBR, date_folder, session_name, bill_identifier
+) -> Path:
+    """
+    Returns a bill's output folder, creating its logs/ and files/ subfolders
+    once per run no matter how many bills and votes write into it.
+    """
+    bill_folder = session_path(output_folder, STATE_ABBR, date_folder, session_name)
+    bill_folder = bill_folder / "bills" / bill_identifier
+    known_folders = current_run().known_folders
+    if bill_folder not in known_folders:
+        make_output_folder(bill_folder / "logs")
+        make_output_folder(bill_folder / "files")
+        known_folders.update(
+            (bill_folder, bill_folder / "logs", bill_folder / "files")
+        )
+    return bill_folder
+
+
+def placeholder_exists(placeholder_file: Path) -> bool:
+    """
+    True if the placeholder exists or was already written (or queued) this
+    run; each placeholder is looked up on disk at most once per run.
+    """
+    known_placeholders = current_run().known_placeholders
+    if placeholder_file in known_placeholders:
+        return True
+    if output_exists(output_file_path(placeholder_file)):
+        known_placeholders.add(placeholder_file)
+        return True
+    return False
+
+
+def remember_placeholder(placeholder_file: Path):
+    current_run().known_placeholders.add(placeholder_file)
@@ -0,0 +1,423 @@
+import asyncio
+import fcntl
+import hashlib
+import http.client
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from utils.log_utils import get_logger
+from utils.manifest_utils import record_output_for
+from utils.run_context import current_run
+
+PDF_MEDIA_TYPE = "application/pdf"
+# Every PDF file starts with this
+PDF_MAGIC = b"%PDF-"
+USER_AGENT = "openstates-scraped-data-formatter"
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+
+logger = get_logger(__name__)
+
+
+class _RetryableError(Exception):
+    pass
+
+
+def pdf_filename(version, url) -> str:
+    """
+    One stable name per version link, e.g. "house_amendment_001_3fa2b1c9.pdf":
+    the version note plus a short hash of the URL, so versions never overwrite
+    each other and a version keeps its name across runs.
+    """
+    note = re.sub(r"[^\w]+", "_", (version.get("note") or "").lower()).strip("_")
+    url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()[:8]
+    return f"{note[:60] or 'version'}_{url_hash}.pdf"
+
+
+def bill_pdf_links(content):
+    """
+    Yields (version, url) for every PDF link in the bill's versions.
+    """
+    for version in content.get("versions", []):
+        for link in version.get("links", []):
+            url = link.get("url")
+            if not url:
+                continue
+            if link.get("media_type") == PDF_MEDIA_TYPE or urlsplit(
+                url
+            ).path.lower().endswith(".pdf"):
+                yield version, url
+
+
+def queue_bill_pdfs(content, files_dir, source=None):
+    """
+    Queues the bill's version PDFs to be saved in files_dir, as
+    (url, target_path, input_filename) jobs for the download stage (no-op
+    unless the current run was started with collect_pdfs=True).
+    """
+    pdf_jobs = current_run().pdf_jobs
+    if pdf_jobs is None:
+        return
+    for version, url in bill_pdf_links(content):
+        pdf_jobs.append((url, files_dir / pdf_filename(version, url), source))
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfCache:
+    """
+    Content-addressed store of downloaded PDFs, shared across runs and
+    jurisdictions:
+
+        objects/<ab>/<sha256>.pdf   the PDF bytes, named by their hash
+        urls/<ab>/<sha256 of url>   the content hash a URL resolved to
+        partial/<sha256 of url>     an interrupted download, resumed later
+        partial/<sha256 of url>.lock  held while a process downloads the URL
+
+    Every entry is written to a temporary name and renamed into place, so
+    concurrent runs never see half-written files, and only the process
+    holding a URL's lock writes its partial download (see lock_partial).
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    @staticmethod
+    def _url_key(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _url_entry(self, url):
+        key = self._url_key(url)
+        return self.root / "urls" / key[:2] / key
+
+    def object_path(self, digest):
+        return self.root / "objects" / digest[:2] / f"{digest}.pdf"
+
+    def partial_path(self, url):
+        return self.root / "partial" / self._url_key(url)
+
+    def lock_partial(self, url):
+        """
+        Blocks until this process holds the exclusive lock on url's partial
+        download and returns the lock file; closing it, or the process
+        exiting, releases the lock. Concurrent runs fetching the same URL
+        thus take turns, and the later one finds it in the cache.
+        """
+        path = self.root / "partial" / f"{self._url_key(url)}.lock"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock = open(path, "ab")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except BaseException:
+            lock.close()
+            raise
+        return lock
+
+    def lookup(self, url):
+        """
+        Returns the cached object for url, or None if it must be downloaded.
+        """
+        try:
+            digest = self._url_entry(url).read_text().strip()
+        except FileNotFoundError:
+            return None
+        path = self.object_path(digest)
+        return path if path.exists() else None
+
+    def store(self, url, partial):
+        """
+        Moves a finished download into the store and returns its object path.
+
+        Raises:
+            RuntimeError: If the download isn't a PDF (e.g. an HTML error page
+                served with status 200); it is discarded.
+        """
+        with open(partial, "rb") as f:
+            is_pdf = f.read(len(PDF_MAGIC)) == PDF_MAGIC
+        if not is_pdf:
+            partial.unlink()
+            raise RuntimeError("not a PDF")
+        digest = _file_digest(partial)
+
+        path = self.object_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(partial, path)
+
+        entry = self._url_entry(url)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        tmp.write_text(digest)
+        os.replace(tmp, entry)
+        return path
+
+
+class _HostPool:
+    """
+    Keep-alive connections to one host, and the limit on concurrent requests.
+    """
+
+    def __init__(self, scheme, netloc, limit, timeout):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle = []
+
+    def acquire(self):
+        # Called from several threads at once: pop() either takes an idle
+        # connection or finds none left
+        try:
+            return self.idle.pop()
+        except IndexError:
+            pass
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def release(self, conn):
+        self.idle.append(conn)
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+        self.idle.clear()
+
+
+def _place(cached, target):
+    """
+    Copies a cached object to target, never linking it, so editing an output
+    PDF can't change the cache other runs read. Returns False if target
+    already holds the same bytes.
+    """
+    try:
+        if target.stat().st_size == cached.stat().st_size and (
+            _file_digest(target) == cached.stem
+        ):
+            return False
+    except FileNotFoundError:
+        pass
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    shutil.copyfile(cached, tmp)
+    os.replace(tmp, target)
+    return True
+
+
+class PdfDownloader:
+    """
+    Downloads URLs into a PdfCache with asyncio: requests run on a thread
+    pool over pooled keep-alive connections, at most per_host at a time per
+    host and total overall. Failed requests (connection errors, 429 and 5xx)
+    are retried with exponential backoff, resuming partial downloads with a
+    Range request.
+    """
+
+    def __init__(
+        self, cache, per_host=4, total=16, retries=3, backoff=0.5, timeout=30
+    ):
+        self.cache = cache
+        self.per_host = per_host
+        self.total = total
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.pools = {}
+
+    def _pool(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        if key not in self.pools:
+            self.pools[key] = _HostPool(
+                parts.scheme, parts.netloc, self.per_host, self.timeout
+            )
+        return self.pools[key]
+
+    def _request(self, pool, url, partial):
+        """
+        One blocking GET (run on the thread pool). Appends to partial when the
+        server honours the Range request, and rewrites it otherwise.
+
+        Returns:
+            tuple: ("done", None) or ("redirect", location).
+        """
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        offset = partial.stat().st_size if partial.exists() else 0
+        headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        conn = pool.acquire()
+        try:
+            conn.request("GET", target, headers=headers)
+            response = conn.getresponse()
+            outcome = self._read_response(response, url, partial, offset)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise _RetryableError(str(e) or type(e).__name__) from e
+        except BaseException:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            pool.release(conn)
+        return outcome
+
+    @staticmethod
+    def _read_response(response, url, partial, offset):
+        status = response.status
+        if status in (301, 302, 303, 307, 308):
+            response.read()
+            return "redirect", urljoin(url, response.getheader("Location", ""))
+        if status == 416 and offset:
+            # Nothing left past offset: the partial file is complete
+            response.read()
+            return "done", None
+        if status == 429 or status >= 500:
+            response.read()
+            raise _RetryableError(f"HTTP {status}")
+        if status not in (200, 206):
+            response.read()
+            raise RuntimeError(f"HTTP {status}")
+        if status == 206 and not response.getheader("Content-Range", "").startswith(
+            f"bytes {offset}-"
+        ):
+            # Not the range asked for: start over
+            response.read()
+            partial.unlink(missing_ok=True)
+            raise _RetryableError("unexpected Content-Range")
+
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        with open(partial, "ab" if status == 206 else "wb") as f:
+            while True:
+                block = response.read(CHUNK_SIZE)
+                if not block:
+                    break
+                f.write(block)
+        if response.length:
+            # Bytes received so far stay in partial for the retry to resume
+            raise _RetryableError("connection closed mid-download")
+        return "done", None
+
+    async def _fetch(self, url, limit):
+        """
+        Downloads url into the cache, following redirects and retrying.
+        """
+        partial = self.cache.partial_path(url)
+        location = url
+        for _ in range(MAX_REDIRECTS + 1):
+            pool = self._pool(location)
+            for attempt in range(self.retries + 1):
+                try:
+                    async with pool.semaphore, limit:
+                        outcome, redirect = await asyncio.to_thread(
+                            self._request, pool, location, partial
+                        )
+                    break
+                except _RetryableError:
+                    if attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self.backoff * 2**attempt)
+            if outcome == "done":
+                return self.cache.store(url, partial)
+            location = redirect
+        raise RuntimeError("too many redirects")
+
+    async def _download(self, url, targets, limit, stats):
+        cached = self.cache.lookup(url)
+        fetched = False
+        if cached is None:
+            try:
+                lock = await asyncio.to_thread(self.cache.lock_partial, url)
+                try:
+                    # Another run may have fetched the URL while this one waited
+                    cached = self.cache.lookup(url)
+                    if cached is None:
+                        cached = await self._fetch(url, limit)
+                        fetched = True
+                finally:
+                    lock.close()
+            except Exception as e:
+                logger.debug("❌ Error downloading PDF: %s (%s)", url, e)
+                stats["failed"] += 1
+                return
+        if fetched:
+            stats["downloaded"] += 1
+            stats["bytes"] += cached.stat().st_size
+        else:
+            stats["cached"] += 1
+
+        for target, source in targets:
+            _place(cached, target)
+            if source is not None:
+                record_output_for(source, target)
+
+    async def run(self, jobs):
+        """
+        Downloads every job; each URL is fetched at most once even when
+        several bills link to it.
+
+        Returns:
+            dict: {"downloaded", "cached", "failed", "bytes"} counts.
+        """
+        by_url = {}
+        for url, target, source in jobs:
+            by_url.setdefault(url, []).append((target, source))
+
+        stats = {"downloaded": 0, "cached": 0, "failed": 0, "bytes": 0}
+        limit = asyncio.Semaphore(self.total)
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.total))
+        try:
+            await asyncio.gather(
+                *(
+                    self._download(url, targets, limit, stats)
+                    for url, targets in by_url.items()
+                )
+            )
+        finally:
+            for pool in self.pools.values():
+                pool.close()
+        return stats
+
+
+def download_bill_pdfs(
+    jobs, cache_folder, per_host=4, total=16, retries=3, backoff=0.5
+):
+    """
+    Download stage: saves the PDFs queued by handle_bill next to their bills,
+    fetching only URLs not already in the cache under cache_folder.
+
+    Args:
+        jobs (list): (url, target_path, input_filename) from queue_bill_pdfs.
+        per_host (int): Concurrent requests (and pooled connections) per host.
+        total (int): Concurrent requests overall.
+
+    Returns:
+        dict: {"downloaded", "cached", "failed", "bytes", "seconds"}.
+    """
+    started = time.perf_counter()
+    downloader = PdfDownloader(
+        PdfCache(cache_folder),
+        per_host=per_host,
+        total=total,
+        retries=retries,
+        backoff=backoff,
+    )
+    stats = asyncio.run(downloader.run(jobs))
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
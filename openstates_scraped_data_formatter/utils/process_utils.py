@@ -1,8 +1,68 @@
-import click
+import math
+import re
+import tempfile
+import time
+import uuid
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
 
 from handlers import bill, vote_event, event
-from utils.file_utils import record_error_file
+from utils.file_utils import format_timestamp, record_error_file
+from utils.archive_utils import is_archive
 from utils.interactive import prompt_for_session_fix
+from utils.io_utils import (
+    iter_raw_json_files,
+    iter_spooled_json_files,
+    parse_json_files,
+    scan_json_filenames,
+    spool_raw_json_file,
+)
+from utils.json_codec import loads
+from utils.log_utils import flush_logs, get_logger, warn
+from utils.manifest_utils import get_recorded_outputs, merge_recorded_outputs
+from utils.metrics import add_metrics, add_stage_metrics, get_metrics
+from utils.progress import (
+    advance_progress,
+    inherited_progress_counters,
+    progress_counters,
+    set_input_total,
+    use_progress_counters,
+)
+from utils.output_writer import (
+    add_write_errors,
+    add_write_stats,
+    close_outputs,
+    get_output_store,
+    get_write_errors,
+    get_write_stats,
+    open_outputs,
+)
+from utils.run_context import current_run, open_run
+
+logger = get_logger(__name__)
+
+# Worker shard databases live here (under the output root) until merged
+SQLITE_SHARD_FOLDER = ".sqlite_shards"
+# Archive members are spooled per shard into a temporary folder (under the
+# output root) named like this while a parallel run processes them
+INPUT_SPOOL_PREFIX = ".input_shards_"
+
+# Top-level fields shard_key reads, per handler. An event's output name
+# also depends on fields events repeat when nested (name), so events with a
+# session are decoded in full
+SHARD_FIELDS = {
+    "bill": ("legislative_session", "identifier"),
+    "vote_event": ("legislative_session", "bill_identifier"),
+    "event": ("legislative_session",),
+}
+# A key anywhere in a JSON document, and its value if that is a string
+_FIELD_PATTERNS = {
+    field: re.compile(rb'"%s"\s*:\s*("(?:[^"\\]|\\.)*")?' % field.encode())
+    for field in ("legislative_session", "identifier", "bill_identifier")
+}
 
 
 def count_successful_saves(files, handler_function):
@@ -14,6 +74,20 @@ def count_successful_saves(files, handler_function):
     return count
 
 
+def handler_kind(filename):
+    """
+    Returns which handler route_handler sends a file to: "bill",
+    "vote_event", "event" or None.
+    """
+    if "bill_" in filename:
+        return "bill"
+    if "vote_event_" in filename:
+        return "vote_event"
+    if "event_" in filename:
+        return "event"
+    return None
+
+
 def route_handler(
     STATE_ABBR, filename, content, session_metadata, ERROR_FOLDER, OUTPUT_FOLDER
 ):
@@ -53,58 +127,571 @@ def route_handler(
             OUTPUT_FOLDER,
             ERROR_FOLDER,
             filename,
+            None,
         )
         return "event" if success else None
 
     else:
-        print(f"❓ Unrecognized file type: {filename}")
+        warn(logger, "unrecognized_file", "❓ Unrecognized file type: %s", filename)
         return None
 
 
 def process_and_save(
-    STATE_ABBR, data, ERROR_FOLDER, SESSION_MAPPING, SESSION_LOG_PATH, OUTPUT_FOLDER
+    STATE_ABBR,
+    data,
+    ERROR_FOLDER,
+    SESSION_MAPPING,
+    SESSION_LOG_PATH,
+    OUTPUT_FOLDER,
+    allow_session_fix=False,
+    bill_index=None,
+    session_index=None,
+    input_bills=None,
 ):
+    """
+    Routes each (filename, content) pair to its handler and counts successes.
+
+    `data` may be any iterable, including the generator returned by
+    utils.io_utils.iter_json_files, so files are handled as they are parsed.
+    When allow_session_fix is True, unknown sessions trigger an interactive prompt;
+    the answer may be a session identifier or a session name (resolved through
+    session_index, see utils.session_utils.build_session_name_index).
+
+    If bill_index is given, every bill folder written (by a bill or a vote)
+    is recorded in it as {bill_identifier: {"name", "date_folder"}}, the same
+    shape load_bill_to_session_mapping rebuilds from disk; the last input
+    writing a bill identifier wins. input_bills (if given) receives the bill
+    folder each input wrote, as {filename: {"bill_identifier", "name",
+    "date_folder"}}, from which bill_index_from_inputs rebuilds the index.
+    """
     bill_count = 0
     event_count = 0
     vote_event_count = 0
 
     for filename, content in data:
+        advance_progress("process")
         session = content.get("legislative_session")
         if not session:
-            print(f"⚠️ Skipping {filename}, missing legislative_session")
+            logger.debug("⚠️ Skipping %s, missing legislative_session", filename)
             record_error_file(ERROR_FOLDER, "missing_session", filename, content)
             continue
 
         session_metadata = SESSION_MAPPING.get(session)
 
         # Prompt user to fix if session is unknown: by default is toggled off
-        if not session_metadata and click.get_current_context().params["allow_session_fix"]:
+        if not session_metadata and allow_session_fix:
             new_session = prompt_for_session_fix(
                 filename, session, log_path=SESSION_LOG_PATH
             )
             if new_session:
-                SESSION_MAPPING[session] = new_session
-                session_metadata = new_session
+                session_metadata = SESSION_MAPPING.get(new_session) or (
+                    session_index or {}
+                ).get(new_session)
+                if session_metadata:
+                    SESSION_MAPPING[session] = session_metadata
+                else:
+                    logger.warning("⚠️ '%s' is not a known session either", new_session)
 
         if not session_metadata:
             record_error_file(ERROR_FOLDER, "unknown_session", filename, content)
             continue
 
+        started = time.perf_counter()
         result = route_handler(
             STATE_ABBR, filename, content, session_metadata, ERROR_FOLDER, OUTPUT_FOLDER
         )
+        # Handler time includes its writes unless a background writer runs
+        add_stage_metrics(
+            f"handle_{handler_kind(filename) or 'unrecognized'}",
+            time.perf_counter() - started,
+            files=1,
+        )
 
         if result == "bill":
             bill_count += 1
+            bill_identifier = content.get("identifier")
         elif result == "event":
             event_count += 1
         elif result == "vote_event":
             vote_event_count += 1
+            bill_identifier = content.get("bill_identifier")
+
+        if result in ("bill", "vote_event"):
+            bill_folder = {
+                "name": session_metadata["name"],
+                "date_folder": session_metadata["date_folder"],
+            }
+            if bill_index is not None:
+                bill_index[bill_identifier] = bill_folder
+            if input_bills is not None:
+                input_bills[filename] = {"bill_identifier": bill_identifier, **bill_folder}
 
-    print("\n✅ File processing complete.")
+    logger.info("\n✅ File processing complete.")
 
     return {
         "bills": bill_count,
         "events": event_count,
         "votes": vote_event_count,
     }
+
+
+def merge_counts(all_counts):
+    """
+    Sums a sequence of count dicts returned by process_and_save.
+    """
+    merged = {}
+    for counts in all_counts:
+        for key, value in counts.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def bill_index_from_inputs(bill_folders) -> dict:
+    """
+    Builds the bill index process_and_save records from the bill folders
+    inputs wrote (see its input_bills), given in input order; inputs that
+    wrote none may be given as None. The last input writing a bill
+    identifier wins, as in process_and_save.
+    """
+    bill_index = {}
+    for bill_folder in bill_folders:
+        if bill_folder:
+            bill_index[bill_folder["bill_identifier"]] = {
+                "name": bill_folder["name"],
+                "date_folder": bill_folder["date_folder"],
+            }
+    return bill_index
+
+
+def read_shard_fields(filename, raw):
+    """
+    Returns the top-level fields of an input file that shard_key reads, or
+    None for other files and files that don't parse.
+
+    Only those fields are decoded when each occurs at most once in the whole
+    file, with a string value: a key found once is the top-level one whenever
+    the top level has it, and a file whose top level lacks it never writes to
+    a shared output. Other files (e.g. bills whose related_bills repeat
+    legislative_session, or events with a session) are decoded in full.
+    """
+    kind = handler_kind(filename)
+    fields = SHARD_FIELDS.get(kind)
+    if fields is None:
+        return None
+    found = {}
+    for field in fields:
+        matches = _FIELD_PATTERNS[field].findall(raw)
+        if len(matches) > 1 or (matches and not matches[0]):
+            break
+        if matches:
+            found[field] = loads(matches[0])
+    else:
+        if kind != "event" or not found:
+            return found
+    try:
+        content = loads(raw)
+    except ValueError:
+        return None
+    return content if isinstance(content, dict) else None
+
+
+def shard_key(filename, content, SESSION_MAPPING):
+    """
+    Returns the shared output an input file writes to, or None for inputs
+    whose outputs are named after the input file itself (archived events,
+    errors). Files are classified the way route_handler does and sessions
+    are resolved the way process_and_save does, so session identifiers
+    naming the same session share a key:
+
+    - bills and votes: their bill folder, as (date_folder, session name,
+      bill identifier)
+    - events: their file under the session's events/ folder, which
+      handle_event names by start date and event name, as (date_folder,
+      session name, "events", file name)
+    """
+    kind = handler_kind(filename)
+    if kind not in SHARD_FIELDS:
+        return None
+    session = content.get("legislative_session")
+    session_metadata = SESSION_MAPPING.get(session) if session else None
+    if not session_metadata:
+        return None
+    folder = (session_metadata["date_folder"], session_metadata["name"])
+
+    if kind == "event":
+        # Mirrors the checks handle_event makes before it saves the event
+        start_date = content.get("start_date")
+        if not start_date or not content.get("bill_identifier"):
+            return None
+        short_name = event.clean_event_name(content.get("name", "event"))
+        return (*folder, "events", f"{format_timestamp(start_date)}_{short_name}")
+
+    if kind == "bill":
+        bill_identifier = content.get("identifier")
+    else:
+        bill_identifier = content.get("bill_identifier")
+    if not bill_identifier:
+        return None
+    return (*folder, bill_identifier)
+
+
+def shard_for(filename, content, shards, SESSION_MAPPING) -> int:
+    """
+    Picks the shard an input file is processed in: every file that writes to
+    the same bill folder or event file lands in the same shard, and other
+    files are spread by filename. Uses crc32 rather than hash(), which
+    differs per process.
+
+    Args:
+        content (dict, optional): The file's fields (see read_shard_fields).
+    """
+    key = shard_key(filename, content, SESSION_MAPPING) if content is not None else None
+    token = filename if key is None else "\0".join(str(part) for part in key)
+    return zlib.crc32(token.encode("utf-8")) % shards
+
+
+def _scan_shards(input_path, chunk, shards, SESSION_MAPPING):
+    """
+    Worker entry point for the first pass of a parallel run: assigns each file
+    of a chunk to its shard. Bill and vote files are only partly decoded (see
+    read_shard_fields); files that don't parse are left to the processing
+    pass to record.
+
+    Returns:
+        tuple: ([(filename, shard), ...] in input order, scan metrics).
+    """
+    with open_run():
+        if is_archive(input_path):
+            raw_files = chunk
+        else:
+            raw_files = iter_raw_json_files(input_path, chunk, stage="shard_scan")
+        assigned = [
+            (
+                filename,
+                shard_for(
+                    filename, read_shard_fields(filename, raw), shards, SESSION_MAPPING
+                ),
+            )
+            for filename, raw in raw_files
+        ]
+        return assigned, get_metrics()
+
+
+def _process_file_chunk(
+    STATE_ABBR,
+    input_path,
+    chunk,
+    EVENT_ARCHIVE_FOLDER,
+    ERROR_FOLDER,
+    SESSION_MAPPING,
+    SESSION_LOG_PATH,
+    OUTPUT_FOLDER,
+    run_settings,
+    sqlite_shard=False,
+):
+    """
+    Worker entry point: parses and routes one shard of input files.
+
+    The chunk is a list of filenames, in input order, that the worker reads
+    from the input folder, or None when input_path is a spool file holding
+    the shard's archive members (see spool_raw_json_file). Interactive
+    session fixes are never attempted inside a worker.
+    The chunk is processed in a run of its own, configured like the parent's
+    (see worker_run_settings), so its writes are compared, compressed,
+    recorded and queued the same way; its outputs are closed (draining a
+    background writer) before the chunk's results are returned. With
+    sqlite_shard set, outputs go to a shard database of their own, under the
+    output root, that the parent merges into its SQLite output store.
+
+    Returns:
+        dict: {
+            "counts": process_and_save counts for this chunk,
+            "events": parsed (filename, data) events for the linking stage,
+            "outputs": files produced per input (only when the run records
+                outputs, for incremental runs),
+            "write_stats": written/skipped file counts,
+            "write_errors": background writes that failed,
+            "input_bills": bill folder written by each input of this chunk,
+            "sqlite_shard": shard database path, or None,
+            "pdf_jobs": queued PDF downloads (only when the run collects them),
+            "metrics": stage metrics of this chunk (see utils.metrics),
+        }
+    """
+    shard_path = None
+    if sqlite_shard:
+        shard_folder = run_settings["output_root"] / SQLITE_SHARD_FOLDER
+        shard_folder.mkdir(parents=True, exist_ok=True)
+        shard_path = shard_folder / f"{uuid.uuid4().hex}.sqlite"
+
+    with open_run(
+        **run_settings,
+        sqlite_path=shard_path,
+        progress_counters=inherited_progress_counters(),
+    ) as run:
+        open_outputs(run)
+        events = []
+        if chunk is None:
+            raw_files = iter_spooled_json_files(input_path)
+        else:
+            raw_files = iter_raw_json_files(input_path, chunk)
+        json_files = parse_json_files(
+            raw_files,
+            EVENT_ARCHIVE_FOLDER,
+            ERROR_FOLDER,
+            event_sink=events,
+        )
+        input_bills = {}
+        counts = process_and_save(
+            STATE_ABBR,
+            json_files,
+            ERROR_FOLDER,
+            SESSION_MAPPING,
+            SESSION_LOG_PATH,
+            OUTPUT_FOLDER,
+            input_bills=input_bills,
+        )
+        close_outputs(run)
+        # Worker processes exit without running logging's shutdown flush
+        flush_logs()
+        return {
+            "counts": counts,
+            "events": events,
+            "outputs": get_recorded_outputs(),
+            "write_stats": get_write_stats(),
+            "write_errors": get_write_errors(),
+            "input_bills": input_bills,
+            "sqlite_shard": shard_path,
+            "pdf_jobs": run.pdf_jobs or [],
+            "metrics": get_metrics(),
+        }
+
+
+def worker_run_settings(run) -> dict:
+    """
+    Returns the settings (see utils.run_context.RunContext) a worker process
+    processes its share of run with: the same outputs, written the same way,
+    but without progress lines of its own (workers count into the parent's).
+    """
+    return {
+        "output_root": run.output_root,
+        "jurisdiction": run.jurisdiction,
+        "compare_existing": run.compare_existing,
+        "compression": run.compression,
+        "write_threads": run.write_threads,
+        "max_pending_writes": run.max_pending_writes,
+        "fsync_output": run.fsync_output,
+        "record_outputs": run.recorded_outputs is not None,
+        "collect_pdfs": run.pdf_jobs is not None,
+    }
+
+
+def _iter_scan_chunks(input_path, chunk_count, archive_chunk_size, filenames=None):
+    """
+    Splits the input into contiguous chunks for the shard scan.
+    Folder listings are cheap, so they are split evenly into chunk_count lists
+    of filenames; archives are streamed and cut into fixed-size chunks of
+    (filename, raw_bytes) members as they are read.
+    """
+    if is_archive(input_path):
+        chunk = []
+        for member in iter_raw_json_files(input_path, filenames, stage="shard_scan"):
+            chunk.append(member)
+            if len(chunk) >= archive_chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    if filenames is None:
+        filenames = scan_json_filenames(input_path)
+    chunk_size = max(1, math.ceil(len(filenames) / chunk_count))
+    for i in range(0, len(filenames), chunk_size):
+        yield filenames[i : i + chunk_size]
+
+
+def process_and_save_parallel(
+    STATE_ABBR,
+    input_path,
+    EVENT_ARCHIVE_FOLDER,
+    ERROR_FOLDER,
+    SESSION_MAPPING,
+    SESSION_LOG_PATH,
+    OUTPUT_FOLDER,
+    workers,
+    chunks_per_worker=4,
+    archive_chunk_size=200,
+    event_sink=None,
+    filenames=None,
+    bill_index=None,
+    input_bills=None,
+):
+    """
+    Processes the input across a process pool, sharded by bill, as part of
+    the current run (see utils.run_context.open_run).
+
+    A first pass assigns every input file to a shard by the hash of the
+    shared output it writes to: a bill folder, i.e. its resolved session and
+    bill identifier, or an event file, named by the event's start date and
+    name (see shard_key). A bill, its votes and any duplicate scrapes of it,
+    like events saved under the same name, are therefore all handled by one
+    worker, in input order. The second pass processes one
+    shard per task, and the counts, events, bill index and PDF jobs are
+    merged back in input order. The output tree is therefore the same as a
+    serial run's, except that unknown sessions are never fixed interactively.
+
+    Bills and votes share their bill's folder (vote placeholders are a
+    check-then-write, and votes of one day and result share a log file
+    name), so that folder must only ever be written by one worker: anything
+    that changes where a file writes must change its shard key too.
+    Archived events and data_not_processed/ files are named after their own
+    input file.
+
+    Workers write their outputs the way the current run is configured to
+    (see worker_run_settings). Their write stats, failed writes, metrics,
+    recorded outputs and queued PDFs are added to the current run; with a
+    SQLite output store, each shard writes a database of its own that is
+    merged, in shard order, into the run's store.
+
+    Every input is decoded once, in the second pass; the first only looks
+    for the fields the shard depends on (see read_shard_fields). An archive
+    is streamed once: as its members are assigned, they are spooled into
+    one temporary file per shard (under the output root), which the second
+    pass reads instead. At most two scan chunks per worker are in flight,
+    which bounds memory while archive members are sent to the workers.
+
+    Args:
+        input_path (Path): Input folder or scraper archive.
+        workers (int): Number of worker processes.
+        chunks_per_worker (int): Shards per worker, for load balancing.
+        archive_chunk_size (int): Archive members sent to a worker at a time
+            in the scan pass.
+        event_sink (list, optional): Collects the parsed events returned by
+            the workers, in input order.
+        filenames (list[str], optional): Only process these input files.
+        bill_index (dict, optional): Receives the bill folders written by the
+            workers, merged in input order.
+        input_bills (dict, optional): Receives the bill folder each input
+            wrote (see process_and_save).
+
+    Returns:
+        dict: Merged counts in the same shape as process_and_save.
+    """
+    run = current_run()
+    logger.info("🧵 Processing input across %s workers", workers)
+    # Forked workers would otherwise inherit (and write out again) the buffer
+    flush_logs()
+    archive = is_archive(input_path)
+    shards = workers * chunks_per_worker
+
+    with ExitStack() as stack:
+        if archive:
+            spool_folder = Path(
+                stack.enter_context(
+                    tempfile.TemporaryDirectory(
+                        prefix=INPUT_SPOOL_PREFIX, dir=run.output_root
+                    )
+                )
+            )
+        # Workers count their files into this process's progress
+        executor = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=use_progress_counters,
+                initargs=(progress_counters(),),
+            )
+        )
+
+        # 1. Assign every input file to a shard, in input order
+        position = {}
+        shard_files = [[] for _ in range(shards)]
+        with ExitStack() as spools:
+            spool_files = {}
+
+            def assign(future, chunk):
+                assigned, scan_metrics = future.result()
+                add_metrics(scan_metrics)
+                for i, (filename, shard) in enumerate(assigned):
+                    position[filename] = len(position)
+                    shard_files[shard].append(filename)
+                    if archive:
+                        if shard not in spool_files:
+                            spool_files[shard] = spools.enter_context(
+                                open(spool_folder / f"{shard}.spool", "wb")
+                            )
+                        spool_raw_json_file(spool_files[shard], *chunk[i])
+
+            scans = deque()
+            for chunk in _iter_scan_chunks(
+                input_path, shards, archive_chunk_size, filenames
+            ):
+                if len(scans) >= workers * 2:
+                    assign(*scans.popleft())
+                future = executor.submit(
+                    _scan_shards, input_path, chunk, shards, SESSION_MAPPING
+                )
+                scans.append((future, chunk))
+            while scans:
+                assign(*scans.popleft())
+        set_input_total(len(position))
+
+        # 2. Process each shard in one task
+        futures = [
+            executor.submit(
+                _process_file_chunk,
+                STATE_ABBR,
+                spool_folder / f"{shard}.spool" if archive else input_path,
+                None if archive else chunk,
+                EVENT_ARCHIVE_FOLDER,
+                ERROR_FOLDER,
+                SESSION_MAPPING,
+                SESSION_LOG_PATH,
+                OUTPUT_FOLDER,
+                worker_run_settings(run),
+                sqlite_shard=run.store is not None,
+            )
+            for shard, chunk in enumerate(shard_files)
+            if chunk
+        ]
+
+        # 3. Merge: shards write disjoint files, ordered results are re-sorted
+        all_counts = []
+        events = []
+        outputs = []
+        written_bills = {}
+        downloads = []
+        for future in futures:
+            result = future.result()
+            all_counts.append(result["counts"])
+            add_write_stats(result["write_stats"])
+            add_write_errors(result["write_errors"])
+            add_metrics(result["metrics"])
+            events.extend(result["events"])
+            downloads.extend(result["pdf_jobs"])
+            outputs.extend(result["outputs"].items())
+            written_bills.update(result["input_bills"])
+            if result["sqlite_shard"] is not None:
+                get_output_store().merge(result["sqlite_shard"])
+                result["sqlite_shard"].unlink()
+
+    if event_sink is not None:
+        events.sort(key=lambda item: position[item[0]])
+        event_sink.extend(events)
+    merge_recorded_outputs(dict(outputs))
+    if run.pdf_jobs is not None:
+        downloads.sort(key=lambda job: position[job[2]])
+        run.pdf_jobs.extend(downloads)
+    if bill_index is not None:
+        bill_index.update(
+            bill_index_from_inputs(
+                written_bills[name] for name in sorted(written_bills, key=position.get)
+            )
+        )
+    if input_bills is not None:
+        input_bills.update(written_bills)
+
+    if run.store is not None:
+        shard_folder = run.output_root / SQLITE_SHARD_FOLDER
+        if shard_folder.exists():
+            shard_folder.rmdir()
+    return merge_counts(all_counts)
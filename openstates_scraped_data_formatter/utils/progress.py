@@ -0,0 +1,181 @@
+import multiprocessing
+import threading
+import time
+
+from utils.log_utils import flush_logs, get_logger
+from utils.run_context import current_run
+
+# Stages with live progress, in pipeline order
+PROGRESS_STAGES = ("load", "process", "link")
+# Stages every input file goes through
+INPUT_STAGES = ("load", "process")
+DEFAULT_PROGRESS_INTERVAL = 10.0
+
+logger = get_logger(__name__)
+
+# Progress state lives on the run (see utils.run_context.RunContext); in a
+# worker process, this holds the counters of the parent run it works for
+_inherited_counters = None
+
+
+def _slot(stage) -> int:
+    return 2 * PROGRESS_STAGES.index(stage)
+
+
+def advance_progress(stage, files=1, bytes_read=0):
+    """
+    Counts files (and bytes) a stage got through. Cheap enough to call per
+    file, from any process sharing the run's counters.
+    """
+    counters = current_run().progress_counters
+    if counters is None:
+        return
+    i = _slot(stage)
+    with counters.get_lock():
+        counters[i] += files
+        counters[i + 1] += bytes_read
+
+
+def set_progress_total(stage, total):
+    run = current_run()
+    if run.progress_counters is not None:
+        run.progress_totals[stage] = total
+
+
+def set_input_total(total):
+    """
+    Sets the number of input files (or an estimate, while it isn't known
+    yet) as the total of every stage each input goes through.
+    """
+    for stage in INPUT_STAGES:
+        set_progress_total(stage, total)
+
+
+def progress_counters():
+    """
+    Returns the current run's counters, to hand to a worker pool (see
+    use_progress_counters).
+    """
+    return current_run().progress_counters
+
+
+def use_progress_counters(counters):
+    """
+    Worker process initializer: the runs this process works on count into
+    the parent run's counters (see inherited_progress_counters).
+    """
+    global _inherited_counters
+    _inherited_counters = counters
+
+
+def inherited_progress_counters():
+    """
+    Returns the counters a worker run counts its progress into, or None
+    outside worker processes (see RunContext's progress_counters).
+    """
+    return _inherited_counters
+
+
+def format_duration(seconds) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter(threading.Thread):
+    """
+    Logs one line every `interval` seconds with, per running stage, files
+    done over the total, files/sec and MB/sec over the last interval, and
+    the ETA at the stage's average rate so far. A stage at 0 files/s for a
+    few lines in a row is stuck rather than slow.
+    """
+
+    def __init__(self, run, interval):
+        super().__init__(name="progress", daemon=True)
+        # The run reported on (Thread.run is the reporting loop)
+        self.context = run
+        self.interval = interval
+        self.stopped = threading.Event()
+        # A stage first seen running started some time after the last line
+        self.last_line = time.perf_counter()
+        # {stage: (time, files, bytes)} at the previous line, and {stage: time}
+        # the stage started, give the current and the average rate
+        self.previous = {}
+        self.first_seen = {}
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            line = self.progress_line(time.perf_counter())
+            if line:
+                logger.info(line)
+                flush_logs()
+
+    def snapshot(self) -> dict:
+        counters = self.context.progress_counters
+        with counters.get_lock():
+            values = list(counters)
+        return {
+            stage: (values[_slot(stage)], values[_slot(stage) + 1])
+            for stage in PROGRESS_STAGES
+        }
+
+    def progress_line(self, now, counts=None, totals=None):
+        counts = self.snapshot() if counts is None else counts
+        totals = self.context.progress_totals if totals is None else totals
+        running = [
+            stage
+            for stage in PROGRESS_STAGES
+            if counts[stage][0] or totals.get(stage) is not None
+        ]
+        # Files are loaded and processed together; linking starts once both
+        # are done
+        if "link" in running:
+            running = ["link"]
+        parts = []
+        for stage in running:
+            files, nbytes = counts[stage]
+            total = totals.get(stage)
+            if total is not None and files >= total:
+                continue  # done
+            started = self.first_seen.setdefault(stage, self.last_line)
+            since, files_before, bytes_before = self.previous.get(
+                stage, (started, 0, 0)
+            )
+            self.previous[stage] = (now, files, nbytes)
+            elapsed = max(now - since, 1e-9)
+
+            part = f"{stage} {files:,}"
+            if total is not None:
+                part += f"/{total:,} ({files / total:.0%})" if total else "/0"
+            part += f", {(files - files_before) / elapsed:,.0f} files/s"
+            if nbytes:
+                part += f", {(nbytes - bytes_before) / elapsed / 1e6:.1f} MB/s"
+            if total:
+                average = files / max(now - started, 1e-9)
+                eta = format_duration((total - files) / average) if average else "?"
+                part += f", ETA {eta}"
+            parts.append(part)
+        self.last_line = now
+        return "⏳ " + " | ".join(parts) if parts else None
+
+
+def start_progress(run):
+    """
+    Starts counting run's progress and reporting it every
+    run.progress_interval seconds (<= 0 turns progress off). Worker pools
+    started afterwards should be initialized with
+    use_progress_counters(progress_counters()).
+    """
+    if run.progress_interval <= 0:
+        return
+    run.progress_counters = multiprocessing.Array("q", 2 * len(PROGRESS_STAGES))
+    run.progress_totals.clear()
+    run.progress_reporter = ProgressReporter(run, run.progress_interval)
+    run.progress_reporter.start()
+
+
+def stop_progress(run):
+    if run.progress_reporter is not None:
+        run.progress_reporter.stopped.set()
+        run.progress_reporter.join()
+        run.progress_reporter = None
+    run.progress_counters = None
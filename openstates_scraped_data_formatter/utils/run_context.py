@@ -0,0 +1,156 @@
+import threading
+from contextlib import contextmanager
+
+
+class RunContext:
+    """
+    Configuration and state of one pipeline run, or of one worker process's
+    share of it. Everything a run writes or accumulates goes through its
+    context, so runs in the same process never see each other's state:
+
+    - how outputs are written (inline, by a background writer or into a
+      SQLite store; compressed; compared with the existing files first),
+      see utils.output_writer
+    - write stats and failed writes
+    - stage, error and warning metrics (see utils.metrics)
+    - outputs recorded per input for incremental runs (see
+      utils.manifest_utils)
+    - bill PDFs queued for the download stage (see utils.pdf_downloader)
+    - session paths, created folders and placeholders already seen (see
+      utils.path_registry)
+    - progress counters, totals and reporter (see utils.progress)
+
+    The output settings may still be changed until the outputs are opened
+    (see utils.output_writer.open_outputs), e.g. once a run knows which
+    folder it builds.
+
+    Args:
+        output_root (Path, optional): Folder the run builds; recorded outputs
+            and SQLite rows are keyed by their path relative to it.
+        jurisdiction (str, optional): State abbreviation, for SQLite rows.
+        compare_existing (bool): Skip writes whose file already holds the
+            same bytes (pointless when building into an empty folder).
+        compression (str, optional): "gzip" or "zstd" output compression.
+        write_threads (int): Background writer threads; 0 writes inline.
+        max_pending_writes (int): Writes that may be queued before
+            write_output blocks.
+        fsync_output (bool): fsync every written file.
+        sqlite_path (Path, optional): Store every output as a row of this
+            database instead of a file.
+        record_outputs (bool): Attribute every output to the input file
+            that produced it.
+        collect_pdfs (bool): Queue the version PDFs of every saved bill.
+        progress_interval (float): Seconds between progress lines; 0 (and
+            worker runs) report none (see utils.progress).
+        progress_counters (multiprocessing.Array, optional): Count progress
+            into another run's counters: a worker's share of a run counts
+            into the parent run's (see utils.progress.use_progress_counters).
+    """
+
+    def __init__(
+        self,
+        output_root=None,
+        jurisdiction=None,
+        compare_existing=True,
+        compression=None,
+        write_threads=0,
+        max_pending_writes=1024,
+        fsync_output=False,
+        sqlite_path=None,
+        record_outputs=False,
+        collect_pdfs=False,
+        progress_interval=0,
+        progress_counters=None,
+    ):
+        self.output_root = output_root
+        self.jurisdiction = jurisdiction
+        self.compare_existing = compare_existing
+        self.compression = compression
+        self.write_threads = write_threads
+        self.max_pending_writes = max_pending_writes
+        self.fsync_output = fsync_output
+        self.sqlite_path = sqlite_path
+        self.progress_interval = progress_interval
+
+        # Started by utils.output_writer.open_outputs, drained and closed by
+        # close_outputs
+        self.writer = None
+        self.store = None
+
+        # Guards everything writer threads update
+        self.lock = threading.Lock()
+        # {category: {"written": n, "skipped": n}}
+        self.write_stats = {}
+        # [{"path": ..., "error": ...}] for writes that failed in the background
+        self.write_errors = []
+        # {stage: {"seconds", "files", "bytes_read", "bytes_written"}}
+        self.stages = {}
+        # {error category: files} as recorded under data_not_processed/
+        self.errors = {}
+        # {warning category: occurrences}
+        self.warnings = {}
+
+        # {input filename: {relative output paths}} and the input being
+        # handled, or None when outputs aren't recorded
+        self.recorded_outputs = {} if record_outputs else None
+        self.current_input = None
+        # [(url, target_path, input_filename)], or None when not collecting
+        self.pdf_jobs = [] if collect_pdfs else None
+
+        # {(output_folder, STATE_ABBR, date_folder, session_name): Path}
+        self.session_paths = {}
+        self.known_folders = set()
+        self.known_placeholders = set()
+
+        # Shared-memory [files, bytes, ...] per progress stage, so worker
+        # processes count into this run's progress; None while it isn't
+        # counted. {stage: expected files}, where known, and the thread
+        # logging progress lines (see utils.progress.start_progress)
+        self.progress_counters = progress_counters
+        self.progress_totals = {}
+        self.progress_reporter = None
+
+
+# Used by code running outside open_run, e.g. a test calling a handler directly
+_default_run = RunContext()
+_current_run = None
+
+
+def current_run() -> RunContext:
+    """
+    Returns the context of the run in progress (see open_run).
+    """
+    return _current_run or _default_run
+
+
+@contextmanager
+def open_run(**settings):
+    """
+    Starts a run configured by settings (see RunContext) and makes it the
+    current run for the with-block, reporting progress if asked to.
+
+    On the way out, even when the block raises, the run's outputs are closed
+    (draining a background writer) and then progress stops. The context
+    stays readable afterwards.
+
+    Yields:
+        RunContext: The new run.
+    """
+    global _current_run
+    # Imported here: both modules look their state up through current_run
+    from utils.output_writer import close_outputs
+    from utils.progress import start_progress, stop_progress
+
+    run = RunContext(**settings)
+    previous, _current_run = _current_run, run
+    try:
+        if run.progress_interval:
+            start_progress(run)
+        yield run
+    finally:
+        try:
+            close_outputs(run)
+        finally:
+            if run.progress_interval:
+                stop_progress(run)
+            _current_run = previous
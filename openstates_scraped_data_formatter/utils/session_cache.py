@@ -0,0 +1,106 @@
+import os
+import time
+from pathlib import Path
+from urllib import request
+from urllib.error import HTTPError
+from urllib.parse import quote
+
+from utils.json_codec import read_json, write_json
+
+OPENSTATES_API_URL = "https://v3.openstates.org"
+# Session lists change a few times a year; refetch (conditionally) once a day
+DEFAULT_SESSION_TTL = 24 * 60 * 60
+
+
+def default_cache_folder() -> Path:
+    """
+    Persistent cache shared by all runs and jurisdictions:
+    $XDG_CACHE_HOME/openstates_scraped_data_formatter (~/.cache/... by default).
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "openstates_scraped_data_formatter"
+
+
+def jurisdiction_id(state_abbr) -> str:
+    if state_abbr == "usa":
+        return "ocd-jurisdiction/country:us/government"
+    return f"ocd-jurisdiction/country:us/state:{state_abbr}/government"
+
+
+def make_http_fetcher(base_url=OPENSTATES_API_URL, api_key=None, timeout=10):
+    """
+    Returns a fetcher for the OpenStates v3 jurisdiction endpoint.
+
+    A fetcher is called as fetcher(state_abbr, headers) and returns
+    (status, response_headers, body), where a 304 means the cached copy is
+    still current. Any callable with that signature can be passed to
+    ensure_session_mapping instead, e.g. one reading from a local stub server.
+
+    Args:
+        api_key (str, optional): Sent as X-API-KEY (default: $OPENSTATES_API_KEY).
+    """
+    api_key = api_key or os.environ.get("OPENSTATES_API_KEY")
+
+    def fetch(state_abbr, headers):
+        url = (
+            f"{base_url}/jurisdictions/{quote(jurisdiction_id(state_abbr), safe='')}"
+            "?include=legislative_sessions"
+        )
+        headers = dict(headers)
+        if api_key:
+            headers["X-API-KEY"] = api_key
+        try:
+            with request.urlopen(
+                request.Request(url, headers=headers), timeout=timeout
+            ) as response:
+                return response.status, dict(response.headers), response.read()
+        except HTTPError as e:
+            # urllib raises for 304 too
+            return e.code, dict(e.headers or {}), b""
+
+    return fetch
+
+
+class SessionCacheEntry:
+    """
+    The cached session list of one jurisdiction: sessions/{state}.json, read
+    by the rest of the pipeline, plus sessions/{state}.meta.json with when and
+    where it came from and the validators used to revalidate it.
+    """
+
+    def __init__(self, cache_folder, state_abbr):
+        self.path = Path(cache_folder) / "sessions" / f"{state_abbr}.json"
+        self.meta_path = self.path.with_name(f"{state_abbr}.meta.json")
+
+    def load(self):
+        """
+        Returns (session_mapping, meta); either is None if not cached.
+        """
+        mapping = read_json(self.path) if self.path.exists() else None
+        meta = read_json(self.meta_path) if self.meta_path.exists() else None
+        return mapping, meta
+
+    def is_fresh(self, meta, ttl, now=None) -> bool:
+        if not meta or "fetched_at" not in meta:
+            return False
+        now = time.time() if now is None else now
+        return now - meta["fetched_at"] < ttl
+
+    def save(self, mapping, meta, previous=None) -> bool:
+        """
+        Writes the mapping (only if it differs from previous) and its metadata.
+        Returns True if the mapping file was rewritten.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        changed = mapping != previous
+        if changed:
+            self._replace(self.path, mapping)
+        self._replace(self.meta_path, meta)
+        return changed
+
+    @staticmethod
+    def _replace(path, data):
+        # Several jurisdictions (or batch workers) may share the cache
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        write_json(tmp, data)
+        os.replace(tmp, path)
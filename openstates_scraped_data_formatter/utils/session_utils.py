@@ -1,5 +1,69 @@
-import json
 from pathlib import Path
+from utils.json_codec import read_json
+from utils.log_utils import get_logger, warn
+
+logger = get_logger(__name__)
+
+
+class SessionNameIndex(dict):
+    """
+    {session name: metadata}, see build_session_name_index.
+
+    A name shared by sessions with different date folders can't be resolved,
+    but is only an error once something looks it up: such names are kept in
+    `ambiguous` ({name: sorted date folders}) instead of the index. get()
+    counts and logs the lookup and returns the default, index[name] raises
+    ValueError.
+    """
+
+    def __init__(self, *args, ambiguous=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ambiguous = ambiguous or {}
+
+    def __missing__(self, name):
+        if name in self.ambiguous:
+            raise ValueError(self._describe(name))
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        if name in self.ambiguous:
+            warn(logger, "ambiguous_session_name", "⚠️ %s", self._describe(name))
+            return default
+        return super().get(name, default)
+
+    def _describe(self, name):
+        folders = ", ".join(self.ambiguous[name])
+        return f"Ambiguous session name '{name}' -> {folders}"
+
+
+def build_session_name_index(session_mapping: dict) -> SessionNameIndex:
+    """
+    Builds a reverse index from session name to its metadata, so a session
+    folder name can be resolved without scanning every session.
+
+    Sessions listed under several identifiers with the same metadata are
+    harmless; a name shared by sessions with different date folders is left
+    out of the index and recorded as ambiguous (see SessionNameIndex).
+
+    Returns:
+        SessionNameIndex: {"113th Congress": {"name": "113th Congress", "date_folder": "2013-2015"}, ...}
+    """
+    name_index = {}
+    ambiguous = {}
+    for identifier, meta in session_mapping.items():
+        name = meta["name"]
+        existing = name_index.setdefault(name, meta)
+        if existing["date_folder"] != meta["date_folder"]:
+            ambiguous.setdefault(name, {existing["date_folder"]}).add(
+                meta["date_folder"]
+            )
+
+    for name in ambiguous:
+        del name_index[name]
+    return SessionNameIndex(
+        name_index,
+        ambiguous={name: sorted(folders) for name, folders in ambiguous.items()},
+    )
 
 
 def load_session_mapping(session_mapping_file: Path) -> dict:
@@ -18,10 +82,17 @@ def load_session_mapping(session_mapping_file: Path) -> dict:
             f"❌ Session mapping file not found: {session_mapping_file}"
         )
 
-    with open(session_mapping_file, "r", encoding="utf-8") as f:
-        session_mapping = json.load(f)
+    session_mapping = read_json(session_mapping_file)
 
     if not isinstance(session_mapping, dict):
         raise ValueError("❌ Session mapping must be a dictionary")
 
     return session_mapping
+
+
+def load_session_name_index(session_mapping_file: Path) -> dict:
+    """
+    Loads the session mapping from disk and returns its name index
+    (see build_session_name_index).
+    """
+    return build_session_name_index(load_session_mapping(session_mapping_file))
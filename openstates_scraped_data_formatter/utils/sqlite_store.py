@@ -0,0 +1,234 @@
+import os
+import re
+import sqlite3
+from pathlib import Path
+
+SQLITE_FILENAME = "formatted_output.sqlite"
+
+# write_output category -> table
+TABLES = {
+    "bill": "bills",
+    "action": "actions",
+    "vote_event": "vote_events",
+    "placeholder": "placeholders",
+    "event": "events",
+    "error": "errors",
+    "event_archive": "event_archive",
+}
+COLUMNS = (
+    "path",
+    "jurisdiction",
+    "date_folder",
+    "session",
+    "bill_identifier",
+    "timestamp",
+    "filename",
+    "content",
+)
+
+_TIMESTAMP = re.compile(r"^\d{8}T\d{6}Z$")
+
+
+def _create_schema(conn):
+    for table in TABLES.values():
+        conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                path TEXT PRIMARY KEY,
+                jurisdiction TEXT,
+                date_folder TEXT,
+                session TEXT,
+                bill_identifier TEXT,
+                timestamp TEXT,
+                filename TEXT,
+                content BLOB NOT NULL
+            )"""
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_key ON {table} "
+            "(jurisdiction, session, bill_identifier, timestamp)"
+        )
+    conn.execute("CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY)")
+
+
+def _row(relative, jurisdiction, content):
+    """
+    Builds a table row from an output path relative to the output folder, e.g.
+    data_processed/country:us/state:il/sessions/ocd-session/country:us/state:il/
+    2025-2026/104th/bills/HB 1/logs/20250101T000000Z_entire_bill.json
+    """
+    parts = relative.split("/")
+    date_folder = session = bill_identifier = None
+    if parts[0] == "data_processed" and len(parts) > 10:
+        date_folder, session = parts[7], parts[8]
+        if parts[9] == "bills" and len(parts) > 11:
+            bill_identifier = parts[10]
+    filename = parts[-1]
+    prefix = filename.split("_", 1)[0]
+    timestamp = prefix if _TIMESTAMP.match(prefix) else None
+    return (
+        relative,
+        jurisdiction,
+        date_folder,
+        session,
+        bill_identifier,
+        timestamp,
+        filename,
+        content,
+    )
+
+
+class SqliteOutputStore:
+    """
+    Stores the files of the output tree as rows of a SQLite database.
+
+    Rows are keyed by their path relative to the output folder, so the tree
+    can be exported byte-for-byte (see export_sqlite_output). Writes are
+    buffered and committed in batches; a later write to the same path
+    replaces the earlier one, as it would on disk. Lookups never commit:
+    they check the buffered rows, then the database as this connection sees
+    it, including removals not committed yet.
+    """
+
+    def __init__(self, db_path, output_root, jurisdiction, batch_size=2000):
+        self.db_path = Path(db_path)
+        self.root = str(output_root).rstrip(os.sep) + os.sep
+        self.jurisdiction = jurisdiction
+        self.batch_size = batch_size
+        self.pending = {}
+        self.pending_folders = set()
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        _create_schema(self.conn)
+
+    def _relative(self, path):
+        path = os.fspath(path)
+        if path.startswith(self.root):
+            path = path[len(self.root) :]
+        else:
+            path = os.path.relpath(path, self.root)
+        return path.replace(os.sep, "/")
+
+    def put(self, path, encoded: bytes, category):
+        relative = self._relative(path)
+        self.pending[relative] = (
+            TABLES[category],
+            _row(relative, self.jurisdiction, encoded),
+        )
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_folder(self, folder):
+        self.pending_folders.add(self._relative(folder))
+
+    def flush(self):
+        """
+        Commits buffered rows, and any removals, in one transaction.
+        """
+        by_table = {}
+        for table, row in self.pending.values():
+            by_table.setdefault(table, []).append(row)
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self.conn:
+            for table, rows in by_table.items():
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", rows
+                )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO folders VALUES (?)",
+                ((folder,) for folder in self.pending_folders),
+            )
+        self.pending.clear()
+        self.pending_folders.clear()
+
+    def exists(self, path) -> bool:
+        relative = self._relative(path)
+        if relative in self.pending or relative in self.pending_folders:
+            return True
+        for table in ("folders", *TABLES.values()):
+            if self.conn.execute(
+                f"SELECT 1 FROM {table} WHERE path = ?", (relative,)
+            ).fetchone():
+                return True
+        return False
+
+    def remove(self, path):
+        """
+        Removes a stored file; committed with the next batch of writes.
+        """
+        relative = self._relative(path)
+        self.pending.pop(relative, None)
+        for table in TABLES.values():
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (relative,))
+
+    def list_folder(self, folder) -> set:
+        """
+        Returns the names of the files stored directly inside folder.
+        """
+        prefix = self._relative(folder) + "/"
+        paths = [path for path in self.pending if path.startswith(prefix)]
+        for table in TABLES.values():
+            paths.extend(
+                path
+                for (path,) in self.conn.execute(
+                    f"SELECT path FROM {table} WHERE path >= ? AND path < ?",
+                    (prefix, prefix[:-1] + "0"),
+                )
+            )
+        names = set()
+        for path in paths:
+            name = path[len(prefix) :]
+            if "/" not in name:
+                names.add(name)
+        return names
+
+    def merge(self, shard_path):
+        """
+        Copies every row of another store's database (e.g. a worker's shard)
+        into this one, replacing rows with the same path.
+        """
+        self.flush()
+        self.conn.execute("ATTACH DATABASE ? AS shard", (os.fspath(shard_path),))
+        try:
+            with self.conn:
+                for table in TABLES.values():
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO {table} SELECT * FROM shard.{table}"
+                    )
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO folders SELECT * FROM shard.folders"
+                )
+        finally:
+            self.conn.execute("DETACH DATABASE shard")
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def export_sqlite_output(db_path, output_folder):
+    """
+    Recreates the folder tree stored in a SQLite output database.
+
+    Every folder (including empty logs/ and files/ folders) and every file is
+    written exactly as the folder output format would have written it.
+
+    Returns:
+        int: Number of files written.
+    """
+    output_folder = Path(output_folder)
+    conn = sqlite3.connect(db_path)
+    try:
+        for (folder,) in conn.execute("SELECT path FROM folders"):
+            (output_folder / folder).mkdir(parents=True, exist_ok=True)
+
+        count = 0
+        for table in TABLES.values():
+            for path, content in conn.execute(f"SELECT path, content FROM {table}"):
+                target = output_folder / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+                count += 1
+    finally:
+        conn.close()
+    return count
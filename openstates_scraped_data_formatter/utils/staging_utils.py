@@ -0,0 +1,78 @@
+import ctypes
+import os
+import shutil
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+# renameat2(2) constants (Linux)
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def staging_folder_for(output_folder: Path) -> Path:
+    """
+    Returns the sibling folder a full rebuild is written to before it replaces
+    output_folder (same parent, so the final rename stays on one filesystem).
+    """
+    return output_folder.parent / f".{output_folder.name}.staging"
+
+
+def _exchange_paths(a: Path, b: Path) -> bool:
+    """
+    Atomically swaps two existing paths with renameat2(RENAME_EXCHANGE).
+    Returns False where that isn't available (non-Linux, old glibc, or a
+    filesystem that doesn't support it).
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    renameat2.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    result = renameat2(
+        _AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE
+    )
+    return result == 0
+
+
+def swap_in_staging(staging_folder: Path, output_folder: Path):
+    """
+    Replaces output_folder with the finished staging_folder and deletes the
+    previous tree on a background thread.
+
+    Readers see either the old or the new tree: the swap is a single
+    renameat2(RENAME_EXCHANGE) on Linux, and otherwise two renames back to
+    back (old tree aside, new tree in).
+
+    Returns:
+        threading.Thread or None: The cleanup thread, if there was an old tree.
+    """
+    if not output_folder.exists():
+        staging_folder.rename(output_folder)
+        return None
+
+    trash = output_folder.parent / f".{output_folder.name}.old-{uuid.uuid4().hex}"
+    if _exchange_paths(staging_folder, output_folder):
+        # The old tree now sits at the staging path
+        staging_folder.rename(trash)
+    else:
+        output_folder.rename(trash)
+        staging_folder.rename(output_folder)
+
+    cleanup = threading.Thread(
+        target=shutil.rmtree,
+        args=(trash,),
+        kwargs={"ignore_errors": True},
+        name="output-cleanup",
+    )
+    cleanup.start()
+    return cleanup